@@ -0,0 +1,206 @@
+# --- Gerekli Kütüphaneler ---
+# Bu modül, chatbot motorunu Streamlit olmadan diğer servislerin kullanabileceği
+# asenkron bir HTTP API (FastAPI / ASGI) olarak sunar.
+#   GET  /airlines -> havayolu listesi ve yorum sayıları
+#   POST /ask      -> {"soru": "...", "havayolu": "Turkish Airlines" | [...] | null, "akis": false}
+#   GET  /metrics  -> Prometheus metin formatında sayaç ve histogramlar (IZLEME=1 iken dolar)
+# Çalıştırma: uvicorn api_sunucusu:app --host 0.0.0.0 --port 8000
+#
+# Motor (veri, embedding modeli, LLM) import sırasında değil, sunucu açılırken bir kere yüklenir
+# ve tüm istekler aynı embedding / LLM istemcisini paylaşır. Motor senkron çalıştığı için
+# her istek, boyutu eşzamanlılık sınırına eşit bir iş parçacığı havuzunda çalıştırılır.
+# Sınırın üstünde en fazla API_MAKS_BEKLEYEN_ISTEK kadar istek sırada bekler; fazlası hemen
+# 503 (Retry-After) ile geri çevrilir, böylece aşırı yükte bellek ve kuyruk şişmez.
+import os
+import asyncio
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Union
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
+from starlette.background import BackgroundTask
+
+import izleme
+
+# --- Genel Ayarlar ---
+MAKS_ESZAMANLI_ISTEK = int(os.getenv("API_MAKS_ESZAMANLI_ISTEK", "8"))
+MAKS_BEKLEYEN_ISTEK = int(os.getenv("API_MAKS_BEKLEYEN_ISTEK", "32"))
+YENIDEN_DENE_SN = 1
+
+_BITTI = object()
+
+
+class SoruIstegi(BaseModel):
+    soru: str
+    # Tek havayolu, karşılaştırma için havayolu listesi veya tüm havayolları için null.
+    havayolu: Optional[Union[str, List[str]]] = None
+    # True ise cevap üretildikçe düz metin olarak akıtılır.
+    akis: bool = False
+
+
+class IstekSiniri:
+    # Aynı anda çalışan ve sırada bekleyen istekleri sınırlayan sayaç.
+    # Tüm istekler aynı olay döngüsünde çalıştığı için sayaç için kilit gerekmiyor.
+
+    def __init__(self, eszamanli, bekleyen):
+        self.eszamanli = eszamanli
+        self.kapasite = eszamanli + bekleyen
+        self.icerideki = 0
+        self._semafor = asyncio.Semaphore(eszamanli)
+
+    async def gir(self):
+        # Kapasite doluysa beklemeden 503 döner; değilse çalışma sırası gelene kadar bekler.
+        if self.icerideki >= self.kapasite:
+            raise HTTPException(status_code=503, detail="Sunucu meşgul, lütfen tekrar deneyin.",
+                                headers={"Retry-After": str(YENIDEN_DENE_SN)})
+        self.icerideki += 1
+        try:
+            await self._semafor.acquire()
+        except BaseException:
+            self.icerideki -= 1
+            raise
+
+    def cik(self):
+        self._semafor.release()
+        self.icerideki -= 1
+
+
+class AkisKapatici:
+    # Akışlı bir cevabın motor tarafındaki generator'ını ve istek yerini yönetir.
+    # Generator her zaman havuzdaki bir iş parçacığında ilerletilir. İstemci akışı yarıda bırakınca
+    # o anda bir next() çalışıyor olabilir; çalışan bir generator kapatılamadığı için (ValueError)
+    # kapatma, süren next() bittikten sonra yapılır. İstek yeri kapatmanın sonucunu beklemeden bırakılır.
+    # kapat() birden fazla yerden çağrılabilir (akışın finally'si ve yanıtın arka plan görevi); yer bir kez bırakılır.
+
+    def __init__(self, akis, havuz, sinir):
+        self.akis = akis
+        self.havuz = havuz
+        self.sinir = sinir
+        self._suren = None  # çalışan next() işi (concurrent.futures.Future)
+        self._kapandi = False
+
+    def sonraki(self):
+        self._suren = self.havuz.submit(next, self.akis, _BITTI)
+        return asyncio.wrap_future(self._suren)
+
+    def kapat(self):
+        if self._kapandi:
+            return
+        self._kapandi = True
+        try:
+            suren = self._suren
+            if suren is not None and not suren.done():
+                # Geri çağırma, next() biten iş parçacığında çalışır.
+                suren.add_done_callback(lambda _: self._akisi_kapat())
+            else:
+                self.havuz.submit(self._akisi_kapat)
+        except RuntimeError:
+            # Havuz kapatıldıysa (sunucu kapanıyor) generator'ı burada kapatıyorum; çalışan bir next() yok.
+            self._akisi_kapat()
+        finally:
+            self.sinir.cik()
+
+    def _akisi_kapat(self):
+        # İstemci akışı yarıda bırakırsa da motorun izleme kaydı yazılsın.
+        try:
+            self.akis.close()
+        except Exception as e:
+            print(f"-> Cevap akışı kapatılırken hata: {e}")
+
+
+def uygulama_olustur(embeddings_modeli=None, dil_modeli=None, motor=None):
+    # embeddings_modeli / dil_modeli verilirse Google modelleri yerine bunlar kullanılır (ör. sahte modeller).
+    # motor verilmezse chatbot_engine sunucu açılırken içeri aktarılır.
+
+    @asynccontextmanager
+    async def yasam_dongusu(app):
+        nonlocal motor
+        if motor is None:
+            import chatbot_engine as motor
+        # Veri ve model yükleme bloklayıcı olduğu için olay döngüsünü tutmadan ayrı iş parçacığında yapılıyor.
+        await asyncio.to_thread(motor.baslat, embeddings_modeli, dil_modeli)
+        app.state.motor = motor
+        app.state.havuz = ThreadPoolExecutor(max_workers=MAKS_ESZAMANLI_ISTEK, thread_name_prefix="api")
+        app.state.sinir = IstekSiniri(MAKS_ESZAMANLI_ISTEK, MAKS_BEKLEYEN_ISTEK)
+        try:
+            yield
+        finally:
+            app.state.havuz.shutdown(wait=False, cancel_futures=True)
+
+    app = FastAPI(title="Havayolu Yorum Asistanı API", lifespan=yasam_dongusu)
+
+    @app.get("/airlines")
+    async def havayollari():
+        # Depo veri değiştiyse yeniden yüklenebileceği için olay döngüsü dışında alınıyor.
+        depo = await asyncio.to_thread(app.state.motor.guncel_yorum_deposu)
+        return {"havayollari": [{"ad": ad, "yorum_sayisi": depo.yorum_sayisi([ad])} for ad in depo.havayollari]}
+
+    @app.post("/ask")
+    async def sor(istek: SoruIstegi):
+        motor = app.state.motor
+        if not istek.soru.strip():
+            raise HTTPException(status_code=422, detail="Soru boş olamaz.")
+        havayollari = [istek.havayolu] if isinstance(istek.havayolu, str) else istek.havayolu
+        if havayollari is not None:
+            depo = await asyncio.to_thread(motor.guncel_yorum_deposu)
+            bilinmeyenler = [ad for ad in havayollari if ad not in depo.araliklar]
+            if bilinmeyenler:
+                raise HTTPException(status_code=404, detail=f"Bilinmeyen havayolu: {', '.join(bilinmeyenler)}")
+
+        # Buradan sonra yer, cevap (veya akış) bitince bırakılır.
+        sinir = app.state.sinir
+        await sinir.gir()
+        loop = asyncio.get_running_loop()
+        havuz = app.state.havuz
+        try:
+            hazirlik = await loop.run_in_executor(havuz, motor.sorguyu_hazirla, istek.soru, havayollari)
+        except BaseException:
+            sinir.cik()
+            raise
+
+        kanitlar = [{"havayolu": doc.metadata["Airline Name"], "metin": doc.page_content}
+                    for doc in hazirlik.relevant_docs]
+        akis = motor.cevap_akisi(hazirlik)
+
+        if istek.akis:
+            kapatici = AkisKapatici(akis, havuz, sinir)
+
+            async def parcalar():
+                try:
+                    while True:
+                        parca = await kapatici.sonraki()
+                        if parca is _BITTI:
+                            break
+                        yield parca
+                finally:
+                    kapatici.kapat()
+
+            async def bitir():
+                # Yanıt gövdesi hiç okunmadıysa (istemci başlamadan koptu) yer burada bırakılır.
+                kapatici.kapat()
+
+            return StreamingResponse(parcalar(), media_type="text/plain; charset=utf-8",
+                                     background=BackgroundTask(bitir))
+
+        try:
+            cevap = await loop.run_in_executor(havuz, "".join, akis)
+        finally:
+            sinir.cik()
+        return {"cevap": cevap, "dil": hazirlik.orjinal_dil, "kanitlar": kanitlar, "olcumler": hazirlik.olcumler}
+
+    @app.get("/metrics")
+    async def metrikler():
+        return PlainTextResponse(izleme.metrik_metni(), media_type="text/plain; version=0.0.4")
+
+    return app
+
+
+# Import sırasında sadece uygulama nesnesi oluşturuluyor; motor sunucu açılınca yükleniyor.
+app = uygulama_olustur()
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host=os.getenv("API_HOST", "127.0.0.1"), port=int(os.getenv("API_PORT", "8000")))
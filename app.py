@@ -2,20 +2,26 @@
 # Streamlit kütüphanesini 'st' kısaltmasıyla içeri aktarıyorum.
 # Bu kütüphane, Python ile interaktif web uygulamaları oluşturmamı sağlıyor.
 import streamlit as st
-# time kütüphanesini, cevabı ekrana yazarken küçük bir gecikme efekti vermek için kullanacağım.
-import time
 
 # --- Chatbot Motorunu İçeri Aktarma ---
-# Kendi yazdığım 'chatbot_engine.py' dosyasından ana fonksiyonumu ('get_response')
-# ve tüm yorumları içeren DataFrame'i ('df_tum_yorumlar') içeri aktarıyorum.
+# Kendi yazdığım 'chatbot_engine.py' dosyasından arama adımını ('sorguyu_hazirla'),
+# cevabı parça parça üreten fonksiyonu ('cevap_akisi') ve veriyle modelleri yükleyen
+# başlatma fonksiyonunu ('baslat') içeri aktarıyorum.
 try:
-    from chatbot_engine import get_response, df_tum_yorumlar
+    import chatbot_engine
+    from chatbot_engine import sorguyu_hazirla, cevap_akisi, baslat, konu_ozetlerini_getir
+    from konu_ozetleri import KONULAR
 # Eğer 'chatbot_engine.py' bulunamazsa veya içindeki gerekli öğeler eksikse,
 # kullanıcıya bir hata mesajı gösterip uygulamayı durduruyorum. Bu önemli bir güvenlik önlemi.
 except (ModuleNotFoundError, ImportError):
     st.error("Kritik Hata: 'chatbot_engine.py' dosyası bulunamadı veya gerekli fonksiyonlar içe aktarılamadı.")
     st.stop()
 
+# Veri ve modeller bir kere yükleniyor (önbellekli); sonraki yeniden çalıştırmalarda hiçbir şey yapmıyor.
+baslat()
+# Depo her yeniden çalıştırmada güncel haliyle alınıyor; yeni yorumlar eklendiyse havayolu listesi de güncellenir.
+yorum_deposu = chatbot_engine.guncel_yorum_deposu()
+
 # --- Sayfa Genel Ayarları ---
 # Web sayfamın tarayıcı sekmesindeki başlığını, sayfa düzenini (geniş ekran)
 # ve sekme ikonunu (emoji) ayarlıyorum.
@@ -105,9 +111,10 @@ col1, col2 = st.columns([2, 1], gap="large")
 # 'with col1:' bloğu içindeki her şey sol sütunda görünecek.
 with col1:
     # Kullanıcının havayolu seçmesini sağlayacak bir açılır liste (Selectbox) oluşturuyorum.
-    # Önce tüm benzersiz havayolu isimlerini 'df_tum_yorumlar' DataFrame'inden alıp sıralıyorum.
+    # Havayolu listesi yorum deposunda önceden sıralanmış olarak hazır; her yeniden çalıştırmada
+    # benzersiz değerleri bulup sıralamaya gerek yok.
     # Listenin başına boş bir seçenek ("") ekliyorum ki başlangıçta bir şey seçili olmasın.
-    airline_list = [""] + sorted(df_tum_yorumlar['Airline Name'].unique())
+    airline_list = [""] + yorum_deposu.havayollari
     # st.selectbox() fonksiyonu ile açılır listeyi oluşturuyorum.
     # İlk parametre etiketi, 'options' liste seçeneklerini, 'help' ise üzerine gelince çıkacak ipucunu belirtir.
     selected_airline = st.selectbox(
@@ -130,22 +137,38 @@ with col1:
         # Butona tıklandığında çalışacak kod bloğu:
         # Önce hem havayolunun seçildiğini hem de sorunun yazıldığını kontrol ediyorum.
         if selected_airline and user_question:
-            # Cevap üretilirken kullanıcıya bir bekleme animasyonu ('spinner') gösteriyorum.
-            with st.spinner(f"Lütfen bekleyin... '{selected_airline}' için yorumlar analiz ediliyor..."):
-                # İşte motorumu çağırdığım yer! 'chatbot_engine.py'deki fonksiyonumu
+            # Önce sadece arama adımı için bir bekleme animasyonu ('spinner') gösteriyorum.
+            # Arama biter bitmez kanıtları, ardından cevabı geldikçe ekrana yazıyorum.
+            with st.spinner(f"Lütfen bekleyin... '{selected_airline}' için yorumlar aranıyor..."):
+                # İşte motorumu çağırdığım yer! 'chatbot_engine.py'deki arama fonksiyonumu
                 # seçilen havayolu ve soru ile çağırıyorum.
-                response = get_response(user_question, selected_airline)
-                
-                # Cevap geldikten sonra, görsel bir ayırıcı çizgi ekliyorum.
-                st.divider()
-                # Cevap başlığını ekliyorum.
-                st.subheader("🤖 Asistanın Analiz Sonucu:", anchor=False)
-
-                # --- Cevabı özel stil ile gösteriyorum ---
-                # st.info() yerine, yukarıda CSS ile tanımladığım 'response-box' stilini kullanarak
-                # cevabı daha şık bir kutu içinde gösteriyorum. f-string ve HTML kullandığım için
-                # unsafe_allow_html=True parametresini ekliyorum.
-                st.markdown(f'<div class="response-box">{response}</div>', unsafe_allow_html=True)
+                hazirlik = sorguyu_hazirla(user_question, selected_airline)
+
+            # Arama bittikten sonra, görsel bir ayırıcı çizgi ekliyorum.
+            st.divider()
+            # Cevap başlığını ekliyorum.
+            st.subheader("🤖 Asistanın Analiz Sonucu:", anchor=False)
+
+            if hazirlik.mesaj is not None:
+                # LLM'e gitmeden dönen mesajları (ör. yorum bulunamadı) özel stil ile gösteriyorum.
+                st.markdown(f'<div class="response-box">{hazirlik.mesaj}</div>', unsafe_allow_html=True)
+            else:
+                # Bulunan kanıt yorumları, cevap üretimi beklenmeden açılır kutuda gösteriyorum.
+                with st.expander(f"📚 Cevapta kullanılan yorumlar ({len(hazirlik.relevant_docs)})"):
+                    for doc in hazirlik.relevant_docs:
+                        st.markdown(f"**{doc.metadata['Airline Name']}**")
+                        st.text(doc.page_content)
+
+                # Cevap 'ozet_olustur.py'nin önceden ürettiği konu özetinden geldiyse bunu belirtiyorum.
+                if "ozet_konusu" in hazirlik.olcumler:
+                    konu_adi = KONULAR[hazirlik.olcumler["ozet_konusu"]]["tr"]
+                    st.caption(f"📋 Bu cevap '{konu_adi}' konusu için önceden hazırlanmış özetten geliyor.")
+
+                # --- Cevabı geldikçe gösteriyorum ---
+                # st.write_stream(), generator'dan gelen her parçayı anında ekrana ekler.
+                # Böylece kullanıcı ilk kelimeleri tüm cevap bitmeden görmeye başlar.
+                with st.container(border=True):
+                    st.write_stream(cevap_akisi(hazirlik))
         # Eğer havayolu seçilmemişse veya soru yazılmamışsa, kullanıcıyı uyarıyorum.
         else:
             st.warning("Lütfen hem bir havayolu seçin hem de sorunuzu yazın.")
@@ -170,6 +193,16 @@ with col2:
             """
         )
 
+    # Seçilen havayolu için önceden hazırlanmış konu özetleri varsa onları gösteriyorum.
+    # Özetler veritabanından okunuyor; burada hiçbir LLM çağrısı yapılmıyor.
+    if selected_airline:
+        hazir_ozetler = konu_ozetlerini_getir(selected_airline)
+        if hazir_ozetler:
+            with st.expander(f"📋 Hazır Konu Özetleri ({selected_airline})"):
+                for konu, kayit in hazir_ozetler:
+                    st.markdown(f"**{KONULAR[konu]['tr']}** ({kayit['yorum_sayisi']} yorum)")
+                    st.write(kayit["ozet"])
+
     # İkinci bir açılır kapanır kutu oluşturuyorum.
     with st.expander("💡 Örnek Sorular"):
         # İçine örnek soruları yazıyorum.
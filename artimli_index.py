@@ -0,0 +1,340 @@
+# --- Gerekli Kütüphaneler ---
+# Bu modül, yeni gelen yorumların indexi baştan kurmadan eklenmesini sağlar ('yorumlari_guncelle.py').
+# Global index (taban) hiç değiştirilmez; her güncelleme yanına değişmez bir sürüm olarak yazılır:
+#   - faiss_indexleri/ekler/<sürüm>/ : tabandan sonra eklenen ve değişen yorumların küçük bir YorumIndexi'si
+#     (vektörler + metinler + BM25 + anahtarlar) ve 'silinenler.npy' (tabanda silinmiş veya yenisiyle
+#     değiştirilmiş satırlar, yani mezar taşları).
+#   - manifest.json'daki 'ek_surumu' geçerli sürümü gösterir. Sürüm klasörü tamamen yazıldıktan sonra manifest
+#     atomik olarak değiştirilir; index önbelleği bunu bir sonraki sorguda fark eder. O sırada çalışan sorgular
+#     yükledikleri sürümle biter, yarım yazılmış bir sürüm hiçbir zaman okunmaz.
+# Aramada taban ve ek aynı sorguyla aranır, mezar taşları elenir ve adaylar birleştirilir (ArtimliYorumIndexi).
+# Ek ve mezar taşlarının toplamı tabanın ARTIMLI_SIKISTIRMA_ORANI'nı geçince sıkıştırma yapılır: canlı satırlar
+# vektörleri indexten okunarak (yeniden embedding yapılmadan) faiss_indexleri/tabanlar/<sürüm>/ altına yeni bir
+# taban olarak yazılır ve manifest'teki 'taban_surumu' aynı şekilde tek bir değişiklikle bu klasörü gösterir.
+#
+# Satırlar 64 bitlik anahtarlarla eşleştirilir: veri yorum kimliği taşıyorsa ('yorum_id' sütunu) kimliğin,
+# taşımıyorsa havayolu + metnin özeti. Kimlikle çalışırken metni değişen yorum yenisiyle değiştirilir (upsert);
+# içerik özetiyle çalışırken değişen bir yorum yeni yorum sayılır, eskisi ancak açıkça silinince kalkar.
+import os
+import json
+import time
+import hashlib
+
+import numpy as np
+
+from embedding_hatti import EmbeddingHatti
+from index_deposu import (
+    ANAHTAR_DOSYASI,
+    EK_KLASOR_ADI,
+    TABAN_KLASOR_ADI,
+    YorumIndexi,
+    manifest_oku,
+    manifest_yaz,
+    surumu_yayinla,
+    taban_klasoru,
+    taban_veri_ozeti,
+    yeni_surum_adi,
+)
+from parcali_index import PARCA_KLASOR_ADI, PARCA_MANIFEST_DOSYASI, parcalari_olustur
+
+# --- Genel Ayarlar ---
+SILINENLER_DOSYASI = "silinenler.npy"
+# Ekteki satırlarla mezar taşlarının toplamı tabanın bu oranını geçince güncelleme sıkıştırmayla biter.
+ARTIMLI_SIKISTIRMA_ORANI = float(os.getenv("ARTIMLI_SIKISTIRMA_ORANI", "0.1"))
+# Yayın sırasında kök manifest'ten çıkarılan, tek bir sürüme ait olmayan alanlar.
+_YAYIN_ALANLARI = ("ek_surumu", "taban_veri_ozeti", "bekleyen_veri_ozeti")
+
+
+def _ozet64(metin):
+    return int.from_bytes(hashlib.blake2b(metin.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def yorum_anahtarlari(havayolu_adlari, metinler, kimlikler=None):
+    # Her yorum için 64 bitlik anahtar: kimlikler verildiyse kimliğin, verilmediyse havayolu + metnin özeti.
+    if kimlikler is not None:
+        kaynaklar = [str(kimlik) for kimlik in kimlikler]
+    else:
+        kaynaklar = [f"{ad}\n{metin}" for ad, metin in zip(havayolu_adlari, metinler)]
+    return np.fromiter((_ozet64(kaynak) for kaynak in kaynaklar), dtype=np.uint64, count=len(kaynaklar))
+
+
+def taban_anahtarlari(klasor, depo):
+    # Index oluşturulurken yazılan anahtarlar; eski indexlerde yoksa metinlerden (içerik özeti) hesaplanır.
+    try:
+        return np.load(os.path.join(klasor, ANAHTAR_DOSYASI), mmap_mode="r")
+    except FileNotFoundError:
+        return yorum_anahtarlari(depo.havayolu_adlari(), depo.metinler())
+
+
+def _tum_vektorler(yorum_indexi):
+    n = len(yorum_indexi.depo)
+    if n == 0:
+        return np.zeros((0, yorum_indexi.index.d), dtype=np.float32)
+    return yorum_indexi.index.reconstruct_n(0, n)
+
+
+# --- Taban + Ek Araması ---
+class ArtimliYorumIndexi(YorumIndexi):
+    # Değişmeyen global index (taban), artımlı güncellemelerle gelen yorumların indexi (ek) ve tabandaki
+    # mezar taşları. Dışarıya tek bir YorumIndexi gibi görünür: satır numaraları önce tabanın [0, N)
+    # satırları, sonra ekin satırlarıdır (N + i).
+
+    def __init__(self, taban, ek, silinenler, surum=None):
+        super().__init__(taban.index, taban.depo, taban.sozcuksel, taban.parcali)
+        self.taban = taban
+        self.ek = ek
+        self.silinenler = np.asarray(silinenler, dtype=np.int64)  # sıralı taban satırları
+        self.surum = surum
+        self._ek_baslangici = len(taban.depo)
+        adlar = set(taban.havayollari) | set(ek.havayollari)
+        self._havayollari = sorted(ad for ad in adlar if self.yorum_sayisi([ad]))
+
+    @classmethod
+    def yukle(cls, klasor, surum, taban):
+        ek_klasoru = os.path.join(klasor, EK_KLASOR_ADI, surum)
+        ek = YorumIndexi.yukle(ek_klasoru)
+        silinenler = np.load(os.path.join(ek_klasoru, SILINENLER_DOSYASI))
+        print(f"-> Artımlı güncelleme sürümü {surum} yüklendi ({len(ek.depo)} eklenen, {len(silinenler)} silinen yorum).")
+        return cls(taban, ek, silinenler, surum)
+
+    @property
+    def havayollari(self):
+        return self._havayollari
+
+    def yorum_sayisi(self, havayollari=None):
+        if havayollari is None:
+            return len(self.taban.depo) - len(self.silinenler) + len(self.ek.depo)
+        return (self.taban.yorum_sayisi(havayollari) - self._silinen_sayisi(havayollari)
+                + self.ek.yorum_sayisi(havayollari))
+
+    def manifest_bilgisi(self):
+        return {"havayollari": self.havayollari, "yorum_sayisi": self.yorum_sayisi()}
+
+    def isindir(self, havayollari):
+        self.taban.isindir([ad for ad in havayollari if ad in self.taban.araliklar])
+        self.ek.isindir([ad for ad in havayollari if ad in self.ek.araliklar])
+
+    def _silinen_sayisi(self, havayollari):
+        # Tabanda bu havayollarının aralığına düşen mezar taşı sayısı (None: hepsi).
+        if havayollari is None:
+            return len(self.silinenler)
+        toplam = 0
+        for ad in havayollari:
+            baslangic, bitis = self.taban.depo.aralik(ad)
+            toplam += int(np.searchsorted(self.silinenler, bitis) - np.searchsorted(self.silinenler, baslangic))
+        return toplam
+
+    def _canli_mi(self, satirlar):
+        return ~np.isin(np.asarray(satirlar, dtype=np.int64), self.silinenler)
+
+    def _adaylar(self, x, aday_sayisi, havayollari, sorgu_metni, bm25_sayisi):
+        # Taban ve ek aynı sorguyla aranır. Silinen satırlar elenince aday eksik kalmasın diye tabandan, seçilen
+        # aralıktaki mezar taşı sayısı kadar fazla aday çekiliyor (sıkıştırma bu sayıyı sınırlı tutar).
+        # Vektör mesafeleri iki indexte aynı ölçekte olduğu için adaylar mesafeye göre birleşir. BM25 puanları
+        # her bölümün kendi istatistikleriyle hesaplanır; ek için bu yaklaşık, sıkıştırmadan sonra birebirdir.
+        vektor_sonuclari, bm25_gruplari = [], {}
+        taban_adlari = None if havayollari is None else [ad for ad in havayollari if ad in self.taban.araliklar]
+        if taban_adlari is None or taban_adlari:
+            fazla = self._silinen_sayisi(taban_adlari)
+            vektor, bm25 = self.taban._adaylar(x, aday_sayisi + fazla, taban_adlari, sorgu_metni, bm25_sayisi + fazla)
+            canli = self._canli_mi([satir for _, satir in vektor])
+            vektor_sonuclari += [aday for aday, canli_mi in zip(vektor, canli) if canli_mi]
+            for ad, sonuclar in bm25.items():
+                canli = self._canli_mi([satir for satir, _ in sonuclar])
+                bm25_gruplari[ad] = [sonuc for sonuc, canli_mi in zip(sonuclar, canli) if canli_mi]
+
+        ek_adlari = None if havayollari is None else [ad for ad in havayollari if ad in self.ek.araliklar]
+        if (ek_adlari is None and len(self.ek.depo)) or ek_adlari:
+            vektor, bm25 = self.ek._adaylar(x, aday_sayisi, ek_adlari, sorgu_metni, bm25_sayisi)
+            vektor_sonuclari += [(mesafe, self._ek_baslangici + satir) for mesafe, satir in vektor]
+            for ad, sonuclar in bm25.items():
+                bm25_gruplari[ad] = sorted(bm25_gruplari.get(ad, []) +
+                                           [(self._ek_baslangici + satir, puan) for satir, puan in sonuclar],
+                                           key=lambda sonuc: -sonuc[1])
+        return sorted(vektor_sonuclari)[:aday_sayisi], {ad: sonuclar[:bm25_sayisi] for ad, sonuclar in bm25_gruplari.items()}
+
+    def _bolum(self, satir):
+        satir = int(satir)
+        if satir >= self._ek_baslangici:
+            return self.ek, satir - self._ek_baslangici
+        return self.taban, satir
+
+    def _metin(self, satir):
+        bolum, satir = self._bolum(satir)
+        return bolum._metin(satir)
+
+    def _havayolu(self, satir):
+        bolum, satir = self._bolum(satir)
+        return bolum._havayolu(satir)
+
+    def _vektor(self, satir):
+        bolum, satir = self._bolum(satir)
+        return bolum._vektor(satir)
+
+
+# --- Güncelleme ---
+class IndexGuncelleyici:
+    # Index klasörünün güncel sürümünü açar, gelen yorumları anahtarları üzerinden mevcut satırlarla eşleştirir.
+    # hazirla() yeni sürümü (ek veya sıkıştırılmış taban) kendi klasörüne yazıp onu gösteren manifest'i döndürür;
+    # yayinla() bu manifest'i tek bir atomik değişiklikle yayınlar. Arada çağıran taraf veri dosyasını
+    # değiştirebilir, böylece yayınlanan manifest hiçbir zaman henüz yerinde olmayan bir veriyi göstermez.
+    # Aynı klasörde aynı anda tek bir güncelleyici çalışmalıdır (yorumlari_guncelle.py bir kilit dosyası tutar).
+
+    def __init__(self, klasor):
+        self.klasor = klasor
+        self.manifest = manifest_oku(klasor)
+        if self.manifest is None:
+            raise FileNotFoundError(f"'{klasor}' altında index bulunamadı.")
+        self.taban_klasoru = taban_klasoru(klasor, self.manifest)
+        self.taban = YorumIndexi.yukle(self.taban_klasoru)
+        self.ek = None
+        self.silinenler = np.zeros(0, dtype=np.int64)
+        ek_anahtarlari = np.zeros(0, dtype=np.uint64)
+        if self.manifest.get("ek_surumu"):
+            ek_klasoru = os.path.join(klasor, EK_KLASOR_ADI, self.manifest["ek_surumu"])
+            self.ek = YorumIndexi.yukle(ek_klasoru)
+            self.silinenler = np.load(os.path.join(ek_klasoru, SILINENLER_DOSYASI))
+            ek_anahtarlari = np.load(os.path.join(ek_klasoru, ANAHTAR_DOSYASI))
+        self.taban_anahtarlari = np.asarray(taban_anahtarlari(self.taban_klasoru, self.taban.depo))
+        self.ek_anahtarlari = ek_anahtarlari
+        # Anahtarla satır bulmak için her bölümün anahtarları sıralanıyor (ikili arama): [(sıra, sıralı anahtarlar), ...]
+        self._aramalar = []
+        for anahtarlar in (self.taban_anahtarlari, ek_anahtarlari):
+            sira = np.argsort(anahtarlar, kind="stable")
+            self._aramalar.append((sira, anahtarlar[sira]))
+        self._eski_silinenler = set(self.silinenler.tolist())
+        self.silinecek_taban = set()
+        self.silinecek_ek = set()
+        self.eklenecekler = {}             # anahtar -> (havayolu, metin, kimlik); yeni veya metni değişen yorumlar
+        self.cikarilan_anahtarlar = set()  # mevcut satırı silinen veya değiştirilen anahtarlar
+        self.degismeyen = 0
+
+    def _canli_satirlar(self, anahtar):
+        # Anahtarın henüz silinmemiş satırları [(bölüm no, satır), ...]; bölüm 0 taban, 1 ek.
+        satirlar = []
+        # Python int'i uint64 olarak veriyorum; aksi halde numpy karşılaştırmayı float64'e çevirip hassasiyet kaybeder.
+        anahtar = np.uint64(anahtar)
+        for bolum, (sira, sirali) in enumerate(self._aramalar):
+            ilk = int(np.searchsorted(sirali, anahtar, side="left"))
+            son = int(np.searchsorted(sirali, anahtar, side="right"))
+            for satir in sira[ilk:son].tolist():
+                if bolum == 0 and (satir in self._eski_silinenler or satir in self.silinecek_taban):
+                    continue
+                if bolum == 1 and satir in self.silinecek_ek:
+                    continue
+                satirlar.append((bolum, satir))
+        return satirlar
+
+    def _icerik(self, bolum, satir):
+        depo = (self.taban if bolum == 0 else self.ek).depo
+        return depo.havayolu(satir), depo.metin(satir)
+
+    def _sil(self, anahtar, satirlar):
+        for bolum, satir in satirlar:
+            (self.silinecek_taban if bolum == 0 else self.silinecek_ek).add(satir)
+        if satirlar:
+            self.cikarilan_anahtarlar.add(int(anahtar))
+
+    def yorumlari_ekle(self, havayolu_adlari, metinler, kimlikler=None):
+        # Yeni yorumlar eklenir, metni değişenlerin eski satırı silinir, birebir aynı olanlar atlanır.
+        # Aynı anahtar bu güncellemede birden fazla kez gelirse sonuncusu geçerlidir.
+        anahtarlar = yorum_anahtarlari(havayolu_adlari, metinler, kimlikler)
+        kimlikler = [None] * len(metinler) if kimlikler is None else kimlikler
+        for anahtar, ad, metin, kimlik in zip(anahtarlar.tolist(), havayolu_adlari, metinler, kimlikler):
+            if anahtar not in self.eklenecekler:
+                mevcut = self._canli_satirlar(anahtar)
+                if [self._icerik(*satir) for satir in mevcut] == [(ad, metin)]:
+                    self.degismeyen += 1
+                    continue
+                self._sil(anahtar, mevcut)
+            self.eklenecekler[anahtar] = (ad, metin, kimlik)
+
+    def yorumlari_sil(self, anahtarlar):
+        for anahtar in np.asarray(anahtarlar, dtype=np.uint64).tolist():
+            self.eklenecekler.pop(anahtar, None)
+            self._sil(anahtar, self._canli_satirlar(anahtar))
+
+    def degisiklik_var_mi(self):
+        return bool(self.eklenecekler or self.silinecek_taban or self.silinecek_ek)
+
+    def ozet(self):
+        guncellenen = sum(1 for anahtar in self.eklenecekler if anahtar in self.cikarilan_anahtarlar)
+        return {"eklenen": len(self.eklenecekler) - guncellenen, "guncellenen": guncellenen,
+                "silinen": len(self.cikarilan_anahtarlar) - guncellenen, "degismeyen": self.degismeyen}
+
+    def hazirla(self, embeddings, veri_ozeti, sikistir=False):
+        # Sadece yeni ve değişen yorumlar embedding'e gönderilir; eski ekin kalan satırlarının vektörleri
+        # indexten okunur. (yayınlanacak manifest, sıkıştırma yapıldı mı) döner; manifest henüz değişmez.
+        eklenecekler = list(self.eklenecekler.items())
+        metinler = [metin for _, (_, metin, _) in eklenecekler]
+        boyut = self.taban.index.d
+        vektorler = EmbeddingHatti(embeddings).metinleri_embed_et(metinler) if metinler \
+            else np.zeros((0, boyut), dtype=np.float32)
+        adlar = [ad for _, (ad, _, _) in eklenecekler]
+        anahtarlar = np.fromiter((anahtar for anahtar, _ in eklenecekler), dtype=np.uint64, count=len(eklenecekler))
+
+        if self.ek is not None:
+            kalan = np.array([i for i in range(len(self.ek.depo)) if i not in self.silinecek_ek], dtype=np.int64)
+            vektorler = np.vstack([_tum_vektorler(self.ek)[kalan], vektorler])
+            metinler = [self.ek.depo.metin(i) for i in kalan] + metinler
+            adlar = [self.ek.depo.havayolu(i) for i in kalan] + adlar
+            anahtarlar = np.concatenate([self.ek_anahtarlari[kalan], anahtarlar])
+        silinenler = np.union1d(self.silinenler, np.fromiter(self.silinecek_taban, dtype=np.int64)).astype(np.int64)
+
+        if sikistir or len(metinler) + len(silinenler) > ARTIMLI_SIKISTIRMA_ORANI * len(self.taban.depo):
+            return self._sikistir(vektorler, metinler, adlar, anahtarlar, silinenler, veri_ozeti), True
+        return self._ek_yaz(vektorler, metinler, adlar, anahtarlar, silinenler, veri_ozeti), False
+
+    def yayinla(self, manifest):
+        # Manifest değiştiği anda yeni sorgular yeni sürümü görür; eski sürümler ardından temizlenir.
+        surumu_yayinla(self.klasor, manifest, self.manifest)
+        print(f"-> Index sürümü yayınlandı (taban: {manifest.get('taban_surumu') or '-'}, "
+              f"ek: {manifest.get('ek_surumu') or '-'}).")
+
+    def _ek_yaz(self, vektorler, metinler, adlar, anahtarlar, silinenler, veri_ozeti):
+        surum = yeni_surum_adi()
+        hedef = os.path.join(self.klasor, EK_KLASOR_ADI, surum)
+        gecici = hedef + ".yeni"
+        ek = YorumIndexi.vektorlerden_olustur(vektorler, metinler, adlar, anahtarlar)
+        ek.kaydet(gecici)
+        np.save(os.path.join(gecici, SILINENLER_DOSYASI), silinenler)
+        os.replace(gecici, hedef)
+        print(f"-> Ek sürümü {surum} yazıldı ({len(metinler)} ek satır, {len(silinenler)} mezar taşı).")
+
+        manifest = {anahtar: deger for anahtar, deger in self.manifest.items() if anahtar not in _YAYIN_ALANLARI}
+        manifest.update(veri_ozeti=veri_ozeti, taban_veri_ozeti=taban_veri_ozeti(self.manifest), ek_surumu=surum)
+        manifest.update(ArtimliYorumIndexi(self.taban, ek, silinenler).manifest_bilgisi())
+        return manifest
+
+    def _sikistir(self, ek_vektorleri, ek_metinleri, ek_adlari, ek_anahtarlari, silinenler, veri_ozeti):
+        # Tabanın canlı satırları ve ek tek bir yeni tabanda birleşir. Yeni taban kendi sürüm klasörüne
+        # (kendi manifest'iyle) yazılır, eskisine dokunulmaz. Parçalı bir indexse parçalar da aynı ayarlarla
+        # yeni klasörde üretilir.
+        baslangic = time.time()
+        canli = np.setdiff1d(np.arange(len(self.taban.depo), dtype=np.int64), silinenler)
+        vektorler = np.vstack([_tum_vektorler(self.taban)[canli], ek_vektorleri])
+        metinler = [self.taban.depo.metin(i) for i in canli.tolist()] + ek_metinleri
+        adlar = [self.taban.depo.havayolu(i) for i in canli.tolist()] + ek_adlari
+        anahtarlar = np.concatenate([self.taban_anahtarlari[canli], ek_anahtarlari])
+        yeni = YorumIndexi.vektorlerden_olustur(vektorler, metinler, adlar, anahtarlar)
+
+        surum = yeni_surum_adi()
+        hedef = os.path.join(self.klasor, TABAN_KLASOR_ADI, surum)
+        gecici = hedef + ".yeni"
+        yeni.kaydet(gecici)
+        manifest = {anahtar: deger for anahtar, deger in self.manifest.items()
+                    if anahtar not in _YAYIN_ALANLARI + ("taban_surumu",)}
+        manifest["veri_ozeti"] = veri_ozeti
+        manifest.update(yeni.manifest_bilgisi())
+        manifest_yaz(gecici, manifest)
+        try:
+            with open(os.path.join(self.taban_klasoru, PARCA_KLASOR_ADI, PARCA_MANIFEST_DOSYASI), encoding="utf-8") as f:
+                parca_bilgisi = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            parca_bilgisi = None
+        if parca_bilgisi is not None:
+            parcalari_olustur(gecici, parca_bilgisi["parca_sayisi"], parca_bilgisi["tur"])
+        os.replace(gecici, hedef)
+        print(f"-> Index sıkıştırıldı: {len(yeni.depo)} yorum yeni tabana ({surum}) yazıldı "
+              f"({time.time() - baslangic:.1f} sn).")
+        return dict(manifest, taban_surumu=surum)
@@ -0,0 +1,145 @@
+# --- Gerekli Kütüphaneler ---
+# Bu modül, LLM'e gönderilecek kanıt metnini (context) bir token bütçesine sığacak şekilde derler.
+# Bazı yorumlar çok uzun olduğu için kanıtları olduğu gibi birleştirmek istem boyutunu ve Gemini'nin
+# cevap süresini sorgudan sorguya çok değiştiriyordu. Adımlar:
+#   1. Kanıtlar MMR mantığıyla sıralanır: arama sırası (alaka) ile daha önce seçilen kanıtlara
+#      benzerlik (çeşitlilik) dengelenir. Vektörü seçilmiş bir kanıta çok yakın olan kanıt (ör. aynı
+#      yorumun kopyası) tamamen atılır. Vektörler indexte zaten var; yeni embedding çağrısı yapılmaz.
+#   2. Her yorum cümlelere bölünür; cümleler arama sorusunun terimlerini içerme sayısına göre puanlanır.
+#   3. Bütçe sırayla dağıtılır: önce her kanıtın başlığı ve en iyi cümlesi, sonra sıradaki en iyi
+#      cümleler. Seçilen cümleler yorumdaki orijinal sıralarıyla, atlanan yerler "…" ile yazılır.
+# Tüm kanıtlar bütçeye zaten sığıyorsa metin hiç kısaltılmaz.
+import os
+import re
+
+import numpy as np
+
+from sozcuksel_index import terimlere_ayir
+
+# --- Genel Ayarlar ---
+# Kanıt metni için token bütçesi (0: kapalı, kanıtlar olduğu gibi gönderilir).
+BAGLAM_TOKEN_BUTCESI = int(os.getenv("BAGLAM_TOKEN_BUTCESI", "700"))
+# Vektör benzerliği bu değerin üstündeki kanıtlar tekrar sayılıp atılır.
+BAGLAM_TEKRAR_ESIGI = float(os.getenv("BAGLAM_TEKRAR_ESIGI", "0.97"))
+# MMR'da alakanın ağırlığı (1: sadece arama sırası, 0: sadece çeşitlilik).
+MMR_LAMBDA = 0.7
+# Token sayısı tahmini (Gemini için İngilizce metinde ~4 karakter = 1 token).
+KARAKTER_BASINA_TOKEN = 4
+KANIT_AYRACI = "\n\n---\n\n"
+
+_CUMLE_SONU = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def tahmini_token(metin):
+    return len(metin) // KARAKTER_BASINA_TOKEN
+
+
+def kanit_metni(doc):
+    return f"[{doc.metadata['Airline Name']}] {doc.page_content}"
+
+
+def _bol(metin):
+    # 'veri_hazırla.py' yorumları "BASLIK: ...\nYORUM: ..." biçiminde birleştiriyor.
+    baslik, govde = "", metin
+    if metin.startswith("BASLIK: ") and "\nYORUM: " in metin:
+        baslik, govde = metin[len("BASLIK: "):].split("\nYORUM: ", 1)
+    cumleler = [cumle.strip() for cumle in _CUMLE_SONU.split(govde) if cumle.strip()]
+    return baslik.strip(), cumleler
+
+
+def mmr_sirala(vektorler, tekrar_esigi=BAGLAM_TEKRAR_ESIGI, mmr_lambda=MMR_LAMBDA):
+    # vektorler arama sırasındaki kanıtlara aittir. (sıra, atılan indisler) döndürür.
+    v = np.asarray(vektorler, dtype=np.float32)
+    v = v / (np.linalg.norm(v, axis=1, keepdims=True) + 1e-12)
+    n = len(v)
+    alaka = 1.0 - np.arange(n) / max(n, 1)
+    benzerlik = v @ v.T
+    secilen, atilan, kalan = [], [], list(range(n))
+    while kalan:
+        if secilen:
+            en_yakin = benzerlik[np.ix_(kalan, secilen)].max(axis=1)
+        else:
+            en_yakin = np.zeros(len(kalan))
+        j = int(np.argmax(mmr_lambda * alaka[kalan] - (1 - mmr_lambda) * en_yakin))
+        aday = kalan.pop(j)
+        if secilen and en_yakin[j] >= tekrar_esigi:
+            atilan.append(aday)
+        else:
+            secilen.append(aday)
+    return secilen, atilan
+
+
+def baglam_olustur(dokumanlar, vektorler, sorgu_metni, token_butcesi=BAGLAM_TOKEN_BUTCESI):
+    # (context metni, bilgi) döndürür. bilgi: karakter sayıları, sıkıştırma oranı, atılan kanıt sayısı.
+    # vektorler None ise (ör. çevrimdışı özet üretimi) MMR ve kopya ayıklama atlanır.
+    tam_metin = KANIT_AYRACI.join(kanit_metni(doc) for doc in dokumanlar)
+    bilgi = {"baglam_karakter_once": len(tam_metin), "baglam_atilan_kanit": 0}
+
+    if vektorler is not None and len(dokumanlar) > 1:
+        sira, atilan = mmr_sirala(vektorler)
+    else:
+        sira, atilan = list(range(len(dokumanlar))), []
+    bilgi["baglam_atilan_kanit"] = len(atilan)
+    if not token_butcesi or (not atilan and tahmini_token(tam_metin) <= token_butcesi):
+        metin = tam_metin if not atilan else KANIT_AYRACI.join(kanit_metni(dokumanlar[i]) for i in sorted(sira))
+        bilgi.update(baglam_karakter=len(metin), baglam_sikistirma=len(metin) / max(len(tam_metin), 1))
+        return metin, bilgi
+
+    sorgu_terimleri = set(terimlere_ayir(sorgu_metni))
+    kalan_karakter = token_butcesi * KARAKTER_BASINA_TOKEN
+    gorulen = set()
+    adaylar = []  # her kanıt için (kanıt, başlık, cümleler, puana göre cümle sırası)
+    for i in sira:
+        doc = dokumanlar[i]
+        baslik, cumleler = _bol(doc.page_content)
+        puanlar = [len(sorgu_terimleri.intersection(terimlere_ayir(cumle))) for cumle in cumleler]
+        # Puanı eşit cümlelerde öndeki kazanır; farklı yorumlarda birebir tekrarlanan cümleler tek sayılır.
+        sirali = []
+        for j in sorted(range(len(cumleler)), key=lambda j: (-puanlar[j], j)):
+            anahtar = cumleler[j].lower()
+            if anahtar not in gorulen:
+                gorulen.add(anahtar)
+                sirali.append(j)
+        adaylar.append((doc, baslik, cumleler, sirali))
+        kalan_karakter -= len(doc.metadata["Airline Name"]) + 3 + len(KANIT_AYRACI)
+        if baslik:
+            kalan_karakter -= len(baslik) + len("BASLIK: \nYORUM: ")
+
+    # Tur tur dağıtım: her turda her kanıta sıradaki en iyi cümlesini ekliyorum.
+    secimler = [set() for _ in adaylar]
+    tur = 0
+    while kalan_karakter > 0 and any(tur < len(sirali) for _, _, _, sirali in adaylar):
+        for secim, (_, _, cumleler, sirali) in zip(secimler, adaylar):
+            if tur >= len(sirali):
+                continue
+            cumle = cumleler[sirali[tur]]
+            if len(cumle) + 1 > kalan_karakter:
+                if tur == 0 and kalan_karakter > 40:
+                    # İlk cümle bile sığmıyorsa kelime sınırından kesiyorum; her kanıttan bir şey kalsın.
+                    cumleler[sirali[tur]] = cumle[:kalan_karakter].rsplit(" ", 1)[0] + " …"
+                    secim.add(sirali[tur])
+                    kalan_karakter = 0
+                continue
+            secim.add(sirali[tur])
+            kalan_karakter -= len(cumle) + 1
+        tur += 1
+
+    parcalar = []
+    for secim, (doc, baslik, cumleler, _) in zip(secimler, adaylar):
+        govde, onceki = [], -1
+        for j in sorted(secim):
+            if j != onceki + 1:
+                govde.append("…")
+            govde.append(cumleler[j])
+            onceki = j
+        if onceki != len(cumleler) - 1 and govde:
+            govde.append("…")
+        if not govde and not baslik:
+            continue
+        icerik = " ".join(govde)
+        if baslik:
+            icerik = f"BASLIK: {baslik}\nYORUM: {icerik}" if govde else f"BASLIK: {baslik}"
+        parcalar.append(f"[{doc.metadata['Airline Name']}] {icerik}")
+    metin = KANIT_AYRACI.join(parcalar)
+    bilgi.update(baglam_karakter=len(metin), baglam_sikistirma=len(metin) / max(len(tam_metin), 1))
+    return metin, bilgi
@@ -0,0 +1,144 @@
+# --- Gerekli Kütüphaneler ---
+# Bu modül, daha önce üretilmiş cevapları saklayıp aynı veya anlamca çok yakın
+# sorular tekrar geldiğinde LLM'e gitmeden döndüren anlamsal cevap önbelleğini sağlar.
+# Kayıtlar SQLite'ta tutulur; tüm Streamlit süreçleri aynı dosyayı paylaşır.
+# Okumalar her zaman sürüme göre süzülür; dosyayı paylaşan süreçler bir süre farklı sürümlerde olabilir
+# (ör. biri yeni veriyi görmüşken diğeri henüz görmemişken), bu yüzden bir süreç başka sürümlerin kayıtlarını
+# ancak TTL boyunca hiç kullanılmadıklarında siler.
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+import numpy as np
+
+from ceviri import soru_normallestir
+
+# --- Genel Ayarlar ---
+VARSAYILAN_ONBELLEK_DOSYASI = os.getenv("CEVAP_ONBELLEK_DOSYASI", "cevap_onbellegi.sqlite")
+# Kosinüs benzerliği bu eşiği geçen soru aynı soru sayılır.
+VARSAYILAN_BENZERLIK_ESIGI = float(os.getenv("CEVAP_ONBELLEK_ESIK", "0.95"))
+VARSAYILAN_TTL_SN = float(os.getenv("CEVAP_ONBELLEK_TTL_SN", str(7 * 24 * 3600)))
+VARSAYILAN_MAKS_KAYIT = int(os.getenv("CEVAP_ONBELLEK_MAKS_KAYIT", "5000"))
+
+
+def havayolu_anahtari(havayollari):
+    # Tek havayolu, havayolu listesi (sırası önemsiz) veya tüm havayolları (None) için sabit bir anahtar.
+    if havayollari is None:
+        return "*"
+    return "|".join(sorted(havayollari))
+
+
+def onbellek_surumu(*parcalar):
+    # Veri özeti, prompt şablonu ve model adından kısa bir sürüm anahtarı üretir.
+    # Bunlardan biri değişince eski cevaplar geçersiz olur.
+    return hashlib.sha256("\0".join(parcalar).encode("utf-8")).hexdigest()[:16]
+
+
+class CevapOnbellegi:
+    def __init__(self, dosya_yolu=VARSAYILAN_ONBELLEK_DOSYASI, esik=VARSAYILAN_BENZERLIK_ESIGI,
+                 ttl_sn=VARSAYILAN_TTL_SN, maks_kayit=VARSAYILAN_MAKS_KAYIT, saat=time.time):
+        # saat: şimdiki zamanı saniye olarak veren fonksiyon (testlerde TTL'i beklemeden denemek için).
+        self.esik = esik
+        self.ttl_sn = ttl_sn
+        self.maks_kayit = maks_kayit
+        self._saat = saat
+        self._kilit = threading.Lock()
+        self._son_surum = None
+        self._baglanti = sqlite3.connect(dosya_yolu, timeout=30, check_same_thread=False)
+        self._baglanti.execute("PRAGMA journal_mode=WAL")
+        self._baglanti.execute("""
+            CREATE TABLE IF NOT EXISTS cevaplar (
+                id INTEGER PRIMARY KEY,
+                havayolu TEXT NOT NULL,
+                dil TEXT NOT NULL,
+                normal_soru TEXT NOT NULL,
+                vektor BLOB NOT NULL,
+                cevap TEXT NOT NULL,
+                kanitlar TEXT NOT NULL,
+                surum TEXT NOT NULL,
+                olusturma REAL NOT NULL,
+                son_erisim REAL NOT NULL
+            )""")
+        self._baglanti.execute("CREATE INDEX IF NOT EXISTS ix_grup ON cevaplar (havayolu, dil, surum)")
+        self._baglanti.execute("CREATE INDEX IF NOT EXISTS ix_soru ON cevaplar (havayolu, normal_soru, surum)")
+        self._baglanti.commit()
+
+    def _surum_kontrolu(self, surum):
+        # Sürüm değiştiyse (yeni veri veya prompt) TTL boyunca kullanılmamış diğer sürüm kayıtlarını siliyorum.
+        # Hâlâ kullanılanlar, aynı dosyayı o sürümle okuyan başka bir sürece ait olabilir; onlar TTL ve
+        # kayıt sınırıyla (ekle) zamanla düşer.
+        if surum != self._son_surum:
+            self._baglanti.execute("DELETE FROM cevaplar WHERE surum != ? AND son_erisim <= ?",
+                                   (surum, self._saat() - self.ttl_sn))
+            self._baglanti.commit()
+            self._son_surum = surum
+
+    def _kayit_dondur(self, satir_id, cevap, kanitlar, dil):
+        # (cevap, kanıtlar, cevabın üretildiği sorunun dili) döner.
+        self._baglanti.execute("UPDATE cevaplar SET son_erisim = ? WHERE id = ?", (self._saat(), satir_id))
+        self._baglanti.commit()
+        return cevap, json.loads(kanitlar), dil
+
+    def tam_eslesme(self, havayolu, soru, surum):
+        # Embedding hesaplamadan, normalleştirilmiş soru metniyle birebir eşleşme arar.
+        # Ağ çağrısı yapılmaz; tekrar eden sorular milisaniyeler içinde cevaplanır. Dil tespiti de atlandığı için
+        # sorunun dili kayıtla birlikte döner.
+        with self._kilit:
+            self._surum_kontrolu(surum)
+            satir = self._baglanti.execute(
+                "SELECT id, cevap, kanitlar, dil FROM cevaplar WHERE havayolu = ? AND normal_soru = ? AND surum = ? "
+                "AND olusturma > ? ORDER BY olusturma DESC LIMIT 1",
+                (havayolu, soru_normallestir(soru), surum, self._saat() - self.ttl_sn),
+            ).fetchone()
+            if satir is None:
+                return None
+            return self._kayit_dondur(*satir)
+
+    def benzer_bul(self, havayolu, dil, sorgu_vektoru, surum):
+        # Aynı havayolu ve cevap dilindeki kayıtlar arasında kosinüs benzerliği en yüksek olanı bulur.
+        with self._kilit:
+            self._surum_kontrolu(surum)
+            satirlar = self._baglanti.execute(
+                "SELECT id, vektor, cevap, kanitlar FROM cevaplar WHERE havayolu = ? AND dil = ? AND surum = ? "
+                "AND olusturma > ?",
+                (havayolu, dil, surum, self._saat() - self.ttl_sn),
+            ).fetchall()
+            if not satirlar:
+                return None
+            matris = np.stack([np.frombuffer(satir[1], dtype=np.float32) for satir in satirlar])
+            sorgu = np.asarray(sorgu_vektoru, dtype=np.float32)
+            benzerlikler = matris @ sorgu / (np.linalg.norm(matris, axis=1) * np.linalg.norm(sorgu) + 1e-12)
+            en_iyi = int(np.argmax(benzerlikler))
+            if benzerlikler[en_iyi] < self.esik:
+                return None
+            satir_id, _, cevap, kanitlar = satirlar[en_iyi]
+            return self._kayit_dondur(satir_id, cevap, kanitlar, dil)
+
+    def ekle(self, havayolu, dil, soru, sorgu_vektoru, cevap, kanitlar, surum):
+        # kanitlar: [{"Airline Name": ..., "page_content": ...}, ...] (arayüzde tekrar göstermek için)
+        simdi = self._saat()
+        with self._kilit:
+            self._surum_kontrolu(surum)
+            self._baglanti.execute(
+                "INSERT INTO cevaplar (havayolu, dil, normal_soru, vektor, cevap, kanitlar, surum, olusturma, son_erisim) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (havayolu, dil, soru_normallestir(soru), np.asarray(sorgu_vektoru, dtype=np.float32).tobytes(),
+                 cevap, json.dumps(kanitlar, ensure_ascii=False), surum, simdi, simdi),
+            )
+            # Süresi dolanları ve boyut sınırını aşan en az kullanılanları atıyorum.
+            self._baglanti.execute("DELETE FROM cevaplar WHERE olusturma <= ?", (simdi - self.ttl_sn,))
+            self._baglanti.execute(
+                "DELETE FROM cevaplar WHERE id IN (SELECT id FROM cevaplar ORDER BY son_erisim DESC LIMIT -1 OFFSET ?)",
+                (self.maks_kayit,),
+            )
+            self._baglanti.commit()
+
+    def kayit_sayisi(self, surum=None):
+        # Dosyadaki kayıt sayısı; surum verilirse sadece o sürümün kayıtları (süresi dolmuş olanlar dahil).
+        with self._kilit:
+            if surum is None:
+                return self._baglanti.execute("SELECT COUNT(*) FROM cevaplar").fetchone()[0]
+            return self._baglanti.execute("SELECT COUNT(*) FROM cevaplar WHERE surum = ?", (surum,)).fetchone()[0]
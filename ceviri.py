@@ -0,0 +1,89 @@
+# --- Gerekli Kütüphaneler ---
+# Bu modül, Türkçe soruların arama için İngilizce'ye çevrilmesini önbellekli hale getirir.
+# Aynı (normalleştirilmiş) soru ikinci kez geldiğinde LLM'e gidilmez: önce hafızadaki
+# LRU önbelleğe, sonra diskteki SQLite önbelleğe bakılır.
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+# --- Genel Ayarlar ---
+VARSAYILAN_ONBELLEK_DOSYASI = os.getenv("CEVIRI_ONBELLEK_DOSYASI", "ceviri_onbellegi.sqlite")
+VARSAYILAN_LRU_BOYUTU = int(os.getenv("CEVIRI_LRU_BOYUTU", "1024"))
+# Çeviri istemi değişirse eski çevirilerin kullanılmaması için anahtara sürüm ekliyorum.
+CEVIRI_ISTEMI_SURUMU = "1"
+
+
+def soru_normallestir(soru):
+    # Türkçe'ye uygun küçük harfe çevirme (I -> ı, İ -> i), boşlukları sadeleştirme ve
+    # sondaki noktalama işaretlerini atma. "Yemekler nasıldı?" ile "yemekler  nasıldı" aynı anahtarı alır.
+    metin = soru.replace("I", "ı").replace("İ", "i").lower()
+    metin = re.sub(r"\s+", " ", metin).strip()
+    return metin.rstrip("?!.,;: ")
+
+
+class CeviriKatmani:
+    # LLM ile yapılan Türkçe -> İngilizce çeviriyi iki katmanlı önbellekle saran sınıf.
+    # cevir() her zaman (çeviri, yol, süre) döndürür; yol: 'lru', 'disk', 'llm' veya 'hata'.
+
+    def __init__(self, llm, model_adi, dosya_yolu=VARSAYILAN_ONBELLEK_DOSYASI, lru_boyutu=VARSAYILAN_LRU_BOYUTU):
+        self.llm = llm
+        self.model_adi = model_adi
+        self.lru_boyutu = lru_boyutu
+        self._lru = OrderedDict()
+        self._kilit = threading.Lock()
+        self._baglanti = sqlite3.connect(dosya_yolu, timeout=30, check_same_thread=False)
+        self._baglanti.execute("PRAGMA journal_mode=WAL")
+        self._baglanti.execute(
+            "CREATE TABLE IF NOT EXISTS ceviriler (anahtar TEXT PRIMARY KEY, ceviri TEXT NOT NULL)"
+        )
+        self._baglanti.commit()
+
+    def _anahtar(self, soru):
+        return hashlib.sha256(
+            f"{self.model_adi}\0{CEVIRI_ISTEMI_SURUMU}\0{soru_normallestir(soru)}".encode("utf-8")
+        ).hexdigest()
+
+    def _lru_ekle(self, anahtar, ceviri):
+        self._lru[anahtar] = ceviri
+        self._lru.move_to_end(anahtar)
+        while len(self._lru) > self.lru_boyutu:
+            self._lru.popitem(last=False)
+
+    def onbellekten_getir(self, soru):
+        anahtar = self._anahtar(soru)
+        with self._kilit:
+            if anahtar in self._lru:
+                self._lru.move_to_end(anahtar)
+                return self._lru[anahtar], "lru"
+            satir = self._baglanti.execute("SELECT ceviri FROM ceviriler WHERE anahtar = ?", (anahtar,)).fetchone()
+            if satir is not None:
+                self._lru_ekle(anahtar, satir[0])
+                return satir[0], "disk"
+        return None, None
+
+    def cevir(self, soru):
+        baslangic = time.perf_counter()
+        ceviri, yol = self.onbellekten_getir(soru)
+        if ceviri is not None:
+            return ceviri, yol, time.perf_counter() - baslangic
+
+        try:
+            translation_prompt = f"Translate the following Turkish text to English, keeping the meaning and keywords intact: '{soru}'"
+            ceviri = self.llm.invoke(translation_prompt).content
+        except Exception as e:
+            # Hatalı çevirileri önbelleğe yazmıyorum; bir sonraki soruda tekrar denenir.
+            print(f"-> Çeviri hatası: {e}. Orijinal soru ile devam edilecek.")
+            return soru, "hata", time.perf_counter() - baslangic
+
+        anahtar = self._anahtar(soru)
+        with self._kilit:
+            self._lru_ekle(anahtar, ceviri)
+            self._baglanti.execute(
+                "INSERT OR REPLACE INTO ceviriler (anahtar, ceviri) VALUES (?, ?)", (anahtar, ceviri)
+            )
+            self._baglanti.commit()
+        return ceviri, "llm", time.perf_counter() - baslangic
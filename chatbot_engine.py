@@ -1,187 +1,619 @@
 # --- Gerekli Kütüphaneler ---
-import pandas as pd
-import streamlit as st
-import google.generativeai as genai
+# pandas, streamlit, google.generativeai, langchain ve langdetect import sırasında değil, ilk
+# kullanıldıkları fonksiyonun içinde yükleniyor. Bu modülü import etmek (API sunucusu, performans
+# testi, her yeni Streamlit oturumu) böylece saniyeler yerine ~0.3 sn sürüyor; ağır modüller
+# baslat() sonrasındaki ısınma adımında arka planda yükleniyor. Bütçe kontrolü:
+#   python performans_testi.py --ithalat-butcesi 400
 import os
-from dotenv import load_dotenv
-from langchain_google_genai import GoogleGenerativeAIEmbeddings, ChatGoogleGenerativeAI
-from langchain_community.vectorstores import FAISS
-from langchain.prompts import PromptTemplate
-from langchain.docstore.document import Document
-# Dil tespiti için ekledim (basit bir yöntem)
-from langdetect import detect, LangDetectException 
+import sys
+import time
+import uuid
+import functools
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+# Çevrimdışı oluşturulan global yorum indexini diskten okuyan önbellek
+from index_deposu import IndexOnbellegi, YorumIndexi, EMBEDDING_MODEL_ADI, HIBRIT_ARAMA, havayolu_listesi
+# Soru dilini langdetect'e gitmeden mikro saniyelerde bulan sınıflandırıcı (emin değilse langdetect'e düşer)
+from dil_tespiti import dil_tespit_et
+# Türkçe soruların çevirisini hafızada ve diskte saklayan katman
+from ceviri import CeviriKatmani
+# Yorumları sıkıştırılmış, mmap ile açılan sütun bazlı formatta tutan depo
+from yorum_deposu import YORUM_DEPOSU_KLASORU, YorumDeposu, depo_guncel_mi, meta_oku
+# LLM'e gidecek kanıtları token bütçesine sığdıran bağlam derleyici
+from baglam import BAGLAM_TOKEN_BUTCESI, KARAKTER_BASINA_TOKEN, baglam_olustur
+# Tekrar eden ve anlamca çok yakın sorular için cevap önbelleği
+from cevap_onbellegi import CevapOnbellegi, havayolu_anahtari, onbellek_surumu
+# 'ozet_olustur.py' ile önceden üretilen havayolu + konu özetleri
+from konu_ozetleri import OZET_YONLENDIRME, OzetDeposu, soru_konusu
+# Aşama süreleri, token sayıları ve önbellek isabetleri için JSON log ve Prometheus metrikleri (IZLEME=1)
+import izleme
 
 # --- Genel Ayarlar ve Başlangıç Yüklemeleri ---
 
+# baslat() bittikten sonra yorum sayısı en fazla olan bu kadar havayolunun index sayfaları ve sorgu
+# yolundaki ağır modüller arka planda yüklenir; ilk kullanıcı soğuk diski beklemez. 0 ile kapatılır.
+ISINMA_HAVAYOLU_SAYISI = int(os.getenv("ISINMA_HAVAYOLU_SAYISI", "10"))
+
+
+def _streamlit_calisiyor():
+    # app.py 'streamlit run' ile açıldıysa streamlit zaten import edilmiştir; değilse hiç import etmiyorum.
+    if "streamlit" not in sys.modules:
+        return False
+    from streamlit import runtime
+    return runtime.exists()
+
+
+def _paylasilan_kaynak(fonksiyon):
+    # Streamlit altında @st.cache_resource gibi çalışır: tüm oturumlar aynı nesneyi paylaşır.
+    # Streamlit dışında (API, performans testi) doğrudan çağrılır; baslat() zaten bir kere çalışıyor.
+    onbellekli = None
+
+    @functools.wraps(fonksiyon)
+    def sarmalayici(*args, **kwargs):
+        nonlocal onbellekli
+        if not _streamlit_calisiyor():
+            return fonksiyon(*args, **kwargs)
+        if onbellekli is None:
+            import streamlit as st
+            onbellekli = st.cache_resource(fonksiyon)
+        return onbellekli(*args, **kwargs)
+    return sarmalayici
+
+
+def _durdur(mesaj):
+    # Arayüzde hatayı gösterip betiği durdurur; Streamlit dışında istisna fırlatır.
+    if _streamlit_calisiyor():
+        import streamlit as st
+        st.error(mesaj)
+        st.stop()
+    raise RuntimeError(mesaj)
+
+
 # --- API Anahtarını Yükleme (Hem Lokal hem Cloud için) ---
+# Bu adımlar artık import sırasında değil, baslat() çağrıldığında çalışıyor.
 GOOGLE_API_KEY = None 
-try:
-    print("-> Streamlit Secrets deneniyor...")
-    GOOGLE_API_KEY = st.secrets["GOOGLE_API_KEY"]
-    print("-> Google API Anahtarı Streamlit Secrets'tan yüklendi.")
-except Exception as e: 
-    print(f"-> Streamlit Secrets kullanılamadı ({type(e).__name__}), .env dosyası deneniyor...")
-    load_dotenv() 
-    GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-    if GOOGLE_API_KEY:
-        print("-> Google API Anahtarı .env dosyasından yüklendi.")
-    else:
-        st.error("Google API Anahtarı (GOOGLE_API_KEY) ne Streamlit Secrets'ta ne de .env dosyasında bulunamadı!")
-        st.stop()
 
-# --- Google API'ını Yapılandırma ---
-if GOOGLE_API_KEY:
+def api_anahtarini_yukle():
+    global GOOGLE_API_KEY
+    import google.generativeai as genai
+    from dotenv import load_dotenv
     try:
-         genai.configure(api_key=GOOGLE_API_KEY)
-         print("-> Google API Anahtarı başarıyla yapılandırıldı.")
-    except Exception as e:
-         st.error(f"Google API Anahtarı yapılandırılırken hata: {e}")
-         st.stop()
-else:
-     st.error("API Anahtarı yüklenemediği için Google API yapılandırılamadı.")
-     st.stop()
+        print("-> Streamlit Secrets deneniyor...")
+        import streamlit as st
+        GOOGLE_API_KEY = st.secrets["GOOGLE_API_KEY"]
+        print("-> Google API Anahtarı Streamlit Secrets'tan yüklendi.")
+    except Exception as e: 
+        print(f"-> Streamlit Secrets kullanılamadı ({type(e).__name__}), .env dosyası deneniyor...")
+        load_dotenv() 
+        GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+        if GOOGLE_API_KEY:
+            print("-> Google API Anahtarı .env dosyasından yüklendi.")
+        else:
+            _durdur("Google API Anahtarı (GOOGLE_API_KEY) ne Streamlit Secrets'ta ne de .env dosyasında bulunamadı!")
+
+    # --- Google API'ını Yapılandırma ---
+    if GOOGLE_API_KEY:
+        try:
+             genai.configure(api_key=GOOGLE_API_KEY)
+             print("-> Google API Anahtarı başarıyla yapılandırıldı.")
+        except Exception as e:
+             _durdur(f"Google API Anahtarı yapılandırılırken hata: {e}")
+    else:
+         _durdur("API Anahtarı yüklenemediği için Google API yapılandırılamadı.")
 
 INPUT_FILENAME = "temiz_havayolu_yorumlari.csv"
 
 # --- ADIM 1: Ana Veri Setini Hafızaya Yükleme ---
-@st.cache_data
-def load_data(filename):
+# 'veri_hazırla.py' yorumları sütun bazlı ikili bir depoya da yazıyor. Bu depoyu mmap ile açıyorum:
+# açılış neredeyse anında, bellek tüm Streamlit süreçleri arasında paylaşılıyor ve bir havayolunun
+# yorumlarına erişim tek bir dilim. Depo yoksa veya CSV'den eskiyse CSV'yi okuyup depoyu bellekte kuruyorum.
+# Uygulama depoyu index önbelleği üzerinden alır (guncel_yorum_deposu); veri güncellenince depo orada
+# yeniden yüklenir. load_data, veriyi bir kere okuyan scriptler (ör. ozet_olustur.py) için.
+# (mmap nesneleri kopyalanamadığı için cache_data yerine cache_resource kullanıyorum.)
+def veriyi_yukle(filename):
+    meta = meta_oku(YORUM_DEPOSU_KLASORU)
+    if depo_guncel_mi(meta, filename):
+        # Kontrol edilen meta'nın sürümü açılıyor; arada yeni sürüm yayınlanırsa bir sonraki tazelemede yüklenir.
+        depo = YorumDeposu.yukle(YORUM_DEPOSU_KLASORU, meta)
+        print(f"-> '{YORUM_DEPOSU_KLASORU}' mmap ile açıldı ({len(depo)} yorum).")
+        return depo
+
     print(f"'{filename}' okunuyor (Önbelleğe alınıyor)...")
+    import pandas as pd
+    df = pd.read_csv(filename)
+    print(f"-> {len(df)} adet yorum başarıyla hafızaya yüklendi. "
+          f"Daha hızlı açılış için 'python veri_hazırla.py' ile yorum deposunu yeniden oluşturabilirsiniz.")
+    return YorumDeposu.bellekten(df['Airline Name'].tolist(), df['birlesik_yorum'].tolist())
+
+
+@_paylasilan_kaynak
+def load_data(filename):
     try:
-        df = pd.read_csv(filename)
-        print(f"-> {len(df)} adet yorum başarıyla hafızaya yüklendi.")
-        return df
+        return veriyi_yukle(filename)
     except FileNotFoundError:
-        st.error(f"HATA: '{filename}' dosyası bulunamadı. Lütfen dosyanın reponuzda olduğundan emin olun.")
-        st.stop() 
-
-df_tum_yorumlar = load_data(INPUT_FILENAME)
+        _durdur(f"HATA: '{filename}' dosyası bulunamadı. Lütfen dosyanın reponuzda olduğundan emin olun.")
 
 # --- Embedding Modelini Hazırlama ---
-@st.cache_resource
+@_paylasilan_kaynak
 def load_embeddings_model():
     print("Google Embedding Modeli hazırlanıyor (Önbelleğe alınıyor)...")
     try:
-        embeddings_model = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
+        from langchain_google_genai import GoogleGenerativeAIEmbeddings
+        # Aynı metnin tekrar tekrar embedding servisine gönderilmemesi için disk önbelleği
+        from embedding_onbellegi import OnbellekliEmbeddings
+        # Modeli, vektörleri metin özetine göre diskte saklayan önbellekle sarıyorum.
+        # Aynı soru veya yorum tekrar geldiğinde servise gitmeden cevap dönüyor.
+        embeddings_model = OnbellekliEmbeddings(
+            GoogleGenerativeAIEmbeddings(model=EMBEDDING_MODEL_ADI), EMBEDDING_MODEL_ADI
+        )
         print("-> Embedding Modeli hazır.")
         return embeddings_model
     except Exception as e:
-        st.error(f"Embedding modeli başlatılırken hata oluştu: {e}")
-        st.stop()
+        _durdur(f"Embedding modeli başlatılırken hata oluştu: {e}")
+
+# --- Havayolu Index Önbelleği ---
+# 'index_olustur.py' ile diske yazılan global indexi ihtiyaç olduğunda yükleyip LRU mantığıyla tutuyoruz.
+# Tüm Streamlit oturumları aynı önbelleği paylaşsın diye cache_resource kullanıyorum.
+# Yorum deposu da bu önbellekte tutulur ki index ve depo aynı veri değişikliğinde birlikte yenilensin.
+@_paylasilan_kaynak
+def load_index_cache():
+    return IndexOnbellegi(INPUT_FILENAME, depo_yukleyici=veriyi_yukle)
 
-embeddings = load_embeddings_model()
+LLM_MODEL_ADI = "models/gemini-flash-latest"
 
 # --- Dil Tespiti ve Çeviri İçin LLM ---
 # Cevap üretimi ve potansiyel çeviri/dil tespiti için LLM'i burada tanımlıyoruz.
-# @st.cache_resource # Bunu da önbelleğe alabiliriz.
 def load_llm():
     print("Ana Dil Modeli (LLM) hazırlanıyor...")
     try:
+        from langchain_google_genai import ChatGoogleGenerativeAI
         # Model adını teyit ettiğimiz en stabil ve çalışan modelle güncelleyelim.
-        llm_model = ChatGoogleGenerativeAI(model="models/gemini-flash-latest", temperature=0.3) 
+        llm_model = ChatGoogleGenerativeAI(model=LLM_MODEL_ADI, temperature=0.3) 
         print("-> LLM hazır.")
         return llm_model
     except Exception as e:
-         st.error(f"Ana Dil Modeli başlatılırken hata oluştu: {e}")
-         st.stop()
+         _durdur(f"Ana Dil Modeli başlatılırken hata oluştu: {e}")
+
+# --- Çeviri Katmanı ---
+# Çok dilli bir embedding modeli kullanılıyorsa (COK_DILLI_EMBEDDING=1) Türkçe soru doğrudan
+# İngilizce yorumlarla eşleştirilir ve çeviri adımı tamamen atlanır.
+COK_DILLI_EMBEDDING = os.getenv("COK_DILLI_EMBEDDING", "0") == "1"
+
+# (Alt çizgiyle başlayan parametreyi Streamlit önbellek anahtarına katmıyor.)
+@_paylasilan_kaynak
+def load_translation_layer(_llm):
+    return CeviriKatmani(_llm, LLM_MODEL_ADI)
+
+# Çeviriyi, index yükleme gibi ondan bağımsız adımlarla aynı anda çalıştırmak için iş parçacığı havuzu.
+arka_plan_havuzu = ThreadPoolExecutor(max_workers=4)
+
+# --- Cevap Üretimi İçin Prompt Şablonu ---
+# {cevap_dili} sorgu anında doldurulur; {{context}} ve {{question}} LangChain'e kalır.
+# Şablon değişirse cevap önbelleğindeki eski cevaplar otomatik olarak geçersiz olur.
+PROMPT_SABLONU = """
+    SENARYO: Sen, İngilizce yolcu yorumlarını analiz eden bir Uçuş Deneyimi Asistanısın.
+    Görevin, sana sunulan İngilizce KANITLARI kullanarak, kullanıcının sorduğu SORUYU {cevap_dili} dilinde cevaplamaktır.
+    Cevapların kesinlikle ve sadece sana verilen KANITLARA dayanmalıdır.
+    Her kanıtın başında köşeli parantez içinde ait olduğu havayolu yazar. Kanıtlar birden fazla havayoluna aitse,
+    havayollarını birbiriyle karşılaştırarak cevap ver.
+    Cevabını nazik, anlaşılır ve akıcı bir şekilde, bir paragraf halinde {cevap_dili} olarak özetle.
+
+    İngilizce KANITLAR:
+    {{context}}
+
+    Kullanıcının Orijinal SORUSU:
+    {{question}}
+
+    {cevap_dili} CEVAP:
+    """
+
+# --- Cevap Önbelleği ---
+@_paylasilan_kaynak
+def load_answer_cache():
+    return CevapOnbellegi()
+
+# --- Hazır Konu Özetleri ---
+@_paylasilan_kaynak
+def load_summary_store():
+    return OzetDeposu()
+
+# --- Başlatma ---
+# Veri, modeller ve önbellekler import sırasında değil, ilk ihtiyaç duyulduğunda bir kere yükleniyor.
+# Böylece modülü içeri aktaran her şey (ör. API sunucusu) hızlı açılıyor ve modeller yerine
+# sahteleri verilebiliyor. Tüm istekler aynı embedding ve LLM istemcisini paylaşıyor.
+embeddings = None
+index_onbellegi = None
+llm = None
+ceviri_katmani = None
+cevap_onbellegi = None
+ozet_deposu = None
+_baslatma_kilidi = threading.Lock()
+
+def baslat(embeddings_modeli=None, dil_modeli=None):
+    # embeddings_modeli / dil_modeli verilirse Google modelleri yerine bunlar kullanılır (testler için).
+    global embeddings, index_onbellegi, llm, ceviri_katmani, cevap_onbellegi, ozet_deposu
+    with _baslatma_kilidi:
+        if cevap_onbellegi is not None:
+            return
+        if embeddings_modeli is None or dil_modeli is None:
+            api_anahtarini_yukle()
+        index_onbellegi = load_index_cache()
+        if index_onbellegi.yorum_deposu() is None:
+            _durdur(f"HATA: '{INPUT_FILENAME}' dosyası bulunamadı. Lütfen dosyanın reponuzda olduğundan emin olun.")
+        embeddings = embeddings_modeli if embeddings_modeli is not None else load_embeddings_model()
+        llm = dil_modeli if dil_modeli is not None else load_llm()
+        ceviri_katmani = load_translation_layer(llm)
+        ozet_deposu = load_summary_store()
+        cevap_onbellegi = load_answer_cache()
+        # METRIK_PORTU verildiyse /metrics ayrı bir iş parçacığında sunulur (Streamlit süreci için).
+        izleme.metrik_sunucusu_baslat()
+        if ISINMA_HAVAYOLU_SAYISI:
+            arka_plan_havuzu.submit(isindir, ISINMA_HAVAYOLU_SAYISI)
+
+
+def guncel_yorum_deposu():
+    # Güncel verinin yorum deposu. 'yorumlari_guncelle.py' yeni veri yayınlayınca bir sonraki çağrıda yenisi döner;
+    # depoyu uzun süre tutmak yerine her kullanımda buradan almak gerekir.
+    baslat()
+    return index_onbellegi.yorum_deposu()
+
+
+def _sorgu_modullerini_yukle():
+    # Sorgu yolunda fonksiyon içinde import edilen ağır modüller (ilk sorguda ~1 sn).
+    # langdetect sadece hızlı dil tespiti emin olmadığında kullanılıyor; dil profillerini import'ta değil
+    # ilk detect() çağrısında okuduğu için onu da burada tetikliyorum.
+    import langdetect
+    import langchain.prompts
+    import langchain.docstore.document
+    langdetect.detect("warm up the language profiles")
+
+
+def isindir(havayolu_sayisi=ISINMA_HAVAYOLU_SAYISI):
+    # Arka planda çalışır: sorgu modüllerini import eder, diskteki indexi açar (veri özeti dahil) ve
+    # en çok yorumu olan havayollarının vektör sayfalarını ve BM25 listelerini belleğe getirir.
+    # Hata verirse sadece loglanır; ısınma olmadan da her şey ilk sorguda yüklenir.
+    baslangic = time.perf_counter()
+    try:
+        _sorgu_modullerini_yukle()
+        yorum_indexi = index_onbellegi.getir()
+        if yorum_indexi is None:
+            print(f"-> Isınma: diskte güncel index yok, sadece modüller yüklendi "
+                  f"({time.perf_counter() - baslangic:.2f} sn).")
+            return
+        depo = index_onbellegi.yorum_deposu()
+        populer = sorted(depo.havayollari, key=lambda ad: -depo.yorum_sayisi([ad]))
+        yorum_indexi.isindir(populer[:havayolu_sayisi])
+        print(f"-> Isınma tamamlandı: {min(havayolu_sayisi, len(populer))} havayolu "
+              f"({time.perf_counter() - baslangic:.2f} sn).")
+    except Exception as e:
+        print(f"-> Isınma sırasında hata (önemsiz): {e}")
+
+def cevap_onbellek_surumu():
+    # Yorum verisi, prompt şablonu veya model değişince önbellekteki cevaplar geçersiz olur.
+    return onbellek_surumu(index_onbellegi.veri_surumu(), PROMPT_SABLONU, LLM_MODEL_ADI, EMBEDDING_MODEL_ADI,
+                           "hibrit" if HIBRIT_ARAMA else "vektor", f"baglam{BAGLAM_TOKEN_BUTCESI}")
+
+# Tek havayolu sorularında getirilecek kanıt sayısı; karşılaştırma sorularında her havayolundan bu kadar.
+ARAMA_K = 5
+KARSILASTIRMA_K = 3
+
+# --- Sorgu Hazırlığı ---
+# Arama aşaması bittiğinde arayüzün kanıtları hemen gösterebilmesi için cevap üretimini
+# ayrı bir adıma bölüyorum. Bu nesne iki adım arasında taşınan bilgiyi tutar.
+# 'mesaj' doluysa LLM'e gitmeye gerek yoktur (ör. yorum bulunamadı); doğrudan bu mesaj gösterilir.
+class SorguHazirligi:
+    def __init__(self, soru, orjinal_dil, relevant_docs=None, mesaj=None, olcumler=None, hazir_cevap=None,
+                 onbellek_kaydi=None, baglam=None):
+        self.soru = soru
+        self.orjinal_dil = orjinal_dil
+        self.relevant_docs = relevant_docs or []
+        # LLM'e gönderilecek, token bütçesine göre kısaltılmış kanıt metni.
+        self.baglam = baglam
+        self.mesaj = mesaj
+        # Cevap önbellekten geldiyse LLM'e gidilmeden bu metin gösterilir.
+        self.hazir_cevap = hazir_cevap
+        # Üretilen cevabı önbelleğe yazmak için gereken bilgiler (havayolu anahtarı, dil, sorgu vektörü, sürüm).
+        self.onbellek_kaydi = onbellek_kaydi
+        # Sorgunun hangi yoldan geçtiği ve aşama süreleri (ör. ceviri_yolu, ceviri_sn).
+        self.olcumler = olcumler or {}
+        # İzleme kayıtları için; sorguyu_hazirla tarafından doldurulur.
+        self.iz_id = None
+        self.havayolu_adi = None
+
+
+def _onbellek_kanitlari(kanitlar):
+    from langchain.docstore.document import Document
+    return [Document(page_content=k["page_content"], metadata={"Airline Name": k["Airline Name"]}) for k in kanitlar]
 
-llm = load_llm() # LLM'i en başta bir kere yüklüyoruz.
 
 # --- ADIM 2: Ana Chatbot Fonksiyonu ---
-def get_response(soru, havayolu_adi):
+# havayolu_adi tek bir isim, isim listesi (karşılaştırma soruları için) veya None (tüm havayolları) olabilir.
+# sorgu_vektorleri / gecici_indexler toplu sorgularda (get_responses_batch) önceden hesaplanan soru vektörleri
+# ({arama sorusu: vektör}) ve havayolu grubu başına bir kere kurulan geçici indexlerdir.
+def sorguyu_hazirla(soru, havayolu_adi, sorgu_vektorleri=None, gecici_indexler=None):
+    baslat()
+    baslangic = time.perf_counter()
+    hazirlik = _sorguyu_hazirla(soru, havayolu_adi, sorgu_vektorleri, gecici_indexler)
+    hazirlik.olcumler["hazirlik_sn"] = time.perf_counter() - baslangic
+    hazirlik.iz_id = uuid.uuid4().hex[:16]
+    hazirlik.havayolu_adi = havayolu_adi
+    return hazirlik
+
+
+def _sorguyu_hazirla(soru, havayolu_adi, sorgu_vektorleri=None, gecici_indexler=None):
     print(f"\n--- Yeni Sorgu ---")
     print(f"Havayolu: '{havayolu_adi}', Orjinal Soru: '{soru}'")
 
+    havayollari = havayolu_listesi(havayolu_adi)
+    onbellek_havayolu = havayolu_anahtari(havayollari)
+    surum = cevap_onbellek_surumu()
+
+    # --- YENİ ADIM: CEVAP ÖNBELLEĞİ (birebir aynı soru) ---
+    # Aynı soru bu havayolu için daha önce cevaplandıysa dil tespiti, çeviri, arama ve LLM adımlarının hiçbiri çalışmaz.
+    onbellekteki = cevap_onbellegi.tam_eslesme(onbellek_havayolu, soru, surum)
+    if onbellekteki is not None:
+        print("-> Cevap önbellekte bulundu (birebir eşleşme).")
+        # Dil tespiti atlandı; dil, cevap önbelleğe yazılırken tespit edilen dil.
+        cevap, kanitlar, orjinal_dil = onbellekteki
+        return SorguHazirligi(soru, orjinal_dil, relevant_docs=_onbellek_kanitlari(kanitlar), hazir_cevap=cevap,
+                              olcumler={"cevap_onbellegi": "tam"})
+
     # --- YENİ ADIM: DİL TESPİTİ ---
-    try:
-        orjinal_dil = detect(soru) # 'tr' veya 'en' gibi bir dil kodu döner.
-        print(f"-> Tespit edilen soru dili: {orjinal_dil}")
-    except LangDetectException:
-        print("-> Soru dili tespit edilemedi, İngilizce varsayılıyor.")
-        orjinal_dil = "en" # Tespit edilemezse İngilizce kabul edelim.
-    except Exception as e:
-        print(f"-> Dil tespiti sırasında hata: {e}. İngilizce varsayılıyor.")
-        orjinal_dil = "en"
+    # Sadece Türkçe mi değil mi diye bakıyoruz; sonuç 'tr' veya 'en'. Tespit edilemezse İngilizce kabul ediliyor.
+    olcumler = {}
+    with izleme.asama(olcumler, "dil_tespiti"):
+        orjinal_dil, olcumler["dil_yontemi"] = dil_tespit_et(soru)
+    print(f"-> Tespit edilen soru dili: {orjinal_dil} (yöntem: {olcumler['dil_yontemi']})")
 
+    # --- YENİ ADIM: HAZIR KONU ÖZETİ ---
+    # Tek bir havayolu için açıkça tek bir konuyu (koltuk, yemek, personel, eğlence, rötar) soran sorular
+    # 'ozet_olustur.py'nin önceden ürettiği özetle cevaplanır; çeviri, arama ve LLM adımları çalışmaz.
+    hazir_ozet = _hazir_ozet(soru, orjinal_dil, havayollari, olcumler)
+    if hazir_ozet is not None:
+        return hazir_ozet
 
     # --- YENİ ADIM: KOŞULLU ÇEVİRİ ---
-    if orjinal_dil == "tr":
-        print("[Aşama 1a] Soru İngilizce'ye çevriliyor...")
-        try:
-            translation_prompt = f"Translate the following Turkish text to English, keeping the meaning and keywords intact: '{soru}'"
-            arama_sorusu = llm.invoke(translation_prompt).content
-            print(f"-> Çevrilen Soru (Arama için): '{arama_sorusu}'")
-        except Exception as e:
-            print(f"-> Çeviri hatası: {e}. Orijinal soru ile devam edilecek.")
-            arama_sorusu = soru # Çeviri başarısız olursa orijinal soruyla dene
-    else:
+    # Çeviri arka planda başlatılıyor; bu sırada index yükleme devam ediyor.
+    # Sonuç aramadan hemen önce bekleniyor. Sorgu aramaya gelmeden biterse (index yok, yorum yok, hata)
+    # henüz başlamamış çeviri iptal ediliyor; başlamış olan biter ve sadece çeviri önbelleğine yazılır.
+    arama_sorusu = soru
+    ceviri_gorevi = None
+    if orjinal_dil != "tr":
         # Soru zaten İngilizce ise veya dil tespit edilemediyse, doğrudan kullanıyoruz.
-        arama_sorusu = soru
+        olcumler["ceviri_yolu"] = "gerek_yok"
         print("[Aşama 1a] Soru zaten İngilizce, çeviriye gerek yok.")
+    elif COK_DILLI_EMBEDDING:
+        olcumler["ceviri_yolu"] = "cok_dilli"
+        print("[Aşama 1a] Çok dilli embedding modu açık, Türkçe soru çevrilmeden aranacak.")
+    else:
+        print("[Aşama 1a] Soru İngilizce'ye çevriliyor (önbellek kontrol ediliyor)...")
+        ceviri_gorevi = arka_plan_havuzu.submit(ceviri_katmani.cevir, soru)
     # ------------------------------------
 
-    print(f"[Aşama 1b] Sadece '{havayolu_adi}' için yorumlar filtreleniyor...")
-    df_filtrelenmis = df_tum_yorumlar[df_tum_yorumlar['Airline Name'] == havayolu_adi]
+    try:
+        yorum_indexi, mesaj = _indexi_hazirla(havayolu_adi, havayollari, onbellek_havayolu, gecici_indexler, olcumler)
+    except BaseException:
+        if ceviri_gorevi is not None:
+            ceviri_gorevi.cancel()
+        raise
+    if mesaj is not None:
+        if ceviri_gorevi is not None:
+            ceviri_gorevi.cancel()
+        return SorguHazirligi(soru, orjinal_dil, olcumler=olcumler, mesaj=mesaj)
 
-    if df_filtrelenmis.empty:
-        return f"'{havayolu_adi}' için sistemde hiç yorum bulunamadı."
-    
-    print(f"-> {len(df_filtrelenmis)} adet yorum bulundu.")
+    if ceviri_gorevi is not None:
+        bekleme_baslangici = time.perf_counter()
+        arama_sorusu, olcumler["ceviri_yolu"], olcumler["ceviri_sn"] = ceviri_gorevi.result()
+        olcumler["ceviri_bekleme_sn"] = time.perf_counter() - bekleme_baslangici
+        print(f"-> Çevrilen Soru (Arama için): '{arama_sorusu}' "
+              f"[yol: {olcumler['ceviri_yolu']}, {olcumler['ceviri_sn'] * 1000:.0f} ms, "
+              f"index hazırlığından sonra bekleme: {olcumler['ceviri_bekleme_sn'] * 1000:.0f} ms]")
 
-    print("[Aşama 2] Filtrelenmiş yorumlar için geçici arama motoru oluşturuluyor...")
-    documents = [Document(page_content=row['birlesik_yorum'], metadata={'Airline Name': row['Airline Name']}) for index, row in df_filtrelenmis.iterrows()]
-    
+    print("[Aşama 3] Anlamsal arama (İngilizce soru ile) yapılıyor...")
+    # Aramayı HER ZAMAN İngilizce soruyla yapıyoruz. Havayolu filtresi aramanın içinde
+    # (FAISS IDSelector ile) uygulanıyor; birden fazla havayolu tek aramada taranıyor.
+    # Aynı soru BM25 kelime aramasına da veriliyor ve iki sıralama RRF ile birleştiriliyor.
+    k = KARSILASTIRMA_K if havayollari is not None and len(havayollari) > 1 else ARAMA_K
     try:
-        vector_store = FAISS.from_documents(documents, embeddings)
-        print("-> Geçici arama motoru hazır.")
+        embedding_baslangici = time.perf_counter()
+        sorgu_vektoru = (sorgu_vektorleri or {}).get(arama_sorusu)
+        if sorgu_vektoru is None:
+            sorgu_vektoru = embeddings.embed_query(arama_sorusu)
+        olcumler["sorgu_embedding_sn"] = time.perf_counter() - embedding_baslangici
     except Exception as e:
-        print(f"FAISS index oluşturma hatası: {e}")
-        return "Yorumlar analiz edilirken bir sorun oluştu. Lütfen tekrar deneyin."
+        print(f"Soru embedding hatası: {e}")
+        return SorguHazirligi(soru, orjinal_dil, olcumler=olcumler, mesaj="Yorumlar analiz edilirken bir sorun oluştu. Lütfen tekrar deneyin.")
+
+    # --- YENİ ADIM: CEVAP ÖNBELLEĞİ (anlamca yakın soru) ---
+    # Sorgu vektörü zaten arama için hesaplandı; önbellekte çok benzer bir soru varsa onun cevabını kullanıyoruz.
+    onbellekteki = cevap_onbellegi.benzer_bul(onbellek_havayolu, orjinal_dil, sorgu_vektoru, surum)
+    if onbellekteki is not None:
+        print("-> Cevap önbellekte bulundu (anlamsal eşleşme).")
+        cevap, kanitlar, _ = onbellekteki
+        olcumler["cevap_onbellegi"] = "benzer"
+        return SorguHazirligi(soru, orjinal_dil, relevant_docs=_onbellek_kanitlari(kanitlar), hazir_cevap=cevap,
+                              olcumler=olcumler)
+    olcumler["cevap_onbellegi"] = "yok"
+
+    with izleme.asama(olcumler, "arama"):
+        relevant_docs = yorum_indexi.ara(sorgu_vektoru, k=k, havayollari=havayollari, sorgu_metni=arama_sorusu)
 
-    print("[Aşama 3] Anlamsal arama (İngilizce soru ile) yapılıyor...")
-    # Aramayı HER ZAMAN İngilizce soruyla yapıyoruz.
-    relevant_docs = vector_store.similarity_search(arama_sorusu, k=5) 
-    
     if not relevant_docs:
         # Orijinal dilde cevap veriyoruz.
         if orjinal_dil == "tr":
-            return "Bu havayolu ile ilgili belirttiğiniz konuda yorum bulunsa da, sorunuzla doğrudan ilişkili bir detay tespit edilemedi."
+            mesaj = "Bu havayolu ile ilgili belirttiğiniz konuda yorum bulunsa da, sorunuzla doğrudan ilişkili bir detay tespit edilemedi."
         else:
-            return "Although reviews were found for this airline, no specific details related to your query could be identified."
+            mesaj = "Although reviews were found for this airline, no specific details related to your query could be identified."
+        return SorguHazirligi(soru, orjinal_dil, olcumler=olcumler, mesaj=mesaj)
+
+    # --- YENİ ADIM: BAĞLAM DERLEME ---
+    # Uzun yorumlar istem boyutunu ve cevap süresini şişirmesin diye kanıtlar token bütçesine sığdırılıyor:
+    # birbirinin kopyası olan kanıtlar atılıyor, her yorumdan soruyla en ilgili cümleler seçiliyor.
+    # Arayüzde gösterilen kanıtlar (relevant_docs) yine yorumların tamamı.
+    with izleme.asama(olcumler, "baglam"):
+        vektorler = yorum_indexi.vektorler([doc.metadata["satir"] for doc in relevant_docs])
+        baglam, baglam_bilgisi = baglam_olustur(relevant_docs, vektorler, arama_sorusu)
+    olcumler.update(baglam_bilgisi)
+
+    print(f"-> {len(relevant_docs)} adet ilgili yorum bulundu. Ölçümler: {olcumler}")
+    return SorguHazirligi(soru, orjinal_dil, olcumler=olcumler, relevant_docs=relevant_docs,
+                          onbellek_kaydi=(onbellek_havayolu, orjinal_dil, sorgu_vektoru, surum), baglam=baglam)
+
+
+def _indexi_hazirla(havayolu_adi, havayollari, onbellek_havayolu, gecici_indexler, olcumler):
+    # Aranacak indexi hazırlar: diskteki global index, yoksa filtrelenmiş yorumlardan geçici index.
+    # (yorum_indexi, None) veya sorgu aramaya gelmeden bitecekse (None, kullanıcıya gösterilecek mesaj) döner.
+    print("[Aşama 1b] Kayıtlı global arama motoru yükleniyor...")
+    index_baslangici = time.perf_counter()
+    try:
+        yorum_indexi = index_onbellegi.getir()
+    except Exception as e:
+        print(f"-> Kayıtlı index okunamadı: {e}")
+        yorum_indexi = None
+
+    if yorum_indexi is not None:
+        olcumler["index_yolu"] = "disk"
+        olcumler["index_sn"] = time.perf_counter() - index_baslangici
+        print("-> Kayıtlı arama motoru hazır.")
+    # Diskte güncel index yoksa eski yönteme geri dönüyoruz: yorumları filtreleyip geçici index kuruyoruz.
+    elif havayollari is None:
+        return None, "Tüm havayollarında arama yapabilmek için önce 'python index_olustur.py' çalıştırılmalıdır."
+    elif gecici_indexler is not None and onbellek_havayolu in gecici_indexler:
+        # Toplu sorgularda aynı havayolu grubunun geçici indexi bir kere kuruluyor.
+        yorum_indexi = gecici_indexler[onbellek_havayolu]
+        olcumler["index_yolu"] = "gecici_paylasilan"
+        olcumler["index_sn"] = time.perf_counter() - index_baslangici
+    else:
+        print(f"-> Kayıtlı index yok, sadece {havayollari} için yorumlar filtreleniyor...")
+        filtre_baslangici = time.perf_counter()
+        metinler, havayolu_adlari = index_onbellegi.yorum_deposu().secim(havayollari)
+        olcumler["filtreleme_sn"] = time.perf_counter() - filtre_baslangici
+
+        if not metinler:
+            return None, f"'{havayolu_adi}' için sistemde hiç yorum bulunamadı."
+
+        print(f"-> {len(metinler)} adet yorum bulundu.")
+
+        print("[Aşama 2] Filtrelenmiş yorumlar için geçici arama motoru oluşturuluyor...")
+        try:
+            olusturma_baslangici = time.perf_counter()
+            yorum_indexi = YorumIndexi.olustur(metinler, havayolu_adlari, embeddings)
+            olcumler["index_yolu"] = "gecici"
+            olcumler["index_sn"] = time.perf_counter() - olusturma_baslangici
+            print("-> Geçici arama motoru hazır.")
+            if gecici_indexler is not None:
+                gecici_indexler[onbellek_havayolu] = yorum_indexi
+        except Exception as e:
+            print(f"FAISS index oluşturma hatası: {e}")
+            return None, "Yorumlar analiz edilirken bir sorun oluştu. Lütfen tekrar deneyin."
+
+    if yorum_indexi.yorum_sayisi(havayollari) == 0:
+        return None, f"'{havayolu_adi}' için sistemde hiç yorum bulunamadı."
+    return yorum_indexi, None
+
+
+def _hazir_ozet(soru, orjinal_dil, havayollari, olcumler):
+    if not OZET_YONLENDIRME or havayollari is None or len(havayollari) != 1:
+        return None
+    konu = soru_konusu(soru)
+    if konu is None:
+        return None
+    veri_surumu, depo = index_onbellegi.veri_ve_depo()
+    kayit = ozet_deposu.getir(havayollari[0], konu, orjinal_dil, veri_surumu)
+    if kayit is None:
+        return None
+    from langchain.docstore.document import Document
+    print(f"-> Soru hazır konu özetine yönlendirildi (konu: {konu}).")
+    olcumler["ozet_konusu"] = konu
+    # Özetin dayandığı yorumlardan ilk birkaçı kanıt olarak gösteriliyor (satırlar aynı veri sürümünün deposunda).
+    relevant_docs = [Document(page_content=depo.metin(satir),
+                              metadata={"Airline Name": depo.havayolu(satir), "satir": satir})
+                     for satir in kayit["satirlar"][:ARAMA_K]]
+    return SorguHazirligi(soru, orjinal_dil, relevant_docs=relevant_docs, hazir_cevap=kayit["ozet"],
+                          olcumler=olcumler)
+
+
+def konu_ozetlerini_getir(havayolu_adi, dil="tr"):
+    # Arayüz için: havayolunun güncel konu özetleri [(konu, {"ozet", "satirlar", "yorum_sayisi"}), ...].
+    baslat()
+    return ozet_deposu.havayolu_ozetleri(havayolu_adi, dil, index_onbellegi.veri_surumu())
+
+
+# --- ADIM 3: Cevap Üretimi (Akış) ---
+# Gemini'nin cevabını parça parça (token token) üreten generator. Arayüz ilk parçayı
+# tüm cevap bitmeden gösterebiliyor; kullanıcının hissettiği bekleme süresi kısalıyor.
+# Akış bittiğinde (veya yarıda bırakıldığında) sorgunun izleme kaydı yazılır.
+def cevap_akisi(hazirlik):
+    tamamlandi = False
+    try:
+        yield from _cevap_akisi(hazirlik)
+        tamamlandi = True
+    finally:
+        izleme.sorgu_bitti(hazirlik, sorgu_durumu(hazirlik) if tamamlandi else "iptal")
+
+
+def sorgu_durumu(hazirlik):
+    # Cevabın nereden geldiği: 'mesaj', 'ozet', 'onbellek', 'hata' veya 'cevap' (LLM üretti).
+    if hazirlik.mesaj is not None:
+        return "mesaj"
+    if "ozet_konusu" in hazirlik.olcumler:
+        return "ozet"
+    if hazirlik.hazir_cevap is not None:
+        return "onbellek"
+    return "hata" if "hata" in hazirlik.olcumler else "cevap"
+
+
+def _cevap_akisi(hazirlik):
+    if hazirlik.mesaj is not None:
+        yield hazirlik.mesaj
+        return
+    if hazirlik.hazir_cevap is not None:
+        yield hazirlik.hazir_cevap
+        return
+
+    orjinal_dil = hazirlik.orjinal_dil
+    soru = hazirlik.soru
+    relevant_docs = hazirlik.relevant_docs
+    print("[Aşama 4] Gemini ile cevap üretiliyor (akış)...")
 
-    print(f"-> {len(relevant_docs)} adet ilgili yorum bulundu. Gemini ile cevap üretiliyor...")
-    
     # --- YENİ ADIM: DİNAMİK CEVAP DİLİ ---
     # Cevabın hangi dilde olması gerektiğini belirliyoruz.
     cevap_dili = "Turkish" if orjinal_dil == "tr" else "English"
     
     # Prompt şablonunu cevap dilini içerecek şekilde güncelliyoruz.
-    prompt_template = f"""
-    SENARYO: Sen, İngilizce yolcu yorumlarını analiz eden bir Uçuş Deneyimi Asistanısın.
-    Görevin, sana sunulan İngilizce KANITLARI kullanarak, kullanıcının sorduğu SORUYU {cevap_dili} dilinde cevaplamaktır.
-    Cevapların kesinlikle ve sadece sana verilen KANITLARA dayanmalıdır.
-    Cevabını nazik, anlaşılır ve akıcı bir şekilde, bir paragraf halinde {cevap_dili} olarak özetle.
-
-    İngilizce KANITLAR:
-    {{context}}
-
-    Kullanıcının Orijinal SORUSU:
-    {{question}}
-
-    {cevap_dili} CEVAP:
-    """
+    prompt_template = PROMPT_SABLONU.format(cevap_dili=cevap_dili)
     # ------------------------------------
     
+    from langchain.prompts import PromptTemplate
     prompt = PromptTemplate(template=prompt_template, input_variables=["context", "question"])
     try:
         # LLM zaten en başta yüklenmişti.
         chain = prompt | llm 
-        context = "\n\n---\n\n".join([doc.page_content for doc in relevant_docs])
+        context = hazirlik.baglam
         # Zinciri çalıştırırken orijinal soruyu ('soru') kullanıyoruz.
-        response = chain.invoke({"context": context, "question": soru}) 
-        return response.content
+        parcalar = []
+        kullanim = {}
+        uretim_baslangici = time.perf_counter()
+        for parca in chain.stream({"context": context, "question": soru}):
+            # Model token sayılarını bildiriyorsa (Gemini akışta parça parça bildirir) topluyorum.
+            for alan, deger in (getattr(parca, "usage_metadata", None) or {}).items():
+                if isinstance(deger, int):
+                    kullanim[alan] = kullanim.get(alan, 0) + deger
+            if isinstance(parca.content, str) and parca.content:
+                if not parcalar:
+                    hazirlik.olcumler["ilk_parca_sn"] = time.perf_counter() - uretim_baslangici
+                parcalar.append(parca.content)
+                yield parca.content
+        hazirlik.olcumler["uretim_sn"] = time.perf_counter() - uretim_baslangici
+        _token_sayilarini_kaydet(hazirlik.olcumler, prompt_template, context, soru, "".join(parcalar), kullanim)
+        # Cevap hatasız tamamlandıysa sonraki benzer sorular için önbelleğe yazıyorum.
+        if hazirlik.onbellek_kaydi is not None and parcalar:
+            onbellek_havayolu, dil, sorgu_vektoru, surum = hazirlik.onbellek_kaydi
+            kanitlar = [{"Airline Name": doc.metadata["Airline Name"], "page_content": doc.page_content} for doc in relevant_docs]
+            cevap_onbellegi.ekle(onbellek_havayolu, dil, soru, sorgu_vektoru, "".join(parcalar), kanitlar, surum)
     except Exception as e:
         print(f"Gemini cevap üretme hatası: {e}")
+        hazirlik.olcumler["hata"] = type(e).__name__
         # Hata mesajını da orijinal dilde vermek daha iyi olabilir.
         error_message_tr = "Yapay zeka modeliyle iletişim kurulurken bir sorun oluştu."
         error_message_en = "An issue occurred while communicating with the AI model."
@@ -192,12 +624,142 @@ def get_response(soru, havayolu_adi):
              error_message_tr = "Google API kullanım kotası aşıldı. Lütfen bir süre sonra tekrar deneyin."
              error_message_en = "Google API usage quota exceeded. Please try again later."
 
-        return error_message_tr if orjinal_dil == "tr" else error_message_en
+        yield error_message_tr if orjinal_dil == "tr" else error_message_en
+
+
+def _token_sayilarini_kaydet(olcumler, prompt_template, context, soru, cevap, kullanim):
+    # Modelin bildirdiği token sayıları yoksa yaklaşık olarak 4 karaktere 1 token sayıyorum (KARAKTER_BASINA_TOKEN).
+    istem_karakter = len(prompt_template) + len(context) + len(soru)
+    olcumler["istem_karakter"] = istem_karakter
+    olcumler["cevap_karakter"] = len(cevap)
+    if "input_tokens" in kullanim:
+        olcumler["istem_token"] = kullanim["input_tokens"]
+        olcumler["cevap_token"] = kullanim.get("output_tokens", 0)
+        olcumler["token_kaynagi"] = "model"
+    else:
+        olcumler["istem_token"] = istem_karakter // KARAKTER_BASINA_TOKEN
+        olcumler["cevap_token"] = len(cevap) // KARAKTER_BASINA_TOKEN
+        olcumler["token_kaynagi"] = "tahmin"
+
+
+# --- Kısa Yollar ---
+# Arayüz dışındaki kullanım için: cevabı akış olarak veya tek parça metin olarak döndürür.
+def stream_response(soru, havayolu_adi):
+    yield from cevap_akisi(sorguyu_hazirla(soru, havayolu_adi))
+
+
+def get_response(soru, havayolu_adi):
+    return "".join(stream_response(soru, havayolu_adi))
+
+
+# --- Toplu Sorgular ---
+# Çok sayıda (soru, havayolu) çiftini get_response döngüsünden çok daha hızlı cevaplar:
+#   1. Tüm soruların dili tespit edilir, Türkçe olanlar paralel çevrilir ve arama soruları tek bir
+#      toplu embedding çağrısıyla vektörlenir.
+#   2. Satırlar havayolu grubuna göre sıralanıp hazırlanır; diskte index yoksa her grubun geçici
+#      indexi bir kere kurulur ve grup bitince bırakılır.
+#   3. Cevap üretimi en fazla 'eszamanlilik' kadar eşzamanlı LLM çağrısıyla, hazırlık sürerken başlar.
+# Sonuçlar giriş sırasına göre değil, bittikçe (sıra, sonuç) olarak üretilir. Bir satırdaki hata sadece
+# o satırın sonucuna ('durum': 'hata') yazılır; diğer satırlar etkilenmez.
+TOPLU_URETIM_ESZAMANLILIK = int(os.getenv("TOPLU_URETIM_ESZAMANLILIK", "4"))
+
+
+def get_responses_batch(satirlar, eszamanlilik=TOPLU_URETIM_ESZAMANLILIK):
+    # satirlar: [(soru, havayolu_adi), ...]; havayolu_adi get_response'takiyle aynı biçimde.
+    if not satirlar:
+        return
+    baslat()
+    gruplar = [havayolu_anahtari(havayolu_listesi(havayolu_adi)) for _, havayolu_adi in satirlar]
+    sira = sorted(range(len(satirlar)), key=lambda i: (gruplar[i], i))
+    sorgu_vektorleri = _toplu_sorgu_vektorleri([soru for soru, _ in satirlar])
+    gecici_indexler = {}
+
+    with ThreadPoolExecutor(max_workers=eszamanlilik, thread_name_prefix="toplu-uretim") as havuz:
+        bekleyenler = set()
+        for n, i in enumerate(sira):
+            soru, havayolu_adi = satirlar[i]
+            baslangic = time.perf_counter()
+            hata = None
+            try:
+                hazirlik = sorguyu_hazirla(soru, havayolu_adi, sorgu_vektorleri, gecici_indexler)
+            except Exception as e:
+                hata = e
+            finally:
+                # Grup bittiyse (son satırı hata verse de) geçici indexi bırakıyorum; bellek bir gruptan fazlasını tutmasın.
+                if n + 1 == len(sira) or gruplar[sira[n + 1]] != gruplar[i]:
+                    gecici_indexler.pop(gruplar[i], None)
+            if hata is not None:
+                print(f"-> Toplu sorgu {i} hazırlanamadı: {hata}")
+                yield i, _toplu_sonuc(soru, havayolu_adi, None, None, baslangic, hata=hata)
+                continue
+            bekleyenler.add(havuz.submit(_toplu_cevapla, i, soru, havayolu_adi, hazirlik, baslangic))
+            # Hazırlık üretimden çok öndeyse bekliyorum; biten sonuçları hemen veriyorum.
+            bitenler, bekleyenler = wait(bekleyenler, timeout=0 if len(bekleyenler) < eszamanlilik * 2 else None,
+                                         return_when=FIRST_COMPLETED)
+            for gorev in bitenler:
+                yield gorev.result()
+        for gorev in as_completed(bekleyenler):
+            yield gorev.result()
+
+
+def _toplu_sorgu_vektorleri(sorular):
+    # {arama sorusu: vektör}. Hata olursa boş döner; her satır kendi embedding'ini hesaplar.
+    from embedding_onbellegi import sorgulari_embed_et
+    try:
+        arama_sorulari = {}
+        ceviriler = {}
+        for soru in dict.fromkeys(sorular):
+            if dil_tespit_et(soru)[0] == "tr" and not COK_DILLI_EMBEDDING:
+                ceviriler[soru] = arka_plan_havuzu.submit(ceviri_katmani.cevir, soru)
+            else:
+                arama_sorulari[soru] = soru
+        for soru, gorev in ceviriler.items():
+            arama_sorulari[soru] = gorev.result()[0]
+        benzersiz = list(dict.fromkeys(arama_sorulari.values()))
+        baslangic = time.perf_counter()
+        vektorler = sorgulari_embed_et(embeddings, benzersiz)
+        print(f"-> {len(benzersiz)} arama sorusu toplu olarak vektörlendi ({time.perf_counter() - baslangic:.2f} sn).")
+        return dict(zip(benzersiz, vektorler))
+    except Exception as e:
+        print(f"-> Toplu embedding başarısız oldu ({e}), sorular tek tek vektörlenecek.")
+        return {}
+
+
+def _toplu_cevapla(i, soru, havayolu_adi, hazirlik, baslangic):
+    try:
+        cevap = "".join(cevap_akisi(hazirlik))
+    except Exception as e:
+        return i, _toplu_sonuc(soru, havayolu_adi, hazirlik, None, baslangic, hata=e)
+    return i, _toplu_sonuc(soru, havayolu_adi, hazirlik, cevap, baslangic)
+
+
+def _kanit_satirlari(relevant_docs):
+    # Kanıtların güncel yorum deposundaki satırları. Arama sonuçlarındaki 'satir' index satırıdır (taban + ek düzeni,
+    # her güncellemede ve sıkıştırmada değişir); bu yüzden kanıtlar havayolu ve metinle depoda bulunuyor.
+    # Arada yayınlanan yeni veride artık olmayan kanıt None olur.
+    depo = index_onbellegi.yorum_deposu()
+    if depo is None:
+        return [None] * len(relevant_docs)
+    return [depo.satir_bul(doc.metadata["Airline Name"], doc.page_content) for doc in relevant_docs]
+
+
+def _toplu_sonuc(soru, havayolu_adi, hazirlik, cevap, baslangic, hata=None):
+    sonuc = {"soru": soru, "havayolu": havayolu_adi, "cevap": cevap, "durum": "hata", "dil": None,
+             "kanit_satirlari": [], "sure_sn": round(time.perf_counter() - baslangic, 3)}
+    if hazirlik is not None:
+        sonuc.update(durum=sorgu_durumu(hazirlik), dil=hazirlik.orjinal_dil,
+                     kanit_satirlari=_kanit_satirlari(hazirlik.relevant_docs))
+    if hata is not None:
+        sonuc.update(durum="hata", hata=f"{type(hata).__name__}: {hata}")
+    elif sonuc["durum"] == "hata":
+        sonuc["hata"] = hazirlik.olcumler.get("hata")
+    return sonuc
 
 
-# --- ADIM 3: Doğrudan Çalıştırma Testi ---
+# --- ADIM 4: Doğrudan Çalıştırma Testi ---
 if __name__ == '__main__':
     print("\n--- LOKAL TEST BAŞLATILDI ---")
+    baslat()
     if GOOGLE_API_KEY:
          # Test 1: Türkçe Soru
          soru1_tr = "Yemekler ve koltuklar nasıldı?"
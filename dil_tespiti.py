@@ -0,0 +1,93 @@
+# --- Gerekli Kütüphaneler ---
+# Bu modül, soru dilini her sorguda langdetect'e gitmeden, süreç içinde ve mikro saniyeler içinde tespit eder.
+# Motor sadece "Türkçe mi, değil mi" sorusuna göre dallandığı için sonuç her zaman 'tr' veya 'en'dir.
+# Model; Türkçeye özgü harflerden, sık kullanılan Türkçe/İngilizce kelimelerden, Türkçe eklerden ve
+# Türkçede geçmeyen İngilizce harf ikililerinden oluşan küçük, sabit bir ağırlık tablosudur.
+# Pozitif puan Türkçe, negatif puan İngilizce demektir. Puan güven eşiğinin altında kalırsa
+# (kısa veya karışık metinler) langdetect'e, o da karar veremezse İngilizceye düşülür.
+# Aynı metin her zaman aynı sonucu verir (langdetect de sabit tohumla çalıştırılır).
+import os
+import re
+
+# --- Genel Ayarlar ---
+# |puan| bu değerin altındaysa hızlı sınıflandırıcı emin sayılmaz.
+GUVEN_ESIGI = float(os.getenv("DIL_GUVEN_ESIGI", "2.0"))
+
+# --- Model ---
+# Türkçe alfabeye özgü harfler (ö/ü/ç başka dillerde de geçtiği için daha düşük ağırlıklı).
+HARF_AGIRLIKLARI = {"ı": 2.5, "ğ": 2.5, "ş": 2.0, "ç": 1.0, "ö": 1.0, "ü": 1.0, "w": -1.5, "q": -1.5, "x": -1.0}
+
+# Türkçe kelimelerde neredeyse hiç görülmeyen harf ikilileri.
+IKILI_AGIRLIKLARI = {"th": -1.0, "wh": -1.5, "sh": -1.0, "ck": -1.0, "ee": -0.5, "oo": -0.5, "ou": -0.5, "ea": -0.5}
+
+# Sık geçen kelimeler. Türkçe kelimelerin klavyede Türkçe harf olmadan yazılmış halleri de var.
+TURKCE_KELIMELER = """
+ve veya ile icin için ama fakat gibi kadar daha çok cok en bu şu su bir her hiç hic sadece neden niye nasıl nasil
+ne hangi kim nerede ne zaman mi mı mu mü midir mıdır miydi mıydı muydu müydü var yok değil degil olarak oldu olan
+olur olmuş olmus hakkında hakkinda diye ki de da iyi kötü kotu güzel guzel rahat temiz kirli pahalı pahali ucuz
+uçuş ucus uçuşlar ucuslar uçak ucak koltuk koltuklar yemek yemekler yemekleri personel ekip ekibi kabin bagaj
+rötar rotar gecikme havalimanı havalimani hostes bilet yolcu yolcular yolculara şikayet sikayet şikayetler
+sikayetler mürettebat murettebat ikram içecek icecek yorum yorumlar yorumları yorumlari genel genelde nasıldı
+nasildi nelerdir neler mıdır davrandı davrandi oluyor ediyor memnun kaldı kaldi
+""".split()
+INGILIZCE_KELIMELER = """
+the a an is are was were be been being how what why which who whom where when do does did and or but of to in on
+at for with about from by it its this that these those there their they them any some good bad you your my i me
+we our have has had can could would should will not no yes very much many more most better best worse worst
+food staff seat seats flight flights crew service delay delayed comfortable legroom baggage lounge common
+complaints airline airlines passengers experience overall meal meals entertainment
+""".split()
+KELIME_AGIRLIKLARI = {**{k: 2.0 for k in TURKCE_KELIMELER}, **{k: -2.0 for k in INGILIZCE_KELIMELER}}
+
+# Kelime sonları; kelime tabloda yoksa en uzun eşleşen ek bir kere sayılır.
+EK_AGIRLIKLARI = {
+    "ları": 1.5, "leri": 1.5, "ında": 1.5, "inde": 1.0, "ydı": 1.5, "ydi": 1.5, "mış": 1.5, "miş": 1.5,
+    "muş": 1.5, "müş": 1.5, "yor": 1.5, "yordu": 2.0, "lar": 1.0, "ler": 0.5, "dı": 1.0, "tı": 1.0, "du": 0.5,
+    "dü": 1.0, "nın": 1.5, "nin": 1.0, "dan": 0.5, "den": 0.5, "sı": 1.0, "mı": 1.0, "cak": 1.0, "cek": 1.0,
+    "ing": -1.5, "tion": -1.5, "ness": -1.0, "ght": -1.5, "ed": -0.5, "ly": -0.5, "'s": -1.0,
+}
+_EK_UZUNLUKLARI = sorted({len(ek) for ek in EK_AGIRLIKLARI}, reverse=True)
+
+_KELIME_DESENI = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+
+
+def dil_puani(metin):
+    # Pozitif: Türkçe, negatif: İngilizce. Büyük İ'yi i'ye çevirip küçük harfe indiriyorum
+    # (I -> ı dönüşümü yapmıyorum; İngilizcedeki "I" zamiri Türkçe sayılmasın).
+    puan = 0.0
+    for kelime in _KELIME_DESENI.findall(metin.replace("İ", "i").lower()):
+        for harf in kelime:
+            puan += HARF_AGIRLIKLARI.get(harf, 0.0)
+        agirlik = KELIME_AGIRLIKLARI.get(kelime)
+        if agirlik is not None:
+            puan += agirlik
+            continue
+        for i in range(len(kelime) - 1):
+            puan += IKILI_AGIRLIKLARI.get(kelime[i:i + 2], 0.0)
+        for uzunluk in _EK_UZUNLUKLARI:
+            if len(kelime) > uzunluk + 1 and kelime[-uzunluk:] in EK_AGIRLIKLARI:
+                puan += EK_AGIRLIKLARI[kelime[-uzunluk:]]
+                break
+    return puan
+
+
+def _langdetect_ile(metin):
+    # Ağır ve yavaş yol; sadece hızlı sınıflandırıcı emin olmadığında çalışır.
+    from langdetect import DetectorFactory, detect, LangDetectException
+    DetectorFactory.seed = 0
+    try:
+        return "tr" if detect(metin) == "tr" else "en", "langdetect"
+    except LangDetectException:
+        return "en", "varsayilan"
+
+
+def dil_tespit_et(metin):
+    # (dil, yöntem) döndürür; dil 'tr' veya 'en', yöntem 'hizli', 'langdetect' veya 'varsayilan'.
+    puan = dil_puani(metin)
+    if puan >= GUVEN_ESIGI:
+        return "tr", "hizli"
+    if puan <= -GUVEN_ESIGI:
+        return "en", "hizli"
+    if not _KELIME_DESENI.search(metin):
+        return "en", "varsayilan"
+    return _langdetect_ile(metin)
@@ -0,0 +1,183 @@
+# --- Gerekli Kütüphaneler ---
+# Bu modül, yorumları embedding servisine toplu (batch) ve eşzamanlı gönderen,
+# kota (429) hatalarında geri çekilip tekrar deneyen ve ilerlemesini diske kaydeden
+# bir hat (pipeline) sağlar. Yarıda kesilen bir çalışma kaldığı yerden devam eder.
+import os
+import json
+import time
+import random
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import numpy as np
+
+# --- Genel Ayarlar ---
+# Hepsi ortam değişkenleriyle değiştirilebilir.
+VARSAYILAN_BATCH_BOYUTU = int(os.getenv("EMBEDDING_BATCH_BOYUTU", "100"))
+VARSAYILAN_ESZAMANLILIK = int(os.getenv("EMBEDDING_ESZAMANLILIK", "4"))
+VARSAYILAN_ISTEK_HIZI = float(os.getenv("EMBEDDING_ISTEK_HIZI", "10"))  # saniyedeki istek sayısı
+VARSAYILAN_PARCA_BOYUTU = int(os.getenv("EMBEDDING_PARCA_BOYUTU", "2000"))  # CSV'den tek seferde okunan satır
+MAKS_DENEME = 8
+
+
+def kota_hatasi_mi(hata):
+    # Google API'nin hız sınırı / kota hataları farklı sınıflarla gelebildiği için mesaja bakıyorum.
+    mesaj = str(hata).lower()
+    return any(ifade in mesaj for ifade in ("429", "quota", "resource has been exhausted", "rate limit"))
+
+
+# --- Token Kovası ---
+class TokenKovasi:
+    # Saniyede 'hiz' kadar jeton dolan, en fazla 'kapasite' jeton tutan kova.
+    # Her istek bir jeton harcar; jeton yoksa dolana kadar bekler.
+
+    def __init__(self, hiz, kapasite=None):
+        self.hiz = hiz
+        self.kapasite = kapasite or max(1.0, hiz)
+        self._jeton = self.kapasite
+        self._son_zaman = time.monotonic()
+        self._kilit = threading.Lock()
+
+    def al(self, adet=1):
+        while True:
+            with self._kilit:
+                simdi = time.monotonic()
+                self._jeton = min(self.kapasite, self._jeton + (simdi - self._son_zaman) * self.hiz)
+                self._son_zaman = simdi
+                if self._jeton >= adet:
+                    self._jeton -= adet
+                    return
+                bekleme = (adet - self._jeton) / self.hiz
+            time.sleep(bekleme)
+
+
+# --- Embedding Hattı ---
+class EmbeddingHatti:
+    # batch boyutu ve eşzamanlılık çalışma sırasında ayarlanır (AIMD mantığı):
+    # kota hatası gelince ikisi de yarıya iner, art arda başarılı isteklerde yavaşça geri artar.
+
+    def __init__(self, embeddings, batch_boyutu=VARSAYILAN_BATCH_BOYUTU, eszamanlilik=VARSAYILAN_ESZAMANLILIK,
+                 istek_hizi=VARSAYILAN_ISTEK_HIZI, maks_deneme=MAKS_DENEME, taban_bekleme=1.0, maks_bekleme=60.0):
+        self.embeddings = embeddings
+        self.maks_batch_boyutu = batch_boyutu
+        self.maks_eszamanlilik = eszamanlilik
+        self.batch_boyutu = batch_boyutu
+        self.eszamanlilik = eszamanlilik
+        self.kova = TokenKovasi(istek_hizi)
+        self.maks_deneme = maks_deneme
+        self.taban_bekleme = taban_bekleme
+        self.maks_bekleme = maks_bekleme
+        self._kilit = threading.Lock()
+        self._basari_serisi = 0
+        self.istek_sayisi = 0
+        self.kota_hatasi_sayisi = 0
+
+    # --- Uyarlamalı Ayar ---
+    def _kota_hatasi_bildir(self):
+        with self._kilit:
+            self.kota_hatasi_sayisi += 1
+            self._basari_serisi = 0
+            self.batch_boyutu = max(1, self.batch_boyutu // 2)
+            self.eszamanlilik = max(1, self.eszamanlilik // 2)
+
+    def _basari_bildir(self):
+        with self._kilit:
+            self._basari_serisi += 1
+            if self._basari_serisi >= 5:
+                self._basari_serisi = 0
+                self.batch_boyutu = min(self.maks_batch_boyutu, self.batch_boyutu + max(1, self.batch_boyutu // 4))
+                self.eszamanlilik = min(self.maks_eszamanlilik, self.eszamanlilik + 1)
+
+    def _batch_embed_et(self, metinler):
+        # Tek bir batch'i, kota hatalarında üstel geri çekilme (+ rastgele sapma) ile tekrar deneyerek gönderir.
+        for deneme in range(self.maks_deneme):
+            self.kova.al()
+            try:
+                with self._kilit:
+                    self.istek_sayisi += 1
+                vektorler = self.embeddings.embed_documents(metinler)
+                self._basari_bildir()
+                return vektorler
+            except Exception as e:
+                if not kota_hatasi_mi(e) or deneme == self.maks_deneme - 1:
+                    raise
+                self._kota_hatasi_bildir()
+                bekleme = min(self.maks_bekleme, self.taban_bekleme * 2 ** deneme)
+                bekleme += random.uniform(0, bekleme * 0.1)
+                print(f"-> Kota sınırına takıldı, {bekleme:.1f} sn sonra tekrar denenecek "
+                      f"(batch={self.batch_boyutu}, eşzamanlılık={self.eszamanlilik}).")
+                time.sleep(bekleme)
+
+    def metinleri_embed_et(self, metinler):
+        # Metin listesini sırası korunarak vektör matrisine (float32) çevirir.
+        # Aynı anda en fazla 'eszamanlilik' kadar batch servise gönderilir.
+        sonuc = [None] * len(metinler)
+        with ThreadPoolExecutor(max_workers=self.maks_eszamanlilik) as havuz:
+            bekleyenler = {}
+            konum = 0
+            while konum < len(metinler) or bekleyenler:
+                while konum < len(metinler) and len(bekleyenler) < self.eszamanlilik:
+                    bitis = min(len(metinler), konum + self.batch_boyutu)
+                    bekleyenler[havuz.submit(self._batch_embed_et, metinler[konum:bitis])] = konum
+                    konum = bitis
+                bitenler, _ = wait(bekleyenler, return_when=FIRST_COMPLETED)
+                for future in bitenler:
+                    baslangic = bekleyenler.pop(future)
+                    vektorler = future.result()
+                    sonuc[baslangic:baslangic + len(vektorler)] = vektorler
+        return np.asarray(sonuc, dtype=np.float32)
+
+    # --- CSV'den Devam Ettirilebilir Embedding ---
+    def csv_embed_et(self, veri_dosyasi, checkpoint_klasoru, veri_ozeti, metin_sutunu="birlesik_yorum",
+                     parca_boyutu=VARSAYILAN_PARCA_BOYUTU):
+        # CSV'yi parça parça okuyup her parçanın vektörlerini ayrı bir .npy dosyasına yazar.
+        # 'durum.json' hangi parçaların bittiğini tutar; aynı veri ve ayarlarla tekrar çalıştırılınca
+        # biten parçalar atlanır. Sonuç, CSV satır sırasıyla hizalı vektör matrisidir.
+        durum_yolu = os.path.join(checkpoint_klasoru, "durum.json")
+        beklenen = {"veri_ozeti": veri_ozeti, "parca_boyutu": parca_boyutu, "metin_sutunu": metin_sutunu}
+        durum = None
+        try:
+            with open(durum_yolu, encoding="utf-8") as f:
+                durum = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+        if durum is None or durum.get("ayarlar") != beklenen:
+            # Veri ya da ayar değiştiyse eski checkpoint'ler geçersiz.
+            shutil.rmtree(checkpoint_klasoru, ignore_errors=True)
+            durum = {"ayarlar": beklenen, "biten_parcalar": []}
+        os.makedirs(checkpoint_klasoru, exist_ok=True)
+        biten = set(durum["biten_parcalar"])
+        if biten:
+            print(f"-> Önceki çalışmadan {len(biten)} parça bulundu, kaldığı yerden devam ediliyor.")
+
+        parca_dosyalari = []
+        baslangic = time.time()
+        islenen_satir = 0
+        import pandas as pd
+        for parca_no, parca in enumerate(pd.read_csv(veri_dosyasi, usecols=[metin_sutunu], chunksize=parca_boyutu)):
+            parca_yolu = os.path.join(checkpoint_klasoru, f"parca_{parca_no:06d}.npy")
+            parca_dosyalari.append(parca_yolu)
+            if parca_no in biten:
+                continue
+
+            vektorler = self.metinleri_embed_et(parca[metin_sutunu].astype(str).tolist())
+            # Önce geçici dosyaya yazıp sonra yerine taşıyorum; yarım dosya checkpoint sayılmasın.
+            gecici_yol = parca_yolu + ".tmp.npy"
+            np.save(gecici_yol, vektorler)
+            os.replace(gecici_yol, parca_yolu)
+            biten.add(parca_no)
+            durum["biten_parcalar"] = sorted(biten)
+            with open(durum_yolu + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(durum, f)
+            os.replace(durum_yolu + ".tmp", durum_yolu)
+
+            islenen_satir += len(parca)
+            gecen = max(time.time() - baslangic, 1e-9)
+            print(f"- Parça {parca_no}: {len(parca)} yorum embedding'e çevrildi "
+                  f"({islenen_satir / gecen:.0f} yorum/sn, {self.istek_sayisi} istek, "
+                  f"{self.kota_hatasi_sayisi} kota hatası).")
+
+        if not parca_dosyalari:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.concatenate([np.load(yol) for yol in parca_dosyalari])
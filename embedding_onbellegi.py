@@ -0,0 +1,122 @@
+# --- Gerekli Kütüphaneler ---
+# Bu modül, embedding modelinin etrafına sarılan ve vektörleri metnin özetine göre
+# diskte saklayan bir önbellek sağlar. Veri seti yenilendiğinde sadece yeni veya
+# değişmiş yorumlar embedding servisine gönderilir.
+import os
+import sqlite3
+import inspect
+import hashlib
+import threading
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+# --- Genel Ayarlar ---
+VARSAYILAN_ONBELLEK_DOSYASI = os.getenv("EMBEDDING_ONBELLEK_DOSYASI", "embedding_onbellegi.sqlite")
+# SQLite'ın tek sorguda kabul ettiği parametre sayısı sınırlı; sorguları bu boyutta parçalıyorum.
+SORGU_PARCA_BOYUTU = 500
+
+
+def metin_anahtari(model_adi, tur, metin):
+    # Anahtar: model adı + vektör türü (doküman/sorgu) + metnin kendisi.
+    # Google modeli doküman ve sorgu için farklı vektör ürettiği için türü de anahtara katıyorum.
+    return hashlib.sha256(f"{model_adi}\0{tur}\0{metin}".encode("utf-8")).digest()
+
+
+def sorgulari_embed_et(embeddings, sorular):
+    # Model toplu sorgu embedding'i destekliyorsa tek istek atılır. Google modelinde embed_query zaten
+    # embed_documents'ı task_type=RETRIEVAL_QUERY ile çağırıyor; aynı vektörler toplu olarak alınıyor.
+    if hasattr(embeddings, "embed_queries"):
+        return embeddings.embed_queries(sorular)
+    if "task_type" in inspect.signature(embeddings.embed_documents).parameters:
+        return embeddings.embed_documents(sorular, task_type=getattr(embeddings, "task_type", None) or "RETRIEVAL_QUERY")
+    return [embeddings.embed_query(soru) for soru in sorular]
+
+
+class OnbellekliEmbeddings(Embeddings):
+    # Herhangi bir LangChain Embeddings nesnesini saran önbellek katmanı.
+    # Vektörler float32 olarak SQLite'ta tutulur. WAL modu sayesinde birden fazla
+    # Streamlit süreci aynı dosyayı aynı anda okuyabilir, yazarlar birbirini bekler.
+
+    def __init__(self, embeddings, model_adi, dosya_yolu=VARSAYILAN_ONBELLEK_DOSYASI):
+        self.embeddings = embeddings
+        self.model_adi = model_adi
+        self.dosya_yolu = dosya_yolu
+        self._kilit = threading.Lock()
+        self._baglanti = sqlite3.connect(dosya_yolu, timeout=30, check_same_thread=False)
+        self._baglanti.execute("PRAGMA journal_mode=WAL")
+        self._baglanti.execute("PRAGMA synchronous=NORMAL")
+        self._baglanti.execute(
+            "CREATE TABLE IF NOT EXISTS vektorler (anahtar BLOB PRIMARY KEY, vektor BLOB NOT NULL)"
+        )
+        self._baglanti.commit()
+        self.isabet = 0
+        self.iska = 0
+
+    # --- Önbellek Okuma/Yazma ---
+    def _oku(self, anahtarlar):
+        bulunanlar = {}
+        with self._kilit:
+            for i in range(0, len(anahtarlar), SORGU_PARCA_BOYUTU):
+                parca = anahtarlar[i:i + SORGU_PARCA_BOYUTU]
+                yer_tutucular = ",".join("?" * len(parca))
+                satirlar = self._baglanti.execute(
+                    f"SELECT anahtar, vektor FROM vektorler WHERE anahtar IN ({yer_tutucular})", parca
+                )
+                for anahtar, vektor in satirlar:
+                    bulunanlar[anahtar] = np.frombuffer(vektor, dtype=np.float32).tolist()
+        return bulunanlar
+
+    def _yaz(self, kayitlar):
+        with self._kilit:
+            self._baglanti.executemany(
+                "INSERT OR IGNORE INTO vektorler (anahtar, vektor) VALUES (?, ?)",
+                [(anahtar, np.asarray(vektor, dtype=np.float32).tobytes()) for anahtar, vektor in kayitlar],
+            )
+            self._baglanti.commit()
+
+    def _onbellekten_embed(self, metinler, tur, hesapla):
+        anahtarlar = [metin_anahtari(self.model_adi, tur, metin) for metin in metinler]
+        bulunanlar = self._oku(list(set(anahtarlar)))
+
+        # Önbellekte olmayan metinleri (aynı metin birden fazla geçse de) sadece bir kere hesaplatıyorum.
+        eksikler = {}
+        for anahtar, metin in zip(anahtarlar, metinler):
+            if anahtar not in bulunanlar and anahtar not in eksikler:
+                eksikler[anahtar] = metin
+
+        self.isabet += len(anahtarlar) - sum(1 for a in anahtarlar if a in eksikler)
+        self.iska += sum(1 for a in anahtarlar if a in eksikler)
+
+        if eksikler:
+            yeni_vektorler = hesapla(list(eksikler.values()))
+            yeni_kayitlar = list(zip(eksikler.keys(), yeni_vektorler))
+            self._yaz(yeni_kayitlar)
+            bulunanlar.update((anahtar, list(vektor)) for anahtar, vektor in yeni_kayitlar)
+
+        return [bulunanlar[anahtar] for anahtar in anahtarlar]
+
+    # --- LangChain Embeddings Arayüzü ---
+    def embed_documents(self, texts):
+        return self._onbellekten_embed(texts, "dokuman", self.embeddings.embed_documents)
+
+    def embed_query(self, text):
+        return self._onbellekten_embed([text], "sorgu", lambda m: [self.embeddings.embed_query(m[0])])[0]
+
+    def embed_queries(self, texts):
+        # Birden fazla soruyu tek seferde vektörler (toplu sorgular için); önbellekte olmayanlar tek istekle hesaplanır.
+        return self._onbellekten_embed(texts, "sorgu", lambda m: sorgulari_embed_et(self.embeddings, m))
+
+    # --- İstatistikler ---
+    def istatistikler(self):
+        toplam = self.isabet + self.iska
+        return {
+            "isabet": self.isabet,
+            "iska": self.iska,
+            "isabet_orani": self.isabet / toplam if toplam else 0.0,
+        }
+
+    def istatistikleri_yazdir(self):
+        ist = self.istatistikler()
+        print(f"-> Embedding önbelleği: {ist['isabet']} isabet, {ist['iska']} ıska "
+              f"(isabet oranı %{ist['isabet_orani'] * 100:.1f}).")
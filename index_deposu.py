@@ -0,0 +1,522 @@
+# --- Gerekli Kütüphaneler ---
+import os
+import json
+import time
+import uuid
+import shutil
+import threading
+
+import numpy as np
+import faiss
+
+from embedding_hatti import EmbeddingHatti
+from sozcuksel_index import SozcukselIndex, rrf_birlestir
+from yorum_deposu import META_DOSYASI, YORUM_DEPOSU_KLASORU, YorumDeposu, dosya_parmak_izi
+
+# --- Genel Ayarlar ---
+# Çevrimdışı oluşturulan indexin tutulduğu klasör ve indexin hangi veriden
+# üretildiğini kaydeden manifest dosyası.
+INDEX_KLASORU = "faiss_indexleri"
+MANIFEST_DOSYASI = "manifest.json"
+# Yayını süren bir güncellemenin yayınlayacağı manifest; güncelleme yarıda kesilirse bir sonraki bunu tamamlar.
+BEKLEYEN_MANIFEST_DOSYASI = "manifest.bekleyen.json"
+# Index klasörünün içindeki değişmez sürüm klasörleri: global indexin kendisi (taban) ve artımlı
+# güncellemelerin ekleri ('artimli_index.py'). Hangi sürümlerin geçerli olduğunu sadece kök manifest gösterir
+# ('taban_surumu', 'ek_surumu'); yeni bir sürüm tamamen yazıldıktan sonra tek bir manifest değişikliğiyle yayınlanır.
+TABAN_KLASOR_ADI = "tabanlar"
+EK_KLASOR_ADI = "ekler"
+# Yeni sürüm yayınlandıktan sonra diskte bırakılan eski sürüm sayısı; manifest değişmeden hemen önce
+# eski sürümü okumaya başlamış süreçlerin klasörü silinmiş bulmaması için.
+SAKLANAN_ESKI_SURUM = 1
+# 'taban_surumu' olmayan eski düzende taban doğrudan index klasörüne yazılırdı; tabanlar/ düzenine geçildikten
+# sonraki ilk temizlikte bu dosyalar silinir.
+ESKI_DUZEN_DOSYALARI = ("yorumlar.faiss", "anahtarlar.npy", "metinler.bin", "ofsetler.npy",
+                        "havayolu_idleri.npy", "meta.json", "bm25", "parcalar")
+# Türkçe soruları çeviri yapmadan İngilizce yorumlarla eşleştirebilen çok dilli bir model
+# (ör. "models/text-embedding-004") seçilirse indexin bu modelle yeniden oluşturulması gerekir.
+EMBEDDING_MODEL_ADI = os.getenv("EMBEDDING_MODEL_ADI", "models/embedding-001")
+GLOBAL_INDEX_ADI = "yorumlar"
+# Her satırın 64 bitlik yorum anahtarı (artımlı güncellemede satırları eşleştirmek için, 'artimli_index.py').
+ANAHTAR_DOSYASI = "anahtarlar.npy"
+
+# Hibrit arama: vektör araması ile BM25 kelime aramasının sonuçları Reciprocal Rank Fusion ile birleştirilir.
+# Her iki yöntemden de bu kadar aday alınır; HIBRIT_ARAMA=0 ile sadece vektör araması yapılır.
+HIBRIT_ARAMA = os.getenv("HIBRIT_ARAMA", "1") == "1"
+HIBRIT_ADAY_SAYISI = int(os.getenv("HIBRIT_ADAY_SAYISI", "20"))
+
+
+# --- Yardımcı Fonksiyonlar ---
+def manifest_yaz(index_klasoru, manifest, dosya_adi=MANIFEST_DOSYASI):
+    # Manifest'i önce geçici dosyaya yazıp sonra yerine taşıyorum ki okuyan
+    # bir süreç yarım yazılmış dosya görmesin.
+    yol = os.path.join(index_klasoru, dosya_adi)
+    gecici_yol = yol + ".tmp"
+    with open(gecici_yol, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(gecici_yol, yol)
+
+
+def manifest_oku(index_klasoru, dosya_adi=MANIFEST_DOSYASI):
+    yol = os.path.join(index_klasoru, dosya_adi)
+    try:
+        with open(yol, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def taban_veri_ozeti(manifest):
+    # Global indexin (tabanın) kurulduğu verinin özeti. Artımlı güncellemeler 'veri_ozeti'ni güncel CSV'ye
+    # taşır ama tabanı değiştirmez; parçalar gibi tabandan türetilen dosyalar bu özete bağlıdır.
+    return manifest.get("taban_veri_ozeti") or manifest.get("veri_ozeti")
+
+
+def yeni_surum_adi():
+    # Sürüm klasörü adları zamana göre sıralanır; aynı saniyedeki sürümler rastgele ekle ayrılır.
+    return f"{time.strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:8]}"
+
+
+def taban_klasoru(index_klasoru, manifest):
+    # Manifest'in gösterdiği tabanın klasörü; eski düzende taban index klasörünün kendisidir.
+    if manifest and manifest.get("taban_surumu"):
+        return os.path.join(index_klasoru, TABAN_KLASOR_ADI, manifest["taban_surumu"])
+    return index_klasoru
+
+
+def surum_anahtari(manifest):
+    # Yüklenen indexin içeriğini belirleyen alanlar. 'bekleyen_veri_ozeti' gibi yayın sırasında değişen
+    # alanlar yüklü indexi geçersiz kılmaz.
+    return manifest.get("taban_surumu"), manifest.get("ek_surumu"), manifest.get("veri_ozeti")
+
+
+def surumu_yayinla(index_klasoru, manifest, onceki_manifest=None):
+    # Tamamen yazılmış sürüm klasörlerini gösteren manifest tek bir atomik değişiklikle yayınlanır; ardından
+    # geçerli sürümler ve her türden SAKLANAN_ESKI_SURUM eski sürüm dışındakiler (ve yarım kalanlar) silinir.
+    manifest_yaz(index_klasoru, manifest)
+    gecerliler = {TABAN_KLASOR_ADI: manifest.get("taban_surumu"), EK_KLASOR_ADI: manifest.get("ek_surumu")}
+    for alt_klasor, gecerli in gecerliler.items():
+        klasor = os.path.join(index_klasoru, alt_klasor)
+        if not os.path.isdir(klasor):
+            continue
+        adlar = os.listdir(klasor)
+        surumler = sorted(ad for ad in adlar if not ad.endswith(".yeni") and ad != gecerli)
+        silinecekler = surumler[:max(0, len(surumler) - SAKLANAN_ESKI_SURUM)]
+        silinecekler += [ad for ad in adlar if ad.endswith(".yeni")]
+        for ad in silinecekler:
+            shutil.rmtree(os.path.join(klasor, ad), ignore_errors=True)
+
+    # Eski düzendeki taban, yeni düzene geçen yayından bir sonrakinde silinir; arada eski tabanı açmış
+    # süreçler sorgularını bitirebilir.
+    if manifest.get("taban_surumu") and onceki_manifest and onceki_manifest.get("taban_surumu"):
+        for ad in ESKI_DUZEN_DOSYALARI:
+            yol = os.path.join(index_klasoru, ad)
+            if os.path.isdir(yol):
+                shutil.rmtree(yol, ignore_errors=True)
+            elif os.path.exists(yol):
+                os.remove(yol)
+
+
+def faiss_index_oku(index_yolu):
+    # Index dosyasını mümkünse bellek eşlemeli (mmap) açıyorum. Böylece vektörler
+    # işletim sisteminin sayfa önbelleğinde kalıyor ve Streamlit süreçleri arasında paylaşılıyor.
+    # Bu index türü mmap desteklemiyorsa normal okumaya geri dönüyorum.
+    try:
+        return faiss.read_index(index_yolu, faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY), True
+    except (AttributeError, RuntimeError):
+        return faiss.read_index(index_yolu), False
+
+
+def index_yukle(index_klasoru, manifest):
+    # Global indexi yükler; manifest'te artımlı güncelleme sürümü varsa eki ve silinen satırlarıyla birlikte.
+    yorum_indexi = YorumIndexi.yukle(taban_klasoru(index_klasoru, manifest))
+    if manifest.get("ek_surumu"):
+        # artimli_index bu modülü import ettiği için burada import ediliyor.
+        from artimli_index import ArtimliYorumIndexi
+        yorum_indexi = ArtimliYorumIndexi.yukle(index_klasoru, manifest["ek_surumu"], yorum_indexi)
+    return yorum_indexi
+
+
+def havayolu_listesi(havayolu_adi):
+    # get_response'a tek bir isim, isim listesi veya None (tüm havayolları) gelebilir.
+    if havayolu_adi is None:
+        return None
+    if isinstance(havayolu_adi, str):
+        return [havayolu_adi]
+    return list(havayolu_adi)
+
+
+# --- Global Yorum Indexi ---
+class YorumIndexi:
+    # Tüm yorumları tek bir FAISS indexinde tutar. Indexin i. satırı, yanındaki sütun bazlı
+    # yorum deposunun (YorumDeposu) i. satırıdır. Depo havayoluna göre sıralı olduğu için
+    # her havayolu indexte kesintisiz bir satır aralığına [baslangic, bitis) denk gelir.
+    # Havayolu filtresi, sorgu anında DataFrame maskesi yerine bu aralıklardan kurulan
+    # FAISS IDSelector ile doğrudan arama sırasında uygulanır.
+    # Aynı satır numaralarıyla bir de BM25 sözcüksel index (SozcukselIndex) tutulur.
+    # Diskte index parçaları varsa ('parcali_index.py') büyük havayollarının vektör araması
+    # global index yerine parçalarda, ayrı süreçlerde yapılır.
+    # Artımlı güncellemeler yapıldıysa bu index 'artimli_index.ArtimliYorumIndexi' ile sarılır.
+
+    def __init__(self, index, depo, sozcuksel=None, parcali=None, anahtarlar=None):
+        self.index = index
+        self.depo = depo
+        self.sozcuksel = sozcuksel
+        self.parcali = parcali
+        # Satır başına yorum anahtarı (uint64); sadece index oluşturulurken verilir ve diske yazılır.
+        self.anahtarlar = anahtarlar
+        self._parcasiz_secici_onbellegi = None
+
+    @property
+    def havayollari(self):
+        return self.depo.havayollari
+
+    @property
+    def araliklar(self):
+        return self.depo.araliklar
+
+    @classmethod
+    def olustur(cls, metinler, havayolu_adlari, embeddings):
+        # Metinleri batch'ler halinde, kota hatalarında tekrar deneyerek vektörlere çeviriyorum.
+        vektorler = EmbeddingHatti(embeddings).metinleri_embed_et(metinler)
+        return cls.vektorlerden_olustur(vektorler, metinler, havayolu_adlari)
+
+    @classmethod
+    def vektorlerden_olustur(cls, vektorler, metinler, havayolu_adlari, anahtarlar=None):
+        # Depo satırları havayoluna göre kararlı sıralar; vektörleri (ve anahtarları) de aynı sıraya diziyorum.
+        depo = YorumDeposu.bellekten(havayolu_adlari, metinler)
+        sira = sorted(range(len(metinler)), key=lambda i: havayolu_adlari[i])
+        vektorler = np.ascontiguousarray(np.asarray(vektorler, dtype=np.float32)[sira])
+        if anahtarlar is not None:
+            anahtarlar = np.asarray(anahtarlar, dtype=np.uint64)[sira]
+
+        index = faiss.IndexFlatL2(vektorler.shape[1])
+        index.add(vektorler)
+        # Sözcüksel index de depo sırasıyla kuruluyor ki iki index aynı satır numaralarını paylaşsın.
+        sozcuksel = SozcukselIndex.olustur(depo.metin(i) for i in range(len(depo)))
+        return cls(index, depo, sozcuksel=sozcuksel, anahtarlar=anahtarlar)
+
+    def kaydet(self, klasor):
+        os.makedirs(klasor, exist_ok=True)
+        faiss.write_index(self.index, os.path.join(klasor, f"{GLOBAL_INDEX_ADI}.faiss"))
+        self.depo.kaydet(klasor)
+        if self.sozcuksel is not None:
+            self.sozcuksel.kaydet(klasor)
+        if self.anahtarlar is not None:
+            np.save(os.path.join(klasor, ANAHTAR_DOSYASI), self.anahtarlar)
+
+    @classmethod
+    def yukle(cls, klasor):
+        index, _ = faiss_index_oku(os.path.join(klasor, f"{GLOBAL_INDEX_ADI}.faiss"))
+        depo = YorumDeposu.yukle(klasor)
+        # Posting listeleri de mmap ile açılıyor; sadece terim sözlüğü hafızaya alınıyor.
+        # Eski indexlerde sözcüksel index yoksa sadece vektör araması yapılır.
+        sozcuksel = SozcukselIndex.yukle(klasor)
+        if sozcuksel is None:
+            print("-> Indexte BM25 sözcüksel index yok, sadece vektör araması yapılacak.")
+        # parcali_index bu modülü import ettiği için burada import ediliyor.
+        from parcali_index import ParcaliArama
+        return cls(index, depo, sozcuksel, ParcaliArama.yukle(klasor))
+
+    def isindir(self, havayollari, parca_satir=4096):
+        # mmap ile açılan vektörlerin bu havayollarına düşen sayfalarını okuyup işletim sisteminin
+        # sayfa önbelleğine getirir; ilk arama diskten okumayı beklemez. BM25 listeleri de okunur.
+        for ad in havayollari:
+            baslangic, bitis = self.araliklar[ad]
+            for i in range(baslangic, bitis, parca_satir):
+                self.index.reconstruct_n(i, min(parca_satir, bitis - i))
+        if self.sozcuksel is not None:
+            self.sozcuksel.isindir()
+        if self.parcali is not None:
+            self.parcali.isindir(havayollari)
+
+    def vektorler(self, satirlar):
+        # Verilen satırların indexte saklanan vektörleri (bağlam derlerken kanıtları karşılaştırmak için).
+        if not satirlar:
+            return np.zeros((0, self.index.d), dtype=np.float32)
+        return np.vstack([self._vektor(satir) for satir in satirlar])
+
+    def manifest_bilgisi(self):
+        return {"havayollari": self.havayollari, "yorum_sayisi": len(self.depo)}
+
+    def yorum_sayisi(self, havayollari=None):
+        return self.depo.yorum_sayisi(havayollari)
+
+    def _secici(self, havayollari):
+        # Tek havayolu için aralık seçici; birden fazlası için aralıkları birleştirip ID kümesi seçici.
+        araliklar = [self.araliklar[ad] for ad in havayollari]
+        if len(araliklar) == 1:
+            return faiss.IDSelectorRange(*araliklar[0])
+        idler = np.concatenate([np.arange(b, s, dtype=np.int64) for b, s in araliklar])
+        return faiss.IDSelectorBatch(idler)
+
+    def _parcasiz_secici(self):
+        # Tüm havayollarında aramada global indexte sadece parçalanmamış satırlar aranır: parçalı havayollarının
+        # birkaç aralığı dışındaki her şey (IDSelectorNot). Seçici index sürümü başına bir kere kurulur; her
+        # sorguda tüm satır numaralarından bir ID kümesi kurulmaz. Alt seçiciler de tutuluyor, çünkü FAISS
+        # seçicileri onları Python referansı olmadan gösterir.
+        if self._parcasiz_secici_onbellegi is None:
+            seciciler = [faiss.IDSelectorRange(*self.araliklar[ad])
+                         for ad in sorted(self.parcali.havayolu_parcalari) if ad in self.araliklar]
+            parcali = seciciler[0]
+            for secici in seciciler[1:]:
+                parcali = faiss.IDSelectorOr(parcali, secici)
+                seciciler.append(parcali)
+            self._parcasiz_secici_onbellegi = (faiss.IDSelectorNot(parcali), seciciler)
+        return self._parcasiz_secici_onbellegi[0]
+
+    def ara(self, sorgu_vektoru, k=5, havayollari=None, sorgu_metni=None):
+        # havayollari None ise tüm yorumlarda arar; liste ise sadece o havayollarının satırlarında.
+        # Birden fazla havayolu verildiğinde tek bir arama yapılır ve her havayolundan
+        # en fazla k sonuç seçilir, böylece karşılaştırma sorularında hepsinden kanıt gelir.
+        # sorgu_metni verilirse vektör sonuçları BM25 sonuçlarıyla RRF ile birleştirilir (hibrit arama).
+        x = np.asarray(sorgu_vektoru, dtype=np.float32).reshape(1, -1)
+        if havayollari is not None:
+            havayollari = [ad for ad in havayollari if self.yorum_sayisi([ad])]
+            if not havayollari:
+                return []
+        tek_grup = havayollari is None or len(havayollari) == 1
+        hibrit = HIBRIT_ARAMA and self.sozcuksel is not None and bool(sorgu_metni)
+
+        # Bir havayolunun sonuçları diğerlerini bastırmasın diye fazladan aday çekiyorum.
+        aday_sayisi = k if tek_grup else k * len(havayollari) * 4
+        if hibrit:
+            aday_sayisi = max(aday_sayisi, HIBRIT_ADAY_SAYISI)
+        vektor_sonuclari, bm25_gruplari = self._adaylar(x, aday_sayisi, havayollari, sorgu_metni if hibrit else None,
+                                                        aday_sayisi if tek_grup else k * 4)
+        mesafe_haritasi = {satir: mesafe for mesafe, satir in vektor_sonuclari}
+        siralama = list(mesafe_haritasi)
+
+        bm25_puanlari = {}
+        if hibrit:
+            # BM25 her havayolu için kendi yorumları içinde (kendi IDF'i ile) ayrı sıralanır;
+            # her liste RRF'e ayrı girer, böylece karşılaştırmada küçük havayolları da eşit şans alır.
+            sozcuksel_siralamalar = []
+            for sonuclar in bm25_gruplari.values():
+                bm25_puanlari.update(sonuclar)
+                sozcuksel_siralamalar.append([satir for satir, _ in sonuclar])
+            siralama = rrf_birlestir([siralama] + sozcuksel_siralamalar)
+
+        dokumanlar = self._dokumanlar(siralama, mesafe_haritasi, bm25_puanlari, x)
+        if tek_grup:
+            return dokumanlar[:k]
+
+        sayaclar = {}
+        secilenler = []
+        for doc in dokumanlar:
+            ad = doc.metadata["Airline Name"]
+            if sayaclar.get(ad, 0) < k:
+                sayaclar[ad] = sayaclar.get(ad, 0) + 1
+                secilenler.append(doc)
+        return secilenler
+
+    def _adaylar(self, x, aday_sayisi, havayollari, sorgu_metni, bm25_sayisi):
+        # Vektör adayları [(mesafe, satır), ...] ve sorgu_metni verildiyse her havayolu grubu için BM25 adayları
+        # {havayolu (tümü için None): [(satır, puan), ...]}.
+        vektor_sonuclari = self._vektor_ara(x, aday_sayisi, havayollari)
+        bm25_gruplari = {}
+        if sorgu_metni and self.sozcuksel is not None:
+            for ad in [None] if havayollari is None else havayollari:
+                araliklar = None if ad is None else [self.araliklar[ad]]
+                bm25_gruplari[ad] = self.sozcuksel.ara(sorgu_metni, bm25_sayisi, araliklar)
+        return vektor_sonuclari, bm25_gruplari
+
+    def _vektor_ara(self, x, aday_sayisi, havayollari):
+        # [(mesafe, satır), ...] en yakından uzağa. Parçalanmış havayolları parçalarda, diğerleri
+        # aynı anda global indexte aranır ve sonuçlar mesafeye göre birleştirilir.
+        adlar = self.havayollari if havayollari is None else havayollari
+        parcali = [ad for ad in adlar if self.parcali.parcali_mi(ad)] if self.parcali is not None else []
+        if not parcali:
+            return self._global_ara(x, aday_sayisi, havayollari)
+        try:
+            bekleyen = self.parcali.ara_baslat(x, aday_sayisi, parcali)
+            sonuclar = []
+            if len(parcali) < len(adlar):
+                secici = self._parcasiz_secici() if havayollari is None else \
+                    self._secici([ad for ad in adlar if not self.parcali.parcali_mi(ad)])
+                sonuclar = self._global_ara(x, aday_sayisi, secici=secici)
+            sonuclar += self.parcali.sonuclari_topla(bekleyen)
+        except Exception as e:
+            print(f"-> Parçalı arama başarısız oldu ({e}), global indexte aranıyor.")
+            return self._global_ara(x, aday_sayisi, havayollari)
+        return sorted(sonuclar)[:aday_sayisi]
+
+    def _global_ara(self, x, aday_sayisi, havayollari=None, secici=None):
+        if secici is None and havayollari is not None:
+            secici = self._secici(havayollari)
+        if secici is None:
+            mesafeler, satirlar = self.index.search(x, aday_sayisi)
+        else:
+            mesafeler, satirlar = self.index.search(x, aday_sayisi, params=faiss.SearchParameters(sel=secici))
+        return [(float(mesafe), int(satir)) for mesafe, satir in zip(mesafeler[0], satirlar[0]) if satir >= 0]
+
+    def _dokumanlar(self, satirlar, mesafe_haritasi, bm25_puanlari, x):
+        # langchain import'u ağır; bu modülü import eden her şeyi yavaşlatmasın diye burada.
+        from langchain.docstore.document import Document
+        dokumanlar = []
+        for satir in satirlar:
+            mesafe = mesafe_haritasi.get(satir)
+            if mesafe is None:
+                # Sadece BM25 ile bulunan satırın vektör mesafesini de kayda geçiyorum.
+                mesafe = float(((self._vektor(satir) - x[0]) ** 2).sum())
+            dokumanlar.append(Document(
+                page_content=self._metin(satir),
+                metadata={
+                    "Airline Name": self._havayolu(satir),
+                    "satir": satir,
+                    "mesafe": mesafe,
+                    "bm25": bm25_puanlari.get(satir, 0.0),
+                },
+            ))
+        return dokumanlar
+
+    # Satır numarasından metin, havayolu ve vektöre ulaşan noktalar (ArtimliYorumIndexi ekteki satırlara yönlendirir).
+    def _metin(self, satir):
+        return self.depo.metin(satir)
+
+    def _havayolu(self, satir):
+        return self.depo.havayolu(satir)
+
+    def _vektor(self, satir):
+        return self.index.reconstruct(int(satir))
+
+
+# --- Index Önbelleği ---
+class IndexOnbellegi:
+    # Diskteki global indexi ilk ihtiyaç duyulduğunda yükleyip tutan önbellek. Index ve metinler mmap ile
+    # açıldığı için ayrı bir bellek sınırı yok; parça indexlerinin sınırı 'parcali_index.py'de (PARCA_ACIK_INDEX_SINIRI).
+    # Kaynak CSV değiştiğinde (mtime/boyut, ardından içerik özeti) tüm önbelleği geçersiz sayar.
+    # Manifest de izlenir: artımlı güncelleme veya sıkıştırma yeni bir index sürümü yayınlayınca
+    # sonraki sorgu yeni sürümü yükler; o sırada çalışan sorgular ellerindeki eski sürümle biter.
+    # Yeni sürüm yüklenemezse yeniden embedding'e (geçici indexe) düşülmez, önceki sürüm sunulmaya devam eder.
+    # Yayın sırasında CSV manifest'ten önce değişir; manifest'teki 'bekleyen_veri_ozeti' yeni CSV'yi işaret
+    # ettiği için bu arada da yüklü index geçerli sayılır.
+    # depo_yukleyici(veri_dosyasi) verilirse yorum deposu da burada tutulur ve CSV değişince (veya depo
+    # yeniden yazılınca) aynı kilit altında yeniden yüklenir. Havayolu listesi, geçici indexler ve özet
+    # kanıtları böylece yeniden başlatmaya gerek kalmadan güncel veriyi görür.
+
+    def __init__(self, veri_dosyasi, index_klasoru=INDEX_KLASORU, depo_yukleyici=None,
+                 depo_klasoru=YORUM_DEPOSU_KLASORU):
+        self.veri_dosyasi = veri_dosyasi
+        self.index_klasoru = index_klasoru
+        self._kilit = threading.Lock()
+        self._index = None        # yüklü global index (YorumIndexi)
+        self._manifest = None
+        self._yuklu_surum = None  # yüklü indexin manifest sürümü (surum_anahtari)
+        self._onceki = None       # yeni sürüm yüklenemezse sunulan önceki global index
+        # (mtime_ns, boyut, manifest durumu, depo durumu) -> bunu gördüğümüzde tekrar kontrol edilmez
+        self._dosya_durumu = None
+        self._gecerli = False
+        self.veri_ozeti = None
+        self._depo_yukleyici = depo_yukleyici
+        self.depo_klasoru = depo_klasoru
+        self._depo = None
+        self._depo_kaynagi = None  # yüklü deponun (veri özeti, depo durumu)
+
+    def _tazelik_kontrolu(self):
+        # Her sorguda sadece os.stat() yapıyorum; dosya değişmiş görünürse içerik özetini
+        # yeniden hesaplayıp manifest'teki özetle karşılaştırıyorum.
+        try:
+            durum = os.stat(self.veri_dosyasi)
+        except FileNotFoundError:
+            self._gecerli = False
+            self.veri_ozeti = None
+            return
+        anahtar = (durum.st_mtime_ns, durum.st_size, self._manifest_durumu(),
+                   self._dosya_durumu_oku(os.path.join(self.depo_klasoru, META_DOSYASI)))
+        if anahtar == self._dosya_durumu:
+            return
+
+        print(f"-> '{self.veri_dosyasi}' veya index değişmiş olabilir, index önbelleği kontrol ediliyor...")
+        # Sadece manifest değiştiyse CSV'nin özetini yeniden hesaplamıyorum.
+        if self.veri_ozeti is None or self._dosya_durumu is None or self._dosya_durumu[:2] != anahtar[:2]:
+            self.veri_ozeti = dosya_parmak_izi(self.veri_dosyasi)
+        if self._depo_yukleyici is not None:
+            self._depoyu_tazele(anahtar[3])
+        self._manifest = manifest_oku(self.index_klasoru)
+        if self._manifest is None:
+            print(f"-> '{self.index_klasoru}' altında index bulunamadı. 'python index_olustur.py' çalıştırılmalı.")
+            self._gecerli = False
+        else:
+            self._gecerli = (
+                self.veri_ozeti in (self._manifest.get("veri_ozeti"), self._manifest.get("bekleyen_veri_ozeti"))
+                and self._manifest.get("embedding_modeli") == EMBEDDING_MODEL_ADI
+            )
+            if not self._gecerli:
+                print("-> Diskteki indexler güncel veriyle uyuşmuyor. 'python index_olustur.py' tekrar çalıştırılmalı.")
+        # Yüklü index sadece manifest başka bir sürümü gösterince (veya index geçersizleşince) atılır.
+        surum = surum_anahtari(self._manifest) if self._gecerli else None
+        if surum != self._yuklu_surum:
+            if surum is None:
+                self._onceki = None
+            elif self._index is not None:
+                self._onceki = self._index
+            self.temizle()
+            self._yuklu_surum = surum
+        self._dosya_durumu = anahtar
+
+    def _depoyu_tazele(self, depo_durumu):
+        # Depo, CSV'nin içeriği değişince veya depo dosyaları yeniden yazılınca (ör. CSV'den bellekte
+        # kurulan depo yerine diskteki mmap deposuna geçmek için) yeniden yüklenir.
+        kaynak = (self.veri_ozeti, depo_durumu)
+        if kaynak == self._depo_kaynagi:
+            return
+        try:
+            self._depo = self._depo_yukleyici(self.veri_dosyasi)
+            self._depo_kaynagi = kaynak
+        except Exception as e:
+            print(f"-> Yorum deposu yüklenemedi ({e}); varsa önceki depo kullanılmaya devam ediyor.")
+
+    def _manifest_durumu(self):
+        return self._dosya_durumu_oku(os.path.join(self.index_klasoru, MANIFEST_DOSYASI))
+
+    @staticmethod
+    def _dosya_durumu_oku(yol):
+        # Manifest ve depo meta dosyası her yeni sürümde yeni bir dosya olarak yerine taşındığı için inode + mtime değişir.
+        try:
+            durum = os.stat(yol)
+        except FileNotFoundError:
+            return None
+        return durum.st_ino, durum.st_mtime_ns
+
+    def veri_surumu(self):
+        # Yorum verisinin güncel içerik özeti (cevap önbelleği gibi veriye bağlı önbellekler için).
+        return self.veri_ve_depo()[0]
+
+    def yorum_deposu(self):
+        # Güncel veriden yüklenmiş yorum deposu (depo_yukleyici verilmediyse veya veri hiç okunamadıysa None).
+        return self.veri_ve_depo()[1]
+
+    def veri_ve_depo(self):
+        # Veri özeti ve depo aynı anda okunur; özetle birlikte saklanan satır numaraları (ör. konu özetleri)
+        # her zaman aynı sürümün deposunda çözülür.
+        with self._kilit:
+            self._tazelik_kontrolu()
+            return self.veri_ozeti or "", self._depo
+
+    def temizle(self):
+        self._index = None
+
+    def getir(self):
+        # Global indexi döndürür. Index yoksa veya veri değiştiği için geçersizse None döner;
+        # çağıran taraf geçici index oluşturmaya geri düşebilir.
+        with self._kilit:
+            self._tazelik_kontrolu()
+            if not self._gecerli:
+                return None
+
+            if self._index is not None:
+                return self._index
+
+            try:
+                yorum_indexi = index_yukle(self.index_klasoru, self._manifest)
+            except Exception as e:
+                # Sürüm klasörü okunamadı; sonraki sorguda manifest tekrar kontrol edilsin. Bu arada
+                # varsa önceki sürüm sunuluyor.
+                self._dosya_durumu = None
+                if self._onceki is None:
+                    raise
+                print(f"-> Yeni index sürümü yüklenemedi ({e}), önceki sürüm kullanılıyor.")
+                return self._onceki
+            self._onceki = None
+            self._index = yorum_indexi
+            return yorum_indexi
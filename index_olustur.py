@@ -0,0 +1,121 @@
+# --- Gerekli Kütüphaneler ---
+# Bu script, 'veri_hazırla.py' çalıştırıldıktan sonra bir kere çalıştırılır ve
+# tüm yorumlar için tek bir FAISS indexini (vektörler + metinler + havayolu ID sütunu) diske yazar.
+# Böylece chatbot her soruda yorumları yeniden embedding'e göndermek zorunda kalmaz.
+# --parca N verilirse büyük havayollarının vektörleri ayrıca N parçaya bölünür ('parcali_index.py');
+# --sadece-parcalar ile mevcut index yeniden embedding yapılmadan parçalanır.
+# Index 'faiss_indexleri/tabanlar/<sürüm>/' altına yazılır ve kök manifest tek bir değişiklikle bu sürümü
+# gösterecek şekilde değiştirilir; çalışan uygulamalar bir sonraki sorguda yeni indexe geçer.
+#
+# Örnek: python index_olustur.py --parca 4 --parca-turu ivfpq
+import os
+import shutil
+import time
+import argparse
+
+import pandas as pd
+from dotenv import load_dotenv
+from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+from embedding_onbellegi import OnbellekliEmbeddings
+from embedding_hatti import EmbeddingHatti
+from index_deposu import (
+    INDEX_KLASORU,
+    MANIFEST_DOSYASI,
+    BEKLEYEN_MANIFEST_DOSYASI,
+    EMBEDDING_MODEL_ADI,
+    TABAN_KLASOR_ADI,
+    YorumIndexi,
+    dosya_parmak_izi,
+    manifest_oku,
+    manifest_yaz,
+    surumu_yayinla,
+    taban_klasoru,
+    yeni_surum_adi,
+)
+from parcali_index import PARCA_SAYISI, PARCA_TURU, PARCA_TURLERI, parcalari_olustur
+from artimli_index import yorum_anahtarlari
+
+# --- Dosya İsimleri Tanımlamaları ---
+INPUT_FILENAME = "temiz_havayolu_yorumlari.csv"
+
+
+def indexleri_olustur(veri_dosyasi=INPUT_FILENAME, index_klasoru=INDEX_KLASORU, embeddings=None,
+                      parca_sayisi=PARCA_SAYISI, parca_turu=PARCA_TURU):
+    if embeddings is None:
+        # Önbellekli embedding kullanıyorum: veri seti yenilendiğinde sadece
+        # yeni veya değişmiş yorumlar servise gönderilir, diğerleri diskten okunur.
+        embeddings = OnbellekliEmbeddings(GoogleGenerativeAIEmbeddings(model=EMBEDDING_MODEL_ADI), EMBEDDING_MODEL_ADI)
+
+    print(f"'{veri_dosyasi}' okunuyor...")
+    df = pd.read_csv(veri_dosyasi, dtype={"yorum_id": str})
+    # Index'in hangi veri sürümünden üretildiğini manifest'e yazıyorum.
+    # chatbot_engine bu özeti kontrol ederek eski indexleri kullanmaktan kaçınır.
+    veri_ozeti = dosya_parmak_izi(veri_dosyasi)
+    print(f"-> {len(df)} yorum, {df['Airline Name'].nunique()} havayolu bulundu.")
+
+    # Yeni indexi önce geçici bir sürüm klasöründe hazırlıyorum; iş bitince manifest onu gösterecek.
+    surum = yeni_surum_adi()
+    hedef_klasor = os.path.join(index_klasoru, TABAN_KLASOR_ADI, surum)
+    gecici_klasor = hedef_klasor + ".yeni"
+    # Embedding ilerlemesi bu klasöre kaydediliyor; script yarıda kesilirse tekrar çalıştırınca devam eder.
+    checkpoint_klasoru = index_klasoru + ".checkpoint"
+
+    baslangic = time.time()
+    vektorler = EmbeddingHatti(embeddings).csv_embed_et(veri_dosyasi, checkpoint_klasoru, veri_ozeti)
+    # Her satırın anahtarı da yazılıyor; 'yorumlari_guncelle.py' yeni gelen yorumları bunlarla eşleştirir.
+    # Veride 'yorum_id' sütunu varsa anahtar kimlikten, yoksa havayolu + metinden üretilir.
+    metinler, adlar = df["birlesik_yorum"].tolist(), df["Airline Name"].tolist()
+    kimlikler = df["yorum_id"].tolist() if "yorum_id" in df.columns else None
+    yorum_indexi = YorumIndexi.vektorlerden_olustur(vektorler, metinler, adlar,
+                                                    yorum_anahtarlari(adlar, metinler, kimlikler))
+    yorum_indexi.kaydet(gecici_klasor)
+
+    if isinstance(embeddings, OnbellekliEmbeddings):
+        embeddings.istatistikleri_yazdir()
+
+    manifest = {"veri_ozeti": veri_ozeti, "embedding_modeli": EMBEDDING_MODEL_ADI,
+                "anahtar_turu": "icerik" if kimlikler is None else "kimlik"}
+    manifest.update(yorum_indexi.manifest_bilgisi())
+    manifest_yaz(gecici_klasor, manifest)
+    # Parçalar da yeni klasöre yazılıyor; index ve parçaları aynı anda yayınlanıyor.
+    if parca_sayisi > 1:
+        parcalari_olustur(gecici_klasor, parca_sayisi, parca_turu)
+    os.replace(gecici_klasor, hedef_klasor)
+    # Yeni taban ekler olmadan yayınlanır; eski tabanlar, ekler ve yarıda kalmış bir güncellemenin bekleyen
+    # manifest'i artık geçersiz.
+    surumu_yayinla(index_klasoru, dict(manifest, taban_surumu=surum), manifest_oku(index_klasoru))
+    bekleyen_yolu = os.path.join(index_klasoru, BEKLEYEN_MANIFEST_DOSYASI)
+    if os.path.exists(bekleyen_yolu):
+        os.remove(bekleyen_yolu)
+    shutil.rmtree(checkpoint_klasoru, ignore_errors=True)
+    print(f"\nİşlem tamamlandı! {len(yorum_indexi.havayollari)} havayolunun {len(yorum_indexi.depo)} yorumu "
+          f"'{index_klasoru}' klasöründeki global indexe yazıldı ({time.time() - baslangic:.1f} sn).")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Yorumlar için global FAISS indexini oluşturur.")
+    parser.add_argument("--parca", type=int, default=PARCA_SAYISI,
+                        help="Büyük havayollarının bölüneceği parça sayısı (0: parçalama yok)")
+    parser.add_argument("--parca-turu", choices=PARCA_TURLERI, default=PARCA_TURU,
+                        help="Parça index türü: flat (birebir), ivf veya ivfpq (nicemlenmiş)")
+    parser.add_argument("--sadece-parcalar", action="store_true",
+                        help="Embedding yapmadan mevcut indexi yeniden parçala")
+    args = parser.parse_args()
+
+    load_dotenv()
+    if args.sadece_parcalar:
+        if args.parca < 2:
+            print("HATA: --sadece-parcalar ile birlikte --parca 2 veya daha büyük verilmelidir.")
+        elif not os.path.exists(os.path.join(INDEX_KLASORU, MANIFEST_DOSYASI)):
+            print(f"HATA: '{INDEX_KLASORU}' altında index yok. Önce 'python index_olustur.py' çalıştırın.")
+        else:
+            parcalari_olustur(taban_klasoru(INDEX_KLASORU, manifest_oku(INDEX_KLASORU)), args.parca, args.parca_turu)
+            print("Çalışan uygulamalar yeni parçaları yeniden başlatıldıklarında kullanır.")
+    elif not os.getenv("GOOGLE_API_KEY"):
+        print("HATA: GOOGLE_API_KEY bulunamadı. Lütfen .env dosyanızı kontrol edin.")
+    else:
+        try:
+            indexleri_olustur(parca_sayisi=args.parca, parca_turu=args.parca_turu)
+        except FileNotFoundError:
+            print(f"HATA: '{INPUT_FILENAME}' bulunamadı. Önce 'python veri_hazırla.py' çalıştırın.")
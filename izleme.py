@@ -0,0 +1,207 @@
+# --- Gerekli Kütüphaneler ---
+# Bu modül, her sorgunun aşama sürelerini, LLM'e giden karakter/token sayılarını, önbellek
+# isabetlerini ve arama puanlarını toplayıp iki yolla dışarı verir:
+#   - Yapılandırılmış JSON log: her sorgu için tek satır (IZLEME_LOG_DOSYASI veya standart çıktı)
+#   - Prometheus metin formatında sayaç ve histogramlar: API'nin /metrics adresinden veya
+#     METRIK_PORTU verilirse ayrı küçük bir HTTP sunucusundan
+# IZLEME=1 değilse sorgu_bitti() tek bir bayrak kontrolüyle döner; ek maliyet yoktur.
+# Aşama süreleri zaten SorguHazirligi.olcumler içinde '<asama>_sn' anahtarlarıyla tutuluyor;
+# bu modül onları okur, motoru ikinci kez ölçmez.
+import os
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- Genel Ayarlar ---
+IZLEME_ACIK = os.getenv("IZLEME", "0") == "1"
+IZLEME_LOG_DOSYASI = os.getenv("IZLEME_LOG_DOSYASI")
+METRIK_PORTU = int(os.getenv("METRIK_PORTU", "0"))
+
+# Saniye cinsinden histogram sınırları (LLM çağrıları birkaç saniyeye çıkabiliyor).
+SURE_SINIRLARI = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+MESAFE_SINIRLARI = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.8, 1.0, 1.5, 2.0)
+
+
+# --- Metrikler ---
+class Sayac:
+    def __init__(self, ad, aciklama, etiketler=()):
+        self.ad = ad
+        self.aciklama = aciklama
+        self.etiketler = etiketler
+        self._degerler = {}
+        self._kilit = threading.Lock()
+
+    def artir(self, miktar=1, **etiketler):
+        anahtar = tuple(str(etiketler[e]) for e in self.etiketler)
+        with self._kilit:
+            self._degerler[anahtar] = self._degerler.get(anahtar, 0) + miktar
+
+    def metin(self):
+        satirlar = [f"# HELP {self.ad} {self.aciklama}", f"# TYPE {self.ad} counter"]
+        with self._kilit:
+            for anahtar, deger in sorted(self._degerler.items()):
+                satirlar.append(f"{self.ad}{_etiket_metni(self.etiketler, anahtar)} {deger}")
+        return satirlar
+
+
+class Histogram:
+    def __init__(self, ad, aciklama, etiketler=(), sinirlar=SURE_SINIRLARI):
+        self.ad = ad
+        self.aciklama = aciklama
+        self.etiketler = etiketler
+        self.sinirlar = sinirlar
+        self._degerler = {}  # etiketler -> [kova sayıları..., toplam, adet]
+        self._kilit = threading.Lock()
+
+    def gozlemle(self, deger, **etiketler):
+        anahtar = tuple(str(etiketler[e]) for e in self.etiketler)
+        with self._kilit:
+            kayit = self._degerler.setdefault(anahtar, [0] * len(self.sinirlar) + [0.0, 0])
+            for i, sinir in enumerate(self.sinirlar):
+                if deger <= sinir:
+                    kayit[i] += 1
+            kayit[-2] += deger
+            kayit[-1] += 1
+
+    def metin(self):
+        satirlar = [f"# HELP {self.ad} {self.aciklama}", f"# TYPE {self.ad} histogram"]
+        with self._kilit:
+            for anahtar, kayit in sorted(self._degerler.items()):
+                for sinir, sayi in zip(self.sinirlar, kayit):
+                    etiket = _etiket_metni(self.etiketler + ("le",), anahtar + (repr(float(sinir)),))
+                    satirlar.append(f"{self.ad}_bucket{etiket} {sayi}")
+                etiket = _etiket_metni(self.etiketler + ("le",), anahtar + ("+Inf",))
+                satirlar.append(f"{self.ad}_bucket{etiket} {kayit[-1]}")
+                satirlar.append(f"{self.ad}_sum{_etiket_metni(self.etiketler, anahtar)} {kayit[-2]}")
+                satirlar.append(f"{self.ad}_count{_etiket_metni(self.etiketler, anahtar)} {kayit[-1]}")
+        return satirlar
+
+
+def _kacis(deger):
+    return deger.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _etiket_metni(adlar, degerler):
+    if not adlar:
+        return ""
+    return "{" + ",".join(f'{ad}="{_kacis(deger)}"' for ad, deger in zip(adlar, degerler)) + "}"
+
+
+SORGU_SAYACI = Sayac("chatbot_sorgu_toplam", "Tamamlanan sorgu sayısı", ("durum",))
+ASAMA_SURESI = Histogram("chatbot_asama_suresi_saniye", "Sorgu aşamalarının süresi", ("asama",))
+ONBELLEK_SAYACI = Sayac("chatbot_onbellek_toplam", "Önbellek sonuçları", ("onbellek", "sonuc"))
+TOKEN_SAYACI = Sayac("chatbot_llm_token_toplam", "LLM'e gönderilen ve alınan token sayısı", ("yon",))
+KARAKTER_SAYACI = Sayac("chatbot_llm_karakter_toplam", "LLM'e gönderilen ve alınan karakter sayısı", ("yon",))
+ARAMA_MESAFESI = Histogram("chatbot_arama_en_iyi_mesafe", "En yakın kanıtın L2 mesafesi", sinirlar=MESAFE_SINIRLARI)
+METRIKLER = [SORGU_SAYACI, ASAMA_SURESI, ONBELLEK_SAYACI, TOKEN_SAYACI, KARAKTER_SAYACI, ARAMA_MESAFESI]
+
+
+def metrik_metni():
+    # Prometheus metin formatı (text/plain; version=0.0.4).
+    satirlar = []
+    for metrik in METRIKLER:
+        satirlar.extend(metrik.metin())
+    return "\n".join(satirlar) + "\n"
+
+
+# --- Aşama Ölçümü ---
+@contextmanager
+def asama(olcumler, ad):
+    # Bloğun süresini olcumler['<ad>_sn'] olarak yazar; blok hata verse bile süre kaydedilir.
+    baslangic = time.perf_counter()
+    try:
+        yield
+    finally:
+        olcumler[f"{ad}_sn"] = time.perf_counter() - baslangic
+
+
+# --- Sorgu Sonu ---
+_log_kilidi = threading.Lock()
+
+
+def sorgu_bitti(hazirlik, durum):
+    # durum: 'cevap' (LLM üretti), 'onbellek' (hazır cevap), 'ozet' (hazır konu özeti), 'mesaj', 'hata'
+    # veya 'iptal' (akış sonuna kadar okunmadı).
+    if not IZLEME_ACIK:
+        return
+    olcumler = hazirlik.olcumler
+
+    SORGU_SAYACI.artir(durum=durum)
+    for anahtar, deger in olcumler.items():
+        if anahtar.endswith("_sn") and isinstance(deger, (int, float)):
+            ASAMA_SURESI.gozlemle(deger, asama=anahtar[:-3])
+    if "ceviri_yolu" in olcumler:
+        ONBELLEK_SAYACI.artir(onbellek="ceviri", sonuc=olcumler["ceviri_yolu"])
+    if "cevap_onbellegi" in olcumler:
+        ONBELLEK_SAYACI.artir(onbellek="cevap", sonuc=olcumler["cevap_onbellegi"])
+    for yon in ("istem", "cevap"):
+        if f"{yon}_token" in olcumler:
+            TOKEN_SAYACI.artir(olcumler[f"{yon}_token"], yon=yon)
+            KARAKTER_SAYACI.artir(olcumler[f"{yon}_karakter"], yon=yon)
+
+    kanitlar = [
+        {k: doc.metadata[k] for k in ("Airline Name", "satir", "mesafe", "bm25") if k in doc.metadata}
+        for doc in hazirlik.relevant_docs
+    ]
+    mesafeler = [kanit["mesafe"] for kanit in kanitlar if "mesafe" in kanit]
+    if mesafeler:
+        ARAMA_MESAFESI.gozlemle(min(mesafeler))
+
+    kayit = {
+        "zaman": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime()),
+        "iz_id": hazirlik.iz_id,
+        "durum": durum,
+        "havayolu": hazirlik.havayolu_adi,
+        "dil": hazirlik.orjinal_dil,
+        "soru": hazirlik.soru,
+        "asamalar_ms": {k[:-3]: round(v * 1000, 3) for k, v in olcumler.items()
+                        if k.endswith("_sn") and isinstance(v, (int, float))},
+        "ozellikler": {k: v for k, v in olcumler.items() if not k.endswith("_sn")},
+        "kanitlar": kanitlar,
+    }
+    satir = json.dumps(kayit, ensure_ascii=False)
+    with _log_kilidi:
+        if IZLEME_LOG_DOSYASI:
+            with open(IZLEME_LOG_DOSYASI, "a", encoding="utf-8") as f:
+                f.write(satir + "\n")
+        else:
+            print(satir, file=sys.stdout, flush=True)
+
+
+# --- Metrik Sunucusu ---
+class _MetrikIstegi(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        govde = metrik_metni().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(govde)))
+        self.end_headers()
+        self.wfile.write(govde)
+
+    def log_message(self, *args):
+        pass
+
+
+_metrik_sunucusu = None
+
+
+def metrik_sunucusu_baslat(port=METRIK_PORTU):
+    # Streamlit gibi kendi HTTP sunucusu olmayan süreçler için /metrics'i ayrı bir iş parçacığında sunar.
+    # Port 0 ise veya sunucu zaten açıksa bir şey yapmaz.
+    global _metrik_sunucusu
+    if not port or _metrik_sunucusu is not None:
+        return
+    try:
+        _metrik_sunucusu = ThreadingHTTPServer(("0.0.0.0", port), _MetrikIstegi)
+    except OSError as e:
+        # Aynı makinede birden fazla süreç aynı portu açmaya çalışabilir.
+        print(f"-> Metrik sunucusu {port} portunda açılamadı: {e}")
+        return
+    threading.Thread(target=_metrik_sunucusu.serve_forever, daemon=True, name="metrikler").start()
+    print(f"-> Metrikler http://0.0.0.0:{port}/metrics adresinde.")
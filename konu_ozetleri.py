@@ -0,0 +1,205 @@
+# --- Gerekli Kütüphaneler ---
+# Bu modül, soruların çoğunun düştüğü sabit konular (koltuk konforu, yemek, personel, uçak içi eğlence,
+# rötar) için önceden hazırlanmış havayolu özetlerini tutar ve soruları bu özetlere yönlendirir.
+#   - yorum_konulari(): bir yorumun hangi konulardan bahsettiğini anahtar kelimelerle bulur ('ozet_olustur.py').
+#   - soru_konusu()   : soru açıkça tek bir konuyu soruyorsa o konuyu, değilse None döndürür.
+#   - OzetDeposu      : 'ozet_olustur.py'nin yazdığı Türkçe/İngilizce özetleri ve dayandıkları yorum
+#                       satırlarını SQLite'ta saklar. Özetler üretildikleri verinin özetine bağlıdır;
+#                       veri değişince kendiliğinden kullanılmaz olur.
+# Yönlendirme bilerek temkinlidir: soruda konu kelimeleri ve genel soru kalıpları dışında tek bir kelime
+# (ör. "business", "A380", başka bir konu) varsa soru normal RAG akışına gider. Türkçe çekimli biçimler
+# ("servisindeki", "hakkındaki") sözlükteki kelimeye çekim ekleri eklenmiş sayılarak tanınır.
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+
+# --- Genel Ayarlar ---
+VARSAYILAN_OZET_DOSYASI = os.getenv("KONU_OZET_DOSYASI", "konu_ozetleri.sqlite")
+# 0 ile sorular hiç özetlere yönlendirilmez.
+OZET_YONLENDIRME = os.getenv("OZET_YONLENDIRME", "1") == "1"
+
+# Her konu için: arayüzde gösterilen adlar, özet üretirken LLM'e sorulan sorular, yorumları
+# sınıflandırmak için İngilizce terimler ve soruları yönlendirmek için Türkçe/İngilizce kelimeler.
+KONULAR = {
+    "koltuk": {
+        "tr": "Koltuk konforu",
+        "en": "Seat comfort",
+        "soru_tr": "Yolcular koltuk konforu ve diz mesafesi hakkında ne diyor?",
+        "soru_en": "What do passengers say about seat comfort and legroom?",
+        "yorum_terimleri": "seat seats seating legroom recline reclining reclined comfortable uncomfortable comfort "
+                           "cramped pitch cushion armrest armrests flatbed",
+        "soru_kelimeleri": "koltuk koltuklar koltuğu koltugu koltukları koltuklari diz mesafe mesafesi aralığı araligi "
+                           "konfor konforu konforlu rahat rahatlığı rahatligi seat seats seating legroom comfort "
+                           "comfortable recline",
+    },
+    "yemek": {
+        "tr": "Yemek servisi",
+        "en": "Food and drinks",
+        "soru_tr": "Yolcular yemek ve içecek servisi hakkında ne diyor?",
+        "soru_en": "What do passengers say about the food and drinks served on board?",
+        "yorum_terimleri": "food meal meals breakfast lunch dinner snack snacks drink drinks beverage beverages "
+                           "menu catering tasty bland",
+        "soru_kelimeleri": "yemek yemekler yemekleri yemeği yemegi ikram ikramlar ikramları ikramlari içecek icecek "
+                           "içecekler icecekler menü menu kahvaltı kahvalti food meal meals catering drinks snacks",
+    },
+    "personel": {
+        "tr": "Personel tutumu",
+        "en": "Staff and crew",
+        "soru_tr": "Yolcular kabin ekibi ve personelin tutumu hakkında ne diyor?",
+        "soru_en": "What do passengers say about the attitude of the cabin crew and staff?",
+        "yorum_terimleri": "staff crew attendant attendants stewardess stewardesses steward hostess purser friendly "
+                           "rude polite helpful attentive unfriendly",
+        "soru_kelimeleri": "personel personeli ekip ekibi ekibinin hostes hostesler mürettebat murettebat görevli "
+                           "gorevli görevliler gorevliler tutum tutumu davranış davranis davrandı davrandi kibar "
+                           "profesyonelliği profesyonelligi staff crew attendant attendants stewardess hostess",
+    },
+    "eglence": {
+        "tr": "Uçak içi eğlence",
+        "en": "In-flight entertainment",
+        "soru_tr": "Yolcular uçak içi eğlence sistemi ve internet hakkında ne diyor?",
+        "soru_en": "What do passengers say about the in-flight entertainment and wifi?",
+        "yorum_terimleri": "entertainment ife movies movie films film screen screens wifi headphones tv music games",
+        "soru_kelimeleri": "eğlence eglence film filmler ekran ekranlar wifi internet müzik muzik entertainment "
+                           "ife movies films screen screens",
+    },
+    "gecikme": {
+        "tr": "Rötar ve gecikmeler",
+        "en": "Delays",
+        "soru_tr": "Yolcular rötarlar, gecikmeler ve iptaller hakkında ne diyor?",
+        "soru_en": "What do passengers say about delays, punctuality and cancellations?",
+        "yorum_terimleri": "delay delayed delays late cancelled canceled cancellation punctual punctuality "
+                           "rescheduled",
+        "soru_kelimeleri": "rötar rotar rötarlar rotarlar rötarı rotari gecikme gecikmeler gecikiyor geç gec iptal "
+                           "zamanında zamaninda dakik delay delays delayed late punctual punctuality cancellations "
+                           "cancelled",
+    },
+}
+_YORUM_TERIMLERI = {konu: frozenset(bilgi["yorum_terimleri"].split()) for konu, bilgi in KONULAR.items()}
+_SORU_KELIMELERI = {konu: frozenset(bilgi["soru_kelimeleri"].split()) for konu, bilgi in KONULAR.items()}
+
+# Konudan bağımsız, sorunun ne kadar genel olduğunu değiştirmeyen kelimeler.
+GENEL_SORU_KELIMELERI = frozenset("""
+nasıl nasil nasıldı nasildi ne neler nelerdir hakkında hakkinda bilgi ver genel genelde genellikle yorum yorumlar
+yorumları yorumlari yolcu yolcular yolculara yolcuların yolcularin düşünüyor dusunuyor diyor mi mı mu mü miydi mıydı
+muydu müydü midir mıdır iyi kötü kotu memnun şikayet sikayet şikayetler sikayetler var ve ile bu havayolu uçak ucak
+içi ici durumu servis servisi kalite kalitesi sistem sistemi uçuş ucus uçuşlarda ucuslarda oluyor sık sik en çok cok
+fazla edilen konu konusunda kabin the how was is are were what about do does passengers say think of quality service
+in flight flights on board onboard any complaints common general overall like good bad tell me reviews this airline
+there often and their with cabin
+""".split())
+
+# Sözlükteki bir kelimenin ardından sadece bu çekim eklerinin (çoğul, iyelik, hal, -ki, ek fiil, soru) art arda
+# gelmesi kabul ediliyor: "servis+in+de+ki", "konu+sun+da+ki", "iyi+ydi". Türetme ekleri kabul edilmediği için
+# "bilgilendirme", "rahatsız" gibi anlamı değişen kelimeler yine normal akışa gider. Ünlüler Türkçe harfsiz
+# yazılmış sorular için ı/i/u/ü sınıflarıyla yazıldı.
+_CEKIM_EKI_DESENI = re.compile(r"(?:l[ae]r|n?[ıiuü]n|s?[ıiuü]|y?[ae]|n[ae]|n?[dt][ae]n?|y?l[ae]|ki|[dt][ıiuü]r|"
+                               r"y?[dt][ıiuü]|m[ıiuü])+")
+# Daha kısa kelimelerde ("ne", "geç", "iyi") ek ayırma yapılmıyor; "geçti", "neden" gibi kelimeler yanlış eşleşmesin.
+EN_KISA_GOVDE = 4
+_KELIME_DESENI = re.compile(r"\w+")
+_TERIM_DESENI = re.compile(r"[a-z]+")
+
+
+def yorum_konulari(metin):
+    # {konu: eşleşen terim sayısı} döndürür; yorumlar İngilizce olduğu için basit küçük harf yeterli.
+    terimler = _TERIM_DESENI.findall(metin.lower())
+    sonuc = {}
+    for konu, konu_terimleri in _YORUM_TERIMLERI.items():
+        sayi = sum(1 for terim in terimler if terim in konu_terimleri)
+        if sayi:
+            sonuc[konu] = sayi
+    return sonuc
+
+
+def _sozlukte_mi(kelime, sozluk):
+    # Kelime sözlükte varsa veya sözlükteki bir kelimeye sadece çekim ekleri eklenerek oluşmuşsa True.
+    if kelime in sozluk:
+        return True
+    for uzunluk in range(len(kelime) - 1, EN_KISA_GOVDE - 1, -1):
+        if kelime[:uzunluk] in sozluk and _CEKIM_EKI_DESENI.fullmatch(kelime, uzunluk):
+            return True
+    return False
+
+
+def soru_konusu(soru):
+    # Soru tam olarak bir konunun kelimelerini içeriyor ve geri kalan her kelimesi genel soru kalıbıysa
+    # o konuyu döndürür. Büyük I'yı i kabul ediyorum ("How Is ..." İngilizce soruları için).
+    kelimeler = _KELIME_DESENI.findall(soru.replace("İ", "i").replace("I", "i").lower())
+    if not kelimeler:
+        return None
+    bulunanlar = set()
+    for kelime in kelimeler:
+        konular = [konu for konu, konu_kelimeleri in _SORU_KELIMELERI.items() if _sozlukte_mi(kelime, konu_kelimeleri)]
+        if konular:
+            bulunanlar.update(konular)
+        elif not _sozlukte_mi(kelime, GENEL_SORU_KELIMELERI):
+            return None
+    return bulunanlar.pop() if len(bulunanlar) == 1 else None
+
+
+class OzetDeposu:
+    # Havayolu + konu + dil için tek bir özet saklar. Yazan tek bir süreç ('ozet_olustur.py'), okuyanlar
+    # Streamlit/API süreçleri olduğu için WAL modu kullanıyorum.
+
+    def __init__(self, dosya_yolu=VARSAYILAN_OZET_DOSYASI):
+        self._kilit = threading.Lock()
+        self._baglanti = sqlite3.connect(dosya_yolu, timeout=30, check_same_thread=False)
+        self._baglanti.execute("PRAGMA journal_mode=WAL")
+        self._baglanti.execute("""
+            CREATE TABLE IF NOT EXISTS ozetler (
+                havayolu TEXT NOT NULL,
+                konu TEXT NOT NULL,
+                dil TEXT NOT NULL,
+                ozet TEXT NOT NULL,
+                satirlar TEXT NOT NULL,
+                yorum_sayisi INTEGER NOT NULL,
+                veri_ozeti TEXT NOT NULL,
+                olusturma REAL NOT NULL,
+                PRIMARY KEY (havayolu, konu, dil)
+            )""")
+        self._baglanti.commit()
+
+    def getir(self, havayolu, konu, dil, veri_ozeti):
+        # {"ozet", "satirlar", "yorum_sayisi"} veya (özet yoksa ya da eski veriden üretildiyse) None.
+        with self._kilit:
+            satir = self._baglanti.execute(
+                "SELECT ozet, satirlar, yorum_sayisi FROM ozetler "
+                "WHERE havayolu = ? AND konu = ? AND dil = ? AND veri_ozeti = ?",
+                (havayolu, konu, dil, veri_ozeti),
+            ).fetchone()
+        if satir is None:
+            return None
+        return {"ozet": satir[0], "satirlar": json.loads(satir[1]), "yorum_sayisi": satir[2]}
+
+    def havayolu_ozetleri(self, havayolu, dil, veri_ozeti):
+        # Arayüz için: havayolunun tüm konu özetleri, KONULAR sırasıyla [(konu, kayıt), ...].
+        sonuc = []
+        for konu in KONULAR:
+            kayit = self.getir(havayolu, konu, dil, veri_ozeti)
+            if kayit is not None:
+                sonuc.append((konu, kayit))
+        return sonuc
+
+    def tamamlanan_havayollari(self, veri_ozeti):
+        # Bu veri sürümü için en az bir özeti yazılmış havayolları (yarıda kalan işe devam etmek için).
+        with self._kilit:
+            satirlar = self._baglanti.execute(
+                "SELECT DISTINCT havayolu FROM ozetler WHERE veri_ozeti = ?", (veri_ozeti,)
+            ).fetchall()
+        return {satir[0] for satir in satirlar}
+
+    def yaz(self, havayolu, kayitlar, veri_ozeti):
+        # kayitlar: [(konu, dil, özet, satırlar, yorum sayısı), ...]. Havayolunun eski özetleri tek işlemde değişir.
+        simdi = time.time()
+        with self._kilit:
+            with self._baglanti:
+                self._baglanti.execute("DELETE FROM ozetler WHERE havayolu = ?", (havayolu,))
+                self._baglanti.executemany(
+                    "INSERT INTO ozetler (havayolu, konu, dil, ozet, satirlar, yorum_sayisi, veri_ozeti, olusturma) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(havayolu, konu, dil, ozet, json.dumps(satirlar), yorum_sayisi, veri_ozeti, simdi)
+                     for konu, dil, ozet, satirlar, yorum_sayisi in kayitlar],
+                )
@@ -0,0 +1,140 @@
+# --- Gerekli Kütüphaneler ---
+# Bu script, 'veri_hazırla.py' çalıştırıldıktan sonra çalıştırılır ve her havayolu için sabit konularda
+# (koltuk konforu, yemek, personel, uçak içi eğlence, rötar) Türkçe ve İngilizce özetleri önceden üretir.
+# Yorumlar anahtar kelimelerle konulara ayrılır, her konuda o konudan en çok bahseden yorumlar kanıt
+# olarak seçilir ve chatbot'un cevap şablonuyla LLM'e özetletilir. Sonuçlar dayandıkları yorum
+# satırlarıyla birlikte 'konu_ozetleri.sqlite'a yazılır; chatbot bu konulardaki soruları LLM'e gitmeden cevaplar.
+# Havayolları bir süreç havuzunda paralel işlenir; her süreç kendi LLM istemcisini bir kere kurar.
+# Yarıda kesilirse tekrar çalıştırmak yeterlidir: bu veri için özetleri yazılmış havayolları atlanır.
+#
+# Örnek: python ozet_olustur.py --isci 4
+#        python ozet_olustur.py --sahte    (API anahtarı olmadan, sahte LLM ile deneme)
+import os
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from dotenv import load_dotenv
+
+from baglam import baglam_olustur
+from embedding_hatti import kota_hatasi_mi
+from konu_ozetleri import KONULAR, VARSAYILAN_OZET_DOSYASI, OzetDeposu, yorum_konulari
+from yorum_deposu import dosya_parmak_izi
+
+# --- Genel Ayarlar ---
+INPUT_FILENAME = "temiz_havayolu_yorumlari.csv"
+# Her özet için LLM'e verilecek en fazla yorum sayısı ve bu yorumların token bütçesi.
+OZET_KANIT_SAYISI = int(os.getenv("OZET_KANIT_SAYISI", "12"))
+OZET_TOKEN_BUTCESI = int(os.getenv("OZET_TOKEN_BUTCESI", "1500"))
+# Bir konudan bundan az yorum bahsediyorsa o konu için özet üretilmez.
+OZET_MIN_YORUM = int(os.getenv("OZET_MIN_YORUM", "3"))
+MAKS_DENEME = 5
+
+# İşçi süreçlerde _isci_baslat() tarafından bir kere kurulur.
+_llm = None
+
+
+def _isci_baslat(sahte):
+    global _llm
+    if sahte:
+        from sahte_modeller import SahteLLM
+        _llm = SahteLLM()
+    else:
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        from chatbot_engine import LLM_MODEL_ADI
+        load_dotenv()
+        _llm = ChatGoogleGenerativeAI(model=LLM_MODEL_ADI, temperature=0.3)
+
+
+def _ozetle(soru, cevap_dili, baglam):
+    # Chatbot'un kendi cevap şablonunu kullanıyorum ki hazır özetler normal cevaplarla aynı üslupta olsun.
+    from chatbot_engine import PROMPT_SABLONU
+    istem = PROMPT_SABLONU.format(cevap_dili=cevap_dili).format(context=baglam, question=soru)
+    for deneme in range(MAKS_DENEME):
+        try:
+            return _llm.invoke(istem).content.strip()
+        except Exception as e:
+            if not kota_hatasi_mi(e) or deneme == MAKS_DENEME - 1:
+                raise
+            time.sleep(2 ** deneme)
+
+
+def havayolu_ozetle(havayolu, yorumlar):
+    # İşçi süreçte çalışır. yorumlar: [(satır, metin), ...]
+    # [(konu, dil, özet, kanıt satırları, konudan bahseden yorum sayısı), ...] döndürür.
+    from langchain.docstore.document import Document
+
+    konu_yorumlari = {konu: [] for konu in KONULAR}
+    for satir, metin in yorumlar:
+        for konu, terim_sayisi in yorum_konulari(metin).items():
+            konu_yorumlari[konu].append((terim_sayisi, satir, metin))
+
+    kayitlar = []
+    for konu, adaylar in konu_yorumlari.items():
+        if len(adaylar) < OZET_MIN_YORUM:
+            continue
+        # Konudan en çok bahseden yorumlar önce; eşitlikte satır sırası (her çalıştırmada aynı seçim).
+        secilenler = sorted(adaylar, key=lambda aday: (-aday[0], aday[1]))[:OZET_KANIT_SAYISI]
+        dokumanlar = [Document(page_content=metin, metadata={"Airline Name": havayolu}) for _, _, metin in secilenler]
+        satirlar = [satir for _, satir, _ in secilenler]
+        bilgi = KONULAR[konu]
+        baglam, _ = baglam_olustur(dokumanlar, None, bilgi["soru_en"], token_butcesi=OZET_TOKEN_BUTCESI)
+        for dil, soru, cevap_dili in (("en", bilgi["soru_en"], "English"), ("tr", bilgi["soru_tr"], "Turkish")):
+            kayitlar.append((konu, dil, _ozetle(soru, cevap_dili, baglam), satirlar, len(adaylar)))
+    return kayitlar
+
+
+def ozetleri_olustur(veri_dosyasi=INPUT_FILENAME, ozet_dosyasi=VARSAYILAN_OZET_DOSYASI, isci_sayisi=None,
+                     sahte=False, yeniden=False):
+    # Satır numaraları chatbot'un kullandığı yorum deposuyla aynı olsun diye veriyi onunla aynı yoldan yüklüyorum.
+    from chatbot_engine import load_data
+    depo = load_data(veri_dosyasi)
+    veri_ozeti = dosya_parmak_izi(veri_dosyasi)
+    ozet_deposu = OzetDeposu(ozet_dosyasi)
+
+    bitenler = set() if yeniden else ozet_deposu.tamamlanan_havayollari(veri_ozeti)
+    # Büyük havayolları önce gönderiliyor ki havuzun sonunda tek bir uzun iş kalmasın.
+    havayollari = sorted((ad for ad in depo.havayollari if ad not in bitenler), key=lambda ad: -depo.yorum_sayisi([ad]))
+    if bitenler:
+        print(f"-> {len(bitenler)} havayolunun özetleri zaten güncel, atlanıyor.")
+    print(f"-> {len(havayollari)} havayolu için konu özetleri üretilecek ({isci_sayisi or os.cpu_count()} süreç).")
+
+    baslangic = time.time()
+    hatali = 0
+    with ProcessPoolExecutor(max_workers=isci_sayisi, initializer=_isci_baslat, initargs=(sahte,)) as havuz:
+        gorevler = {}
+        for ad in havayollari:
+            ilk, son = depo.aralik(ad)
+            yorumlar = list(zip(range(ilk, son), depo.metinler(ilk, son)))
+            gorevler[havuz.submit(havayolu_ozetle, ad, yorumlar)] = ad
+        for sira, gorev in enumerate(as_completed(gorevler), 1):
+            ad = gorevler[gorev]
+            try:
+                kayitlar = gorev.result()
+            except Exception as e:
+                hatali += 1
+                print(f"[{sira}/{len(gorevler)}] {ad}: HATA ({e}); sonraki çalıştırmada tekrar denenecek.")
+                continue
+            # Sadece ana süreç yazıyor; SQLite'a aynı anda tek yazan olsun.
+            ozet_deposu.yaz(ad, kayitlar, veri_ozeti)
+            print(f"[{sira}/{len(gorevler)}] {ad}: {len({kayit[0] for kayit in kayitlar})} konu özeti yazıldı.")
+
+    print(f"\nİşlem tamamlandı! {len(havayollari) - hatali} havayolu işlendi, {hatali} hata "
+          f"({time.time() - baslangic:.1f} sn). Özetler '{ozet_dosyasi}' dosyasında.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Havayolu + konu bazında hazır özetleri üretir.")
+    parser.add_argument("--isci", type=int, default=None, help="Süreç sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument("--sahte", action="store_true", help="Google yerine sahte LLM kullan (deneme için)")
+    parser.add_argument("--yeniden", action="store_true", help="Güncel olanlar dahil tüm özetleri yeniden üret")
+    args = parser.parse_args()
+
+    load_dotenv()
+    if not args.sahte and not os.getenv("GOOGLE_API_KEY"):
+        print("HATA: GOOGLE_API_KEY bulunamadı. Lütfen .env dosyanızı kontrol edin.")
+    else:
+        try:
+            ozetleri_olustur(isci_sayisi=args.isci, sahte=args.sahte, yeniden=args.yeniden)
+        except FileNotFoundError:
+            print(f"HATA: '{INPUT_FILENAME}' bulunamadı. Önce 'python veri_hazırla.py' çalıştırın.")
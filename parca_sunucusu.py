@@ -0,0 +1,108 @@
+# --- Gerekli Kütüphaneler ---
+# Bu script, 'index_olustur.py --parca N' ile yazılan index parçalarını ayrı bir süreçte açık tutar ve
+# Unix soketi üzerinden arama isteklerine cevap verir. Böylece büyük havayollarının vektörleri
+# Streamlit/API sürecinin belleğinde değil, bu sunucularda durur. Birden fazla sunucu başlatıp
+# parçaları aralarında paylaştırmak (--parcalar) parçaların ayrı çekirdeklerde paralel aranmasını sağlar.
+# Chatbot tarafında PARCA_MODU=soket ve PARCA_SOKETLERI=/tmp/parca0.sock,/tmp/parca1.sock verilmelidir.
+#
+# Örnek: python parca_sunucusu.py --soket /tmp/parca0.sock --parcalar 0,2
+#        python parca_sunucusu.py --soket /tmp/parca1.sock --parcalar 1,3
+# Sunucu açılışta manifest'in gösterdiği taban sürümünün parçalarını açar; index yeniden oluşturulunca
+# veya sıkıştırılınca yeni parçalar için yeniden başlatılmalıdır (o zamana kadar istemciler sürüm farkını görüp
+# parçaları kendi süreçlerinde arar).
+import os
+import json
+import argparse
+import socketserver
+
+import numpy as np
+
+from index_deposu import INDEX_KLASORU, manifest_oku, taban_klasoru
+from parcali_index import (
+    PARCA_KLASOR_ADI,
+    PARCA_MANIFEST_DOSYASI,
+    PARCA_NPROBE,
+    PARCA_YENIDEN_SIRALAMA,
+    mesaj_al,
+    mesaj_gonder,
+    parcalarda_ara,
+)
+
+
+class ParcaSunucusu(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, soket_yolu, klasor, parca_numaralari=None):
+        klasor = taban_klasoru(klasor, manifest_oku(klasor))
+        with open(os.path.join(klasor, PARCA_KLASOR_ADI, PARCA_MANIFEST_DOSYASI), encoding="utf-8") as f:
+            manifest = json.load(f)
+        self.klasor = os.path.abspath(klasor)
+        self.surum = manifest["surum"]
+        self.boyut = manifest["boyut"]
+        parcalar = manifest["parcalar"]
+        if parca_numaralari is not None:
+            parcalar = [parcalar[no] for no in parca_numaralari]
+        self.parcalar = {parca["dosya"]: parca for parca in parcalar}
+        # Eski bir sunucudan kalan soket dosyası bağlanmayı engellemesin.
+        if os.path.exists(soket_yolu):
+            os.remove(soket_yolu)
+        super().__init__(soket_yolu, IstekIsleyici)
+
+    def isindir(self):
+        # Parçaları bir kere açıp tarıyorum; ilk istek diskten okumayı beklemesin.
+        parcalarda_ara(self.klasor, self.surum, list(self.parcalar.values()), np.zeros(self.boyut, dtype=np.float32), 1)
+
+
+class IstekIsleyici(socketserver.BaseRequestHandler):
+    # Bir bağlantı üzerinden art arda birden fazla istek gelebilir; bağlantı kapanınca biter.
+
+    def handle(self):
+        sunucu = self.server
+        while True:
+            try:
+                baslik, veri = mesaj_al(self.request)
+            except (ConnectionError, OSError):
+                return
+            if baslik is None:
+                return
+            try:
+                if baslik.get("islem") == "bilgi":
+                    mesaj_gonder(self.request, {"durum": "tamam", "surum": sunucu.surum,
+                                                "dosyalar": list(sunucu.parcalar)})
+                elif baslik.get("islem") == "ara":
+                    if baslik["surum"] != sunucu.surum:
+                        raise ValueError("Index sürümü uyuşmuyor; sunucu yeniden başlatılmalı.")
+                    parcalar = [sunucu.parcalar[dosya] for dosya in baslik["dosyalar"]]
+                    mesafeler, satirlar = parcalarda_ara(
+                        sunucu.klasor, sunucu.surum, parcalar, np.frombuffer(veri, dtype=np.float32), baslik["n"],
+                        baslik.get("nprobe", PARCA_NPROBE), baslik.get("yeniden_siralama", PARCA_YENIDEN_SIRALAMA))
+                    mesaj_gonder(self.request, {"durum": "tamam", "sayi": len(mesafeler)},
+                                 mesafeler.astype(np.float32).tobytes() + satirlar.astype(np.int64).tobytes())
+                else:
+                    raise ValueError(f"Bilinmeyen işlem: {baslik.get('islem')}")
+            except Exception as e:
+                mesaj_gonder(self.request, {"durum": "hata", "mesaj": str(e)})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index parçalarını Unix soketi üzerinden sunar.")
+    parser.add_argument("--soket", required=True, help="Dinlenecek Unix soketi dosyası")
+    parser.add_argument("--klasor", default=INDEX_KLASORU, help="Index klasörü")
+    parser.add_argument("--parcalar", help="Sunulacak parça numaraları, ör. 0,2,4 (varsayılan: hepsi)")
+    args = parser.parse_args()
+
+    numaralar = [int(no) for no in args.parcalar.split(",")] if args.parcalar else None
+    try:
+        sunucu = ParcaSunucusu(args.soket, args.klasor, numaralar)
+    except FileNotFoundError:
+        print(f"HATA: '{args.klasor}' altında index parçası yok. Önce 'python index_olustur.py --parca N' çalıştırın.")
+    else:
+        sunucu.isindir()
+        print(f"-> {len(sunucu.parcalar)} parça '{args.soket}' üzerinden sunuluyor (sürüm {sunucu.surum[:8]}).")
+        try:
+            sunucu.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            sunucu.server_close()
+            os.remove(args.soket)
@@ -0,0 +1,369 @@
+# --- Gerekli Kütüphaneler ---
+# Bu modül, çok yorumu olan havayollarının vektörlerini parçalara (shard) bölüp bu parçalarda
+# ayrı süreçlerde paralel arama yapar. Binlerce yorumu olan birkaç havayolu hem belleği hem de
+# arama süresini domine ediyordu; tek bir Streamlit süreci tüm vektörleri taramak zorunda kalıyordu.
+#
+# Parçalar 'index_olustur.py --parca N' ile global indexin yanına yazılır (faiss_indexleri/parcalar):
+#   - Yorumu PARCA_MIN_SATIR'dan az olan havayolları bölünmez; eskisi gibi global indexte aranır.
+#   - Büyük havayollarının satır aralığı N ardışık parçaya bölünür. Her parça ayrı bir FAISS indexidir
+#     ve vektörleri global satır numaralarıyla saklar; sonuçlar doğrudan yorum deposunu gösterir.
+#   - Parça türü 'flat' (birebir arama), 'ivf' (IVF, tam vektörler) veya 'ivfpq' (IVF + ürün nicemleme,
+#     ~8 kat daha az bellek) olabilir. PARCA_IVF_MIN_SATIR'dan küçük parçalar her zaman 'flat' kalır.
+#     IVF'de hız/isabet dengesi PARCA_NPROBE ile (taranan küme sayısı) ayarlanır; 'ivfpq' parçaları
+#     PARCA_YENIDEN_SIRALAMA kat fazla aday döndürür ve adaylar global indexteki tam vektörlerle
+#     yeniden sıralanır. Böylece birleştirilen sonuçların mesafeleri her zaman gerçek L2 mesafesidir.
+#
+# Arama iki şekilde yapılabilir (PARCA_MODU):
+#   - 'surec' : Parçalar sabit olarak bir grup işçi sürece dağıtılır (her parça hep aynı süreçte açılır,
+#               bellek süreçler arasında çoğalmaz). Süreçler ilk aramada 'spawn' ile başlatılır.
+#   - 'soket' : Parçalar 'parca_sunucusu.py' ile başlatılan yerel sunucularda tutulur ve Unix soketi
+#               üzerinden sorgulanır (PARCA_SOKETLERI). Hiçbir sunucunun sunmadığı parçalar için
+#               işçi süreçler kullanılır.
+# Her parçadan en iyi k aday alınır ve mesafeye göre birleştirilir. Parçalı arama hata verirse
+# çağıran taraf (YorumIndexi) aramayı global indexte tekrarlar.
+import os
+import json
+import uuid
+import time
+import shutil
+import socket
+import struct
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import faiss
+
+from index_deposu import GLOBAL_INDEX_ADI, faiss_index_oku, manifest_oku, taban_veri_ozeti
+from yorum_deposu import YorumDeposu
+
+# --- Genel Ayarlar ---
+PARCA_KLASOR_ADI = "parcalar"
+PARCA_MANIFEST_DOSYASI = "parcalar.json"
+PARCA_TURLERI = ("flat", "ivf", "ivfpq")
+# 'index_olustur.py' için varsayılanlar (0 veya 1: parçalama yok).
+PARCA_SAYISI = int(os.getenv("PARCA_SAYISI", "0"))
+PARCA_TURU = os.getenv("PARCA_TURU", "flat")
+# Bundan az yorumu olan havayolları bölünmez.
+PARCA_MIN_SATIR = int(os.getenv("PARCA_MIN_SATIR", "2000"))
+# Bundan küçük parçalar IVF istense de 'flat' kalır (küçük parçada IVF hem yavaş hem isabetsiz).
+PARCA_IVF_MIN_SATIR = int(os.getenv("PARCA_IVF_MIN_SATIR", "10000"))
+# Sorgu anı ayarları: IVF'de taranan küme sayısı ve 'ivfpq' için yeniden sıralama aday çarpanı.
+PARCA_NPROBE = int(os.getenv("PARCA_NPROBE", "16"))
+PARCA_YENIDEN_SIRALAMA = int(os.getenv("PARCA_YENIDEN_SIRALAMA", "4"))
+# 'surec', 'soket' veya 'kapali' (parçalar diskte olsa bile kullanılmaz).
+PARCA_MODU = os.getenv("PARCA_MODU", "surec")
+PARCA_SOKETLERI = [yol for yol in os.getenv("PARCA_SOKETLERI", "").split(",") if yol]
+# İşçi süreç sayısı (0: parça sayısı ile CPU sayısının küçüğü).
+PARCA_SURECI_SAYISI = int(os.getenv("PARCA_SURECI_SAYISI", "0"))
+# Bir işçi sürecin (veya parça sunucusunun) aynı anda açık tuttuğu en fazla index dosyası.
+PARCA_ACIK_INDEX_SINIRI = int(os.getenv("PARCA_ACIK_INDEX_SINIRI", "256"))
+
+
+# --- Parçaların Oluşturulması ---
+def _pq_alt_vektor_sayisi(boyut):
+    # Her alt vektör ~8 boyut olacak şekilde, boyutu tam bölen en büyük sayı.
+    return max(m for m in range(1, max(boyut // 8, 1) + 1) if boyut % m == 0)
+
+
+def _parca_indexi_kur(vektorler, idler, tur, ivf_min_satir):
+    # (index, gerçek tür) döndürür. Vektörler global satır numaralarıyla eklenir.
+    boyut = vektorler.shape[1]
+    if tur == "flat" or len(vektorler) < ivf_min_satir:
+        index = faiss.IndexIDMap2(faiss.IndexFlatL2(boyut))
+        index.add_with_ids(vektorler, idler)
+        return index, "flat"
+    # ~4·√n küme; FAISS her küme için en az 39 eğitim vektörü istiyor.
+    kume_sayisi = max(1, min(int(4 * np.sqrt(len(vektorler))), len(vektorler) // 39))
+    niceleyici = faiss.IndexFlatL2(boyut)
+    if tur == "ivf":
+        index = faiss.IndexIVFFlat(niceleyici, boyut, kume_sayisi)
+    else:
+        index = faiss.IndexIVFPQ(niceleyici, boyut, kume_sayisi, _pq_alt_vektor_sayisi(boyut), 8)
+    # Eğitim için en fazla ~100 bin vektör yeterli.
+    index.train(vektorler[::max(1, len(vektorler) // 100000)])
+    index.add_with_ids(vektorler, idler)
+    return index, tur
+
+
+def parcalari_olustur(klasor, parca_sayisi, tur=PARCA_TURU, min_satir=PARCA_MIN_SATIR,
+                      ivf_min_satir=PARCA_IVF_MIN_SATIR):
+    # 'klasor' altındaki global indexten parçaları üretir. Parçalar önce geçici klasöre yazılır ve
+    # tamamlanınca eskisinin yerine konur; yarım yazılmış parçalar hiçbir zaman okunmaz.
+    if tur not in PARCA_TURLERI:
+        raise ValueError(f"Bilinmeyen parça türü: {tur} (seçenekler: {', '.join(PARCA_TURLERI)})")
+    index, _ = faiss_index_oku(os.path.join(klasor, f"{GLOBAL_INDEX_ADI}.faiss"))
+    depo = YorumDeposu.yukle(klasor)
+    hedef = os.path.join(klasor, PARCA_KLASOR_ADI)
+    gecici = hedef + ".yeni"
+    shutil.rmtree(gecici, ignore_errors=True)
+    os.makedirs(gecici)
+
+    baslangic = time.time()
+    parcalar = []
+    for ad in depo.havayollari:
+        ilk, son = depo.araliklar[ad]
+        if son - ilk < max(min_satir, parca_sayisi):
+            continue
+        for parca_ilk, parca_son in _esit_bol(ilk, son, parca_sayisi):
+            vektorler = np.ascontiguousarray(index.reconstruct_n(parca_ilk, parca_son - parca_ilk), dtype=np.float32)
+            parca_indexi, gercek_tur = _parca_indexi_kur(
+                vektorler, np.arange(parca_ilk, parca_son, dtype=np.int64), tur, ivf_min_satir)
+            dosya = f"p{len(parcalar):05d}.faiss"
+            faiss.write_index(parca_indexi, os.path.join(gecici, dosya))
+            parcalar.append({"dosya": dosya, "havayolu": ad, "baslangic": parca_ilk, "bitis": parca_son,
+                             "tur": gercek_tur})
+        print(f"-> '{ad}': {son - ilk} yorum {parca_sayisi} parçaya bölündü.")
+
+    manifest = manifest_oku(klasor) or {}
+    with open(os.path.join(gecici, PARCA_MANIFEST_DOSYASI), "w", encoding="utf-8") as f:
+        json.dump({"surum": uuid.uuid4().hex, "veri_ozeti": taban_veri_ozeti(manifest), "tur": tur, "boyut": index.d,
+                   "parca_sayisi": parca_sayisi, "parcalar": parcalar}, f, ensure_ascii=False, indent=2)
+
+    eski = hedef + ".eski"
+    shutil.rmtree(eski, ignore_errors=True)
+    if os.path.exists(hedef):
+        os.replace(hedef, eski)
+    os.replace(gecici, hedef)
+    shutil.rmtree(eski, ignore_errors=True)
+    print(f"-> {len({p['havayolu'] for p in parcalar})} havayolu için {len(parcalar)} parça '{hedef}' "
+          f"klasörüne yazıldı ({time.time() - baslangic:.1f} sn).")
+    return parcalar
+
+
+def _esit_bol(ilk, son, parca_sayisi):
+    sinirlar = np.linspace(ilk, son, parca_sayisi + 1).astype(np.int64)
+    return [(int(a), int(b)) for a, b in zip(sinirlar[:-1], sinirlar[1:]) if b > a]
+
+
+# --- Parçalarda Arama (işçi süreçte veya soket sunucusunda çalışır) ---
+# Açılan parçalar tekrar kullanılmak üzere tutulur (LRU, en fazla PARCA_ACIK_INDEX_SINIRI dosya). Anahtar
+# parça sürümünü içerdiği için parçalar yeniden oluşturulunca eski dosyalar bir daha kullanılmaz; aynı yolun
+# yeni sürümü açılınca eskisi hemen kapatılır, başka klasördeki eski sürümler de zamanla LRU'dan düşer.
+_acik_indexler = OrderedDict()  # (yol, sürüm) -> FAISS indexi
+_acik_indexler_kilidi = threading.Lock()
+
+
+def _index_ac(yol, surum):
+    anahtar = (yol, surum)
+    with _acik_indexler_kilidi:
+        index = _acik_indexler.get(anahtar)
+        if index is not None:
+            _acik_indexler.move_to_end(anahtar)
+            return index
+        for eski in [eski for eski in _acik_indexler if eski[0] == yol]:
+            del _acik_indexler[eski]
+        index, _ = faiss_index_oku(yol)
+        _acik_indexler[anahtar] = index
+        # Atılan indexler o anda başka bir iş parçacığında aranıyor olabilir; Python referansı
+        # arama bitince düşer, dosya ancak o zaman kapanır.
+        while len(_acik_indexler) > PARCA_ACIK_INDEX_SINIRI:
+            _acik_indexler.popitem(last=False)
+        return index
+
+
+def _isci_baslat():
+    # Paralellik parçalar arasında; her süreçte FAISS'in kendi iş parçacıkları birbiriyle yarışmasın.
+    faiss.omp_set_num_threads(1)
+
+
+def parcalarda_ara(klasor, surum, parcalar, x, n, nprobe=PARCA_NPROBE, yeniden_siralama=PARCA_YENIDEN_SIRALAMA):
+    # parcalar: manifest kayıtları. (mesafeler, satırlar) döndürür; mesafeler tam L2, küçükten büyüğe.
+    x = np.asarray(x, dtype=np.float32).reshape(1, -1)
+    tum_mesafeler, tum_satirlar = [], []
+    for parca in parcalar:
+        index = _index_ac(os.path.join(klasor, PARCA_KLASOR_ADI, parca["dosya"]), surum)
+        if parca["tur"] == "flat":
+            mesafeler, satirlar = index.search(x, n)
+        else:
+            aday = n * yeniden_siralama if parca["tur"] == "ivfpq" else n
+            mesafeler, satirlar = index.search(x, aday, params=faiss.SearchParametersIVF(nprobe=nprobe))
+            if parca["tur"] == "ivfpq":
+                mesafeler, satirlar = _tam_mesafeyle_sirala(klasor, surum, x, satirlar[0], n)
+        tum_mesafeler.append(mesafeler.reshape(-1))
+        tum_satirlar.append(satirlar.reshape(-1))
+    return en_yakinlar(tum_mesafeler, tum_satirlar, n)
+
+
+def _tam_mesafeyle_sirala(klasor, surum, x, satirlar, n):
+    # Nicemlenmiş mesafeler yaklaşık; adayları global indexteki tam vektörlerle yeniden sıralıyorum.
+    satirlar = satirlar[satirlar >= 0]
+    if len(satirlar) == 0:
+        return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int64)
+    tam_index = _index_ac(os.path.join(klasor, f"{GLOBAL_INDEX_ADI}.faiss"), surum)
+    vektorler = np.vstack([tam_index.reconstruct(int(satir)) for satir in satirlar])
+    mesafeler = ((vektorler - x) ** 2).sum(axis=1)
+    sira = np.argsort(mesafeler, kind="stable")[:n]
+    return mesafeler[sira], satirlar[sira]
+
+
+def en_yakinlar(mesafe_listeleri, satir_listeleri, n):
+    # Parçalardan gelen sonuçları birleştirip en yakın n tanesini döndürür (-1'ler atılır).
+    if not mesafe_listeleri:
+        return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int64)
+    mesafeler = np.concatenate(mesafe_listeleri).astype(np.float32)
+    satirlar = np.concatenate(satir_listeleri).astype(np.int64)
+    gecerli = satirlar >= 0
+    mesafeler, satirlar = mesafeler[gecerli], satirlar[gecerli]
+    sira = np.argsort(mesafeler, kind="stable")[:n]
+    return mesafeler[sira], satirlar[sira]
+
+
+# --- Unix Soketi Protokolü ---
+# Her mesaj: 8 baytlık başlık (JSON uzunluğu, veri uzunluğu) + JSON + ham numpy baytları.
+def mesaj_gonder(baglanti, baslik, veri=b""):
+    kodlu = json.dumps(baslik).encode("utf-8")
+    baglanti.sendall(struct.pack("!II", len(kodlu), len(veri)) + kodlu + veri)
+
+
+def _tam_oku(baglanti, uzunluk):
+    parcalar = []
+    while uzunluk:
+        parca = baglanti.recv(min(uzunluk, 1 << 20))
+        if not parca:
+            raise ConnectionError("Bağlantı kapandı")
+        parcalar.append(parca)
+        uzunluk -= len(parca)
+    return b"".join(parcalar)
+
+
+def mesaj_al(baglanti):
+    # (başlık, veri) döndürür; karşı taraf bağlantıyı kapattıysa (None, b"").
+    ilk = baglanti.recv(8)
+    if not ilk:
+        return None, b""
+    if len(ilk) < 8:
+        ilk += _tam_oku(baglanti, 8 - len(ilk))
+    json_uzunlugu, veri_uzunlugu = struct.unpack("!II", ilk)
+    baslik = json.loads(_tam_oku(baglanti, json_uzunlugu).decode("utf-8"))
+    return baslik, _tam_oku(baglanti, veri_uzunlugu)
+
+
+def _soket_sorgusu(yol, baslik, veri=b"", zaman_asimi=10.0):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as baglanti:
+        baglanti.settimeout(zaman_asimi)
+        baglanti.connect(yol)
+        mesaj_gonder(baglanti, baslik, veri)
+        cevap, cevap_verisi = mesaj_al(baglanti)
+    if cevap is None or cevap.get("durum") != "tamam":
+        raise RuntimeError(f"Parça sunucusu '{yol}' hata döndürdü: {(cevap or {}).get('mesaj', 'bağlantı kapandı')}")
+    return cevap, cevap_verisi
+
+
+def _soketle_ara(yol, surum, dosyalar, x, n, nprobe, yeniden_siralama):
+    baslik = {"islem": "ara", "surum": surum, "dosyalar": dosyalar, "n": n, "nprobe": nprobe,
+              "yeniden_siralama": yeniden_siralama}
+    cevap, veri = _soket_sorgusu(yol, baslik, np.asarray(x, dtype=np.float32).tobytes())
+    sayi = cevap["sayi"]
+    mesafeler = np.frombuffer(veri[:sayi * 4], dtype=np.float32)
+    satirlar = np.frombuffer(veri[sayi * 4:], dtype=np.int64)
+    return mesafeler, satirlar
+
+
+# --- Sorgu Tarafı ---
+# İşçi süreçler ve soket istekleri için havuzlar süreç başına bir kere kurulur ve
+# tüm index sürümleri tarafından paylaşılır.
+_isciler = []
+_soket_havuzu = ThreadPoolExecutor(max_workers=8, thread_name_prefix="parca-soket")
+_havuz_kilidi = threading.Lock()
+
+
+def _isci_havuzu(sayi):
+    # Her işçi tek süreçli bir havuz; parça i her zaman i % sayi numaralı işçiye gider.
+    with _havuz_kilidi:
+        if not _isciler:
+            # OpenMP iş parçacıkları çalışan bir süreçte fork güvenli değil; işçiler 'spawn' ile başlatılıyor.
+            baglam = multiprocessing.get_context("spawn")
+            _isciler.extend(ProcessPoolExecutor(max_workers=1, mp_context=baglam, initializer=_isci_baslat)
+                            for _ in range(sayi))
+            print(f"-> Parçalı arama için {sayi} işçi süreç başlatıldı.")
+        return _isciler
+
+
+class ParcaliArama:
+    # Bir index klasöründeki parçaları ve hangi parçanın nerede aranacağını bilir.
+
+    def __init__(self, klasor, manifest, soketler=()):
+        self.klasor = os.path.abspath(klasor)
+        self.surum = manifest["surum"]
+        self.boyut = manifest["boyut"]
+        self.parcalar = manifest["parcalar"]
+        self.havayolu_parcalari = {}
+        for no, parca in enumerate(self.parcalar):
+            self.havayolu_parcalari.setdefault(parca["havayolu"], []).append(no)
+        self.surec_sayisi = PARCA_SURECI_SAYISI or max(1, min(len(self.parcalar), os.cpu_count() or 1))
+        # Parça no -> soket yolu (sadece bu sürümün parçalarını sunan sunucular).
+        self.soketler = {}
+        for yol in soketler:
+            try:
+                cevap, _ = _soket_sorgusu(yol, {"islem": "bilgi"})
+            except (OSError, RuntimeError) as e:
+                print(f"-> Parça sunucusuna ulaşılamadı ({yol}): {e}")
+                continue
+            if cevap["surum"] != self.surum:
+                print(f"-> Parça sunucusu ({yol}) farklı bir index sürümü sunuyor, kullanılmayacak.")
+                continue
+            dosya_numaralari = {parca["dosya"]: no for no, parca in enumerate(self.parcalar)}
+            for dosya in cevap["dosyalar"]:
+                self.soketler.setdefault(dosya_numaralari[dosya], yol)
+
+    @classmethod
+    def yukle(cls, klasor):
+        # Parça yoksa, parçalar bu indexin verisine ait değilse veya PARCA_MODU=kapali ise None döner.
+        if PARCA_MODU == "kapali":
+            return None
+        try:
+            with open(os.path.join(klasor, PARCA_KLASOR_ADI, PARCA_MANIFEST_DOSYASI), encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        # Parçalar global indexten (tabandan) türetilir; artımlı güncellemeler onları geçersiz kılmaz.
+        if manifest.get("veri_ozeti") != taban_veri_ozeti(manifest_oku(klasor) or {}):
+            print("-> Index parçaları güncel indexe ait değil, kullanılmayacak.")
+            return None
+        parcali = cls(klasor, manifest, PARCA_SOKETLERI if PARCA_MODU == "soket" else ())
+        print(f"-> {len(parcali.havayolu_parcalari)} büyük havayolu {len(parcali.parcalar)} parçada aranacak "
+              f"(mod: {PARCA_MODU}, soketle sunulan parça: {len(parcali.soketler)}).")
+        return parcali
+
+    def parcali_mi(self, havayolu):
+        return havayolu in self.havayolu_parcalari
+
+    def ara_baslat(self, x, n, havayollari):
+        # Aramaları başlatır ve bekleyen görevleri döndürür; sonuçlar sonuclari_topla ile alınır.
+        # Çağıran taraf bu sırada parçalanmamış havayollarını kendi indexinde arayabilir.
+        x = np.asarray(x, dtype=np.float32).reshape(1, -1)
+        soket_isleri, surec_isleri = {}, {}
+        for ad in havayollari:
+            for no in self.havayolu_parcalari[ad]:
+                if no in self.soketler:
+                    soket_isleri.setdefault(self.soketler[no], []).append(self.parcalar[no]["dosya"])
+                else:
+                    surec_isleri.setdefault(no % self.surec_sayisi, []).append(self.parcalar[no])
+        gorevler = [_soket_havuzu.submit(_soketle_ara, yol, self.surum, dosyalar, x, n, PARCA_NPROBE,
+                                         PARCA_YENIDEN_SIRALAMA)
+                    for yol, dosyalar in soket_isleri.items()]
+        if surec_isleri:
+            isciler = _isci_havuzu(self.surec_sayisi)
+            gorevler += [isciler[isci_no % len(isciler)].submit(parcalarda_ara, self.klasor, self.surum, parcalar, x, n,
+                                                                 PARCA_NPROBE, PARCA_YENIDEN_SIRALAMA)
+                         for isci_no, parcalar in surec_isleri.items()]
+        return gorevler, n
+
+    def sonuclari_topla(self, bekleyen, zaman_asimi=30.0):
+        # [(mesafe, satır), ...] en yakından uzağa. Herhangi bir parça hata verirse hata yükseltir.
+        gorevler, n = bekleyen
+        sonuclar = [gorev.result(timeout=zaman_asimi) for gorev in gorevler]
+        mesafeler, satirlar = en_yakinlar([m for m, _ in sonuclar], [s for _, s in sonuclar], n)
+        return [(float(mesafe), int(satir)) for mesafe, satir in zip(mesafeler, satirlar)]
+
+    def ara(self, x, n, havayollari):
+        return self.sonuclari_topla(self.ara_baslat(x, n, havayollari))
+
+    def isindir(self, havayollari):
+        # Parçaları işçilerde açıp bir kere tarar (vektör sayfaları belleğe gelir).
+        havayollari = [ad for ad in havayollari if self.parcali_mi(ad)]
+        if havayollari:
+            self.ara(np.zeros(self.boyut, dtype=np.float32), 1, havayollari)
@@ -0,0 +1,351 @@
+# --- Gerekli Kütüphaneler ---
+# Bu script, chatbot motorunun performansını Google servislerine gitmeden ölçer.
+# Embedding modeli ve LLM yerine 'sahte_modeller.py'deki deterministik sahte modeller
+# (ayarlanabilir yapay gecikmeyle) kullanılır. Farklı büyüklükte havayollarından oluşan
+# sentetik bir veri seti üretilir, soru kümesi bu havayollarında tekrar tekrar çalıştırılır ve
+# her aşama (dil tespiti, çeviri, filtreleme, index yükleme/oluşturma, arama, cevap üretimi)
+# için p50/p95/p99 gecikme, toplam verim (sorgu/sn) ve tepe bellek (RSS) raporlanır.
+# Sonuçlar JSON olarak kaydedilir; --karsilastir ile önceki bir çalıştırmayla kıyaslanabilir.
+#
+# Örnek: python performans_testi.py --havayolu-boyutlari 100,1000,5000 --tekrar 3 --cikti sonuc.json
+# Import süresi bütçesi: python performans_testi.py --ithalat-butcesi 400
+#   ('python -X importtime -c "import chatbot_engine"' çıktısını ölçer, bütçe aşılırsa hata koduyla çıkar.)
+import os
+import io
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import resource
+import tempfile
+import contextlib
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from sahte_modeller import SahteEmbeddings, SahteLLM
+from embedding_onbellegi import OnbellekliEmbeddings
+from cevap_onbellegi import CevapOnbellegi
+from yorum_deposu import YORUM_DEPOSU_KLASORU, yorum_deposu_yaz, kaynak_bilgisi
+
+# --- Genel Ayarlar ---
+# (anahtar, rapordaki adı) - anahtarlar SorguHazirligi.olcumler içindeki süre alanlarıdır.
+ASAMALAR = [
+    ("dil_tespiti_sn", "Dil tespiti"),
+    ("ceviri_sn", "Çeviri"),
+    ("ceviri_bekleme_sn", "Çeviri bekleme"),
+    ("filtreleme_sn", "Filtreleme"),
+    ("index_sn", "Index yükleme/oluşturma"),
+    ("sorgu_embedding_sn", "Sorgu embedding"),
+    ("arama_sn", "Arama"),
+    ("baglam_sn", "Bağlam derleme"),
+    ("ilk_parca_sn", "İlk parça"),
+    ("uretim_sn", "Cevap üretimi"),
+    ("hazirlik_sn", "Hazırlık (toplam)"),
+    ("toplam_sn", "Uçtan uca"),
+]
+
+SORU_KUMESI = [
+    "Yemekler ve koltuklar nasıldı?",
+    "Kabin ekibi yolculara nasıl davrandı?",
+    "Uçuşlarda rötar oluyor mu?",
+    "Bagaj kaybı ile ilgili şikayetler neler?",
+    "How was the food service?",
+    "What are the common complaints about the staff?",
+    "Is the legroom comfortable on long flights?",
+    "How good is the in-flight entertainment?",
+]
+
+# Karşılaştırmada bundan küçük farklar (ms) ölçüm gürültüsü sayılır.
+MIN_FARK_MS = 1.0
+
+# Import süresi ölçülen modül; ağır kütüphaneler bu modülün fonksiyonları içinde yüklenmeli.
+ITHALAT_MODULU = "chatbot_engine"
+
+YORUM_KELIMELERI = """
+seat seats food meal crew staff delay delayed lounge legroom wifi baggage lost refund comfortable rude
+friendly clean dirty cabin entertainment screen boarding late on time service excellent terrible average
+long flight short flight upgrade business economy check-in queue airport connection
+""".split()
+
+
+# --- Yardımcı Fonksiyonlar ---
+def sentetik_veri_yaz(dosya, havayolu_boyutlari, tohum):
+    # Her havayolu için verilen sayıda, aynı tohumla her seferinde aynı olan sentetik yorum üretir.
+    # Gerçek veride olduğu gibi yorumlar cümlelerden oluşur ve yaklaşık onda biri çok uzundur.
+    rng = random.Random(tohum)
+    adlar, metinler = [], []
+    for i, boyut in enumerate(havayolu_boyutlari):
+        ad = f"Havayolu {i + 1} ({boyut})"
+        for _ in range(boyut):
+            baslik = " ".join(rng.choices(YORUM_KELIMELERI, k=4))
+            kelime_sayisi = rng.randint(300, 600) if rng.random() < 0.1 else rng.randint(30, 120)
+            cumleler = []
+            while kelime_sayisi > 0:
+                uzunluk = min(rng.randint(6, 18), kelime_sayisi)
+                cumleler.append(" ".join(rng.choices(YORUM_KELIMELERI, k=uzunluk)).capitalize() + ".")
+                kelime_sayisi -= uzunluk
+            yorum = " ".join(cumleler)
+            adlar.append(ad)
+            metinler.append(f"BASLIK: {baslik}\nYORUM: {yorum}")
+    pd.DataFrame({"Airline Name": adlar, "birlesik_yorum": metinler}).to_csv(dosya, index=False)
+    return adlar, metinler
+
+
+def yuzdelikler(degerler):
+    # Saniye cinsinden süreleri milisaniye cinsinden özet istatistiklere çevirir.
+    if not degerler:
+        return {"n": 0}
+    ms = np.asarray(degerler) * 1000
+    return {
+        "n": len(ms),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "ortalama_ms": float(ms.mean()),
+        "maks_ms": float(ms.max()),
+    }
+
+
+def istem_ozeti(sonuclar):
+    tokenler = [sonuc["istem_token"] for sonuc in sonuclar if "istem_token" in sonuc]
+    oranlar = [sonuc["baglam_sikistirma"] for sonuc in sonuclar if "baglam_sikistirma" in sonuc]
+    if not tokenler:
+        return {"n": 0}
+    return {
+        "n": len(tokenler),
+        "token_p50": float(np.percentile(tokenler, 50)),
+        "token_p95": float(np.percentile(tokenler, 95)),
+        "token_maks": int(max(tokenler)),
+        "ortalama_sikistirma": float(np.mean(oranlar)) if oranlar else 1.0,
+    }
+
+
+def tepe_rss_mb():
+    # Linux'ta ru_maxrss KB, macOS'ta bayt cinsindendir.
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def ithalat_suresi_olc(modul=ITHALAT_MODULU):
+    # Modülü temiz bir Python sürecinde '-X importtime' ile import eder. Toplam süreyi (ms) ve
+    # en pahalı alt modülleri [(ms, ad), ...] döndürür.
+    sonuc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modul}"],
+                           cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True)
+    if sonuc.returncode != 0:
+        raise RuntimeError(f"'{modul}' import edilemedi:\n{sonuc.stderr[-2000:]}")
+    sureler = []
+    for satir in sonuc.stderr.splitlines():
+        if not satir.startswith("import time:") or "|" not in satir:
+            continue
+        _, kumulatif, ad = satir.split("|")
+        if kumulatif.strip().isdigit():
+            sureler.append((int(kumulatif) / 1000, ad.strip()))
+    toplam = next(ms for ms, ad in reversed(sureler) if ad == modul)
+    alt_moduller = sorted((s for s in sureler if s[1] != modul), reverse=True)
+    return toplam, alt_moduller[:8]
+
+
+def sorgu_calistir(motor, soru, havayolu):
+    baslangic = time.perf_counter()
+    hazirlik = motor.sorguyu_hazirla(soru, havayolu)
+    hazirlik_sn = time.perf_counter() - baslangic
+    "".join(motor.cevap_akisi(hazirlik))
+    olcumler = dict(hazirlik.olcumler)
+    olcumler.update(havayolu=havayolu, hazirlik_sn=hazirlik_sn, toplam_sn=time.perf_counter() - baslangic,
+                    hata=hazirlik.mesaj is not None)
+    return olcumler
+
+
+def performans_testi(args):
+    havayolu_boyutlari = [int(boyut) for boyut in args.havayolu_boyutlari.split(",")]
+    # Motor dosya yollarını çalışma klasörüne göre kullandığı için her çalıştırma boş bir geçici klasörde yapılır.
+    calisma_klasoru = tempfile.mkdtemp(prefix="performans_")
+    eski_klasor = os.getcwd()
+    os.chdir(calisma_klasoru)
+    try:
+        return _calistir(args, havayolu_boyutlari, calisma_klasoru)
+    finally:
+        os.chdir(eski_klasor)
+        if not args.klasoru_sakla:
+            shutil.rmtree(calisma_klasoru, ignore_errors=True)
+
+
+def _calistir(args, havayolu_boyutlari, calisma_klasoru):
+    sessiz = contextlib.nullcontext() if args.ayrintili else contextlib.redirect_stdout(io.StringIO())
+    hazirlik_sureleri = {}
+
+    veri_dosyasi = "temiz_havayolu_yorumlari.csv"
+    baslangic = time.perf_counter()
+    adlar, metinler = sentetik_veri_yaz(veri_dosyasi, havayolu_boyutlari, args.tohum)
+    yorum_deposu_yaz(YORUM_DEPOSU_KLASORU, adlar, metinler, ek_bilgi={"kaynak": kaynak_bilgisi(veri_dosyasi)})
+    hazirlik_sureleri["veri_sn"] = time.perf_counter() - baslangic
+
+    # Uygulamadaki gibi embedding modelini disk önbelleğiyle sarıyorum.
+    embeddings = OnbellekliEmbeddings(SahteEmbeddings(boyut=args.boyut, gecikme=args.embedding_gecikmesi),
+                                      "sahte", "embedding_onbellegi.sqlite")
+    llm = SahteLLM(ilk_token_gecikmesi=args.llm_gecikmesi, token_gecikmesi=args.token_gecikmesi,
+                   token_sayisi=args.token_sayisi)
+
+    with sessiz:
+        if args.mod == "disk":
+            from index_olustur import indexleri_olustur
+            baslangic = time.perf_counter()
+            indexleri_olustur(veri_dosyasi, embeddings=embeddings, parca_sayisi=args.parca, parca_turu=args.parca_turu)
+            hazirlik_sureleri["index_olusturma_sn"] = time.perf_counter() - baslangic
+
+        import chatbot_engine as motor
+        # Isınma arka planda ölçülen sorgularla yarışmasın diye burada ayrıca ve sonuna kadar çalıştırılıyor.
+        motor.ISINMA_HAVAYOLU_SAYISI = 0
+        baslangic = time.perf_counter()
+        motor.baslat(embeddings, llm)
+        hazirlik_sureleri["motor_baslatma_sn"] = time.perf_counter() - baslangic
+        if args.isinma:
+            baslangic = time.perf_counter()
+            motor.isindir(args.isinma)
+            hazirlik_sureleri["isinma_sn"] = time.perf_counter() - baslangic
+        if not args.cevap_onbellegi:
+            # Süresi hemen dolan bir önbellek: her soru gerçekten arama ve üretimden geçer.
+            motor.cevap_onbellegi = CevapOnbellegi("cevap_onbellegi.sqlite", ttl_sn=0)
+
+        havayollari = motor.guncel_yorum_deposu().havayollari
+        sorgular = [(soru, havayolu) for _ in range(args.tekrar) for havayolu in havayollari for soru in SORU_KUMESI]
+        if args.karisik:
+            random.Random(args.tohum).shuffle(sorgular)
+
+        baslangic = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.eszamanlilik) as havuz:
+            sonuclar = list(havuz.map(lambda sorgu: sorgu_calistir(motor, *sorgu), sorgular))
+        gecen = time.perf_counter() - baslangic
+
+    rapor = {
+        "ayarlar": vars(args),
+        "ortam": {"python": platform.python_version(), "platform": platform.platform(), "cpu": os.cpu_count()},
+        "hazirlik": hazirlik_sureleri,
+        "sorgu_sayisi": len(sonuclar),
+        "hatali_sorgu": sum(sonuc["hata"] for sonuc in sonuclar),
+        "sure_sn": gecen,
+        "verim_sorgu_sn": len(sonuclar) / gecen if gecen else 0.0,
+        "tepe_rss_mb": tepe_rss_mb(),
+        "asamalar": {anahtar: yuzdelikler([sonuc[anahtar] for sonuc in sonuclar if anahtar in sonuc])
+                     for anahtar, _ in ASAMALAR},
+        # İstem boyutunun dağılımı: bağlam bütçesi istem boyutunu ne kadar sabitliyor?
+        "istem": istem_ozeti(sonuclar),
+        "havayolu_bazinda": {
+            ad: yuzdelikler([sonuc["toplam_sn"] for sonuc in sonuclar if sonuc["havayolu"] == ad])
+            for ad in havayollari
+        },
+        "yollar": {
+            alan: dict(pd.Series([sonuc.get(alan, "-") for sonuc in sonuclar]).value_counts())
+            for alan in ("dil_yontemi", "ceviri_yolu", "index_yolu", "cevap_onbellegi")
+        },
+        "calisma_klasoru": calisma_klasoru if args.klasoru_sakla else None,
+    }
+    # value_counts numpy tamsayısı döndürüyor; JSON'a yazabilmek için int'e çeviriyorum.
+    rapor["yollar"] = {alan: {k: int(v) for k, v in sayilar.items()} for alan, sayilar in rapor["yollar"].items()}
+    return rapor
+
+
+def raporu_yazdir(rapor):
+    print(f"\n--- Performans Testi ({rapor['ayarlar']['mod']} modu) ---")
+    print(f"Sorgu: {rapor['sorgu_sayisi']} (hatalı: {rapor['hatali_sorgu']}), süre: {rapor['sure_sn']:.2f} sn, "
+          f"verim: {rapor['verim_sorgu_sn']:.1f} sorgu/sn, tepe RSS: {rapor['tepe_rss_mb']:.0f} MB")
+    print("Hazırlık: " + ", ".join(f"{k}={v:.2f}" for k, v in rapor["hazirlik"].items()))
+    print(f"\n{'Aşama':<26}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for anahtar, ad in ASAMALAR:
+        istatistik = rapor["asamalar"][anahtar]
+        if istatistik["n"]:
+            print(f"{ad:<26}{istatistik['n']:>6}{istatistik['p50_ms']:>10.1f}"
+                  f"{istatistik['p95_ms']:>10.1f}{istatistik['p99_ms']:>10.1f}")
+    istem = rapor["istem"]
+    if istem["n"]:
+        print(f"\nİstem tokenı: p50 {istem['token_p50']:.0f}, p95 {istem['token_p95']:.0f}, maks {istem['token_maks']}; "
+              f"ortalama bağlam sıkıştırma oranı: {istem['ortalama_sikistirma']:.2f}")
+    print(f"\n{'Havayolu':<26}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for ad, istatistik in rapor["havayolu_bazinda"].items():
+        print(f"{ad:<26}{istatistik['n']:>6}{istatistik['p50_ms']:>10.1f}"
+              f"{istatistik['p95_ms']:>10.1f}{istatistik['p99_ms']:>10.1f}")
+    print("\nYollar: " + "; ".join(f"{alan}: {sayilar}" for alan, sayilar in rapor["yollar"].items()))
+
+
+def karsilastir(onceki, yeni, esik):
+    # Her aşamanın p50 ve p95 değerini önceki çalıştırmayla kıyaslar; esik oranından fazla
+    # yavaşlayanları işaretler. Yavaşlama varsa True döner.
+    print(f"\n--- Önceki Çalıştırmayla Karşılaştırma (eşik: %{esik * 100:.0f}) ---")
+    for ayar in ("mod", "havayolu_boyutlari", "eszamanlilik", "embedding_gecikmesi", "llm_gecikmesi", "parca",
+                 "parca_turu"):
+        if onceki["ayarlar"].get(ayar) != yeni["ayarlar"].get(ayar):
+            print(f"UYARI: '{ayar}' ayarı farklı ({onceki['ayarlar'].get(ayar)} -> {yeni['ayarlar'].get(ayar)}).")
+    yavaslama = False
+    for anahtar, ad in ASAMALAR:
+        eski, simdiki = onceki["asamalar"].get(anahtar, {}), yeni["asamalar"][anahtar]
+        if not eski.get("n") or not simdiki["n"]:
+            continue
+        for olcu in ("p50_ms", "p95_ms"):
+            degisim = (simdiki[olcu] - eski[olcu]) / eski[olcu] if eski[olcu] else 0.0
+            isaret = ""
+            if degisim > esik and simdiki[olcu] - eski[olcu] > MIN_FARK_MS:
+                isaret = "  <-- YAVAŞLAMA"
+                yavaslama = True
+            print(f"{ad:<26}{olcu:>8}: {eski[olcu]:>9.1f} -> {simdiki[olcu]:>9.1f} ({degisim * 100:+.0f}%){isaret}")
+    print(f"{'Verim (sorgu/sn)':<26}{'':>8}: {onceki['verim_sorgu_sn']:>9.1f} -> {yeni['verim_sorgu_sn']:>9.1f}")
+    print(f"{'Tepe RSS (MB)':<26}{'':>8}: {onceki['tepe_rss_mb']:>9.0f} -> {yeni['tepe_rss_mb']:>9.0f}")
+    return yavaslama
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chatbot motorunu sahte modellerle çevrimdışı ölçer.")
+    parser.add_argument("--havayolu-boyutlari", default="100,1000,5000",
+                        help="Virgülle ayrılmış, her havayolunun yorum sayısı")
+    parser.add_argument("--mod", choices=["disk", "gecici"], default="disk",
+                        help="disk: önceden oluşturulmuş global index, gecici: her soruda filtreleme + geçici index")
+    parser.add_argument("--tekrar", type=int, default=2, help="Soru kümesinin kaç kez çalıştırılacağı")
+    parser.add_argument("--eszamanlilik", type=int, default=1, help="Aynı anda çalışan sorgu sayısı")
+    parser.add_argument("--karisik", action="store_true", help="Sorguları karışık sırayla çalıştır")
+    parser.add_argument("--boyut", type=int, default=768, help="Sahte embedding vektör boyutu")
+    parser.add_argument("--embedding-gecikmesi", type=float, default=0.05, help="Embedding çağrısı başına gecikme (sn)")
+    parser.add_argument("--llm-gecikmesi", type=float, default=0.3, help="LLM ilk parça gecikmesi (sn)")
+    parser.add_argument("--token-gecikmesi", type=float, default=0.01, help="LLM parça başına gecikme (sn)")
+    parser.add_argument("--token-sayisi", type=int, default=60, help="Sahte cevabın kelime sayısı")
+    parser.add_argument("--cevap-onbellegi", action="store_true", help="Cevap önbelleğini açık bırak")
+    parser.add_argument("--tohum", type=int, default=42)
+    parser.add_argument("--cikti", default="performans_sonuclari.json", help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument("--karsilastir", help="Kıyaslanacak önceki sonuç JSON dosyası")
+    parser.add_argument("--esik", type=float, default=0.10, help="Yavaşlama sayılacak artış oranı")
+    parser.add_argument("--ayrintili", action="store_true", help="Motorun kendi çıktılarını da göster")
+    parser.add_argument("--isinma", type=int, default=0,
+                        help="Başlatmadan sonra arka planda ısıtılacak havayolu sayısı (0: kapalı)")
+    parser.add_argument("--ithalat-butcesi", type=float,
+                        help="Sadece chatbot_engine import süresini ölç; bu kadar ms'yi aşarsa hata koduyla çık")
+    parser.add_argument("--parca", type=int, default=0,
+                        help="disk modunda büyük havayollarını bu kadar parçaya böl (parcali_index.py)")
+    parser.add_argument("--parca-turu", choices=["flat", "ivf", "ivfpq"], default="flat", help="Parça index türü")
+    parser.add_argument("--klasoru-sakla", action="store_true", help="Geçici çalışma klasörünü silme")
+    args = parser.parse_args()
+    if args.ithalat_butcesi is not None:
+        toplam_ms, alt_moduller = ithalat_suresi_olc()
+        print(f"'{ITHALAT_MODULU}' import süresi: {toplam_ms:.0f} ms (bütçe: {args.ithalat_butcesi:.0f} ms)")
+        for ms, ad in alt_moduller:
+            print(f"  {ms:>8.1f} ms  {ad}")
+        sys.exit(1 if toplam_ms > args.ithalat_butcesi else 0)
+
+    # Çalışma klasörü değişeceği için dosya yollarını şimdiden mutlak yapıyorum.
+    args.cikti = os.path.abspath(args.cikti)
+    args.karsilastir = os.path.abspath(args.karsilastir) if args.karsilastir else None
+
+    rapor = performans_testi(args)
+    raporu_yazdir(rapor)
+    with open(args.cikti, "w", encoding="utf-8") as f:
+        json.dump(rapor, f, ensure_ascii=False, indent=2)
+    print(f"\nSonuçlar '{args.cikti}' dosyasına yazıldı.")
+
+    if args.karsilastir:
+        with open(args.karsilastir, encoding="utf-8") as f:
+            onceki = json.load(f)
+        if karsilastir(onceki, rapor, args.esik):
+            sys.exit(1)
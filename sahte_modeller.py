@@ -0,0 +1,108 @@
+# --- Gerekli Kütüphaneler ---
+# Bu modül, Google servislerine gitmeden denemeler yapabilmek için deterministik
+# sahte model nesneleri sağlar. Aynı metin her zaman aynı vektörü, aynı istem her zaman aynı cevabı üretir.
+import re
+import time
+import hashlib
+import threading
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+class SahteKotaHatasi(Exception):
+    # Google API'nin 429 / kota aşımı hatasını taklit eder.
+    def __init__(self):
+        super().__init__("429 Resource has been exhausted (e.g. check quota).")
+
+
+class SahteEmbeddings(Embeddings):
+    # Metnin özetinden tohumlanan rastgele, birim uzunluklu vektörler üretir.
+    # gecikme: her çağrıda beklenecek süre (sn), kota_hatasi_her: her N. çağrıda 429 fırlatır.
+
+    def __init__(self, boyut=768, gecikme=0.0, kota_hatasi_her=0):
+        self.boyut = boyut
+        self.gecikme = gecikme
+        self.kota_hatasi_her = kota_hatasi_her
+        self.cagri_sayisi = 0
+        self._kilit = threading.Lock()
+
+    def _vektor(self, metin):
+        tohum = int.from_bytes(hashlib.sha256(metin.encode("utf-8")).digest()[:8], "little")
+        vektor = np.random.default_rng(tohum).standard_normal(self.boyut).astype(np.float32)
+        return (vektor / np.linalg.norm(vektor)).tolist()
+
+    def _cagri(self):
+        with self._kilit:
+            self.cagri_sayisi += 1
+            sira = self.cagri_sayisi
+        if self.gecikme:
+            time.sleep(self.gecikme)
+        if self.kota_hatasi_her and sira % self.kota_hatasi_her == 0:
+            raise SahteKotaHatasi()
+
+    def embed_documents(self, texts):
+        self._cagri()
+        return [self._vektor(metin) for metin in texts]
+
+    def embed_query(self, text):
+        self._cagri()
+        return self._vektor(text)
+
+    def embed_queries(self, texts):
+        # Toplu sorgu embedding'i: tek çağrı (tek gecikme) ile birden fazla soru.
+        self._cagri()
+        return [self._vektor(metin) for metin in texts]
+
+
+# SahteLLM'in cevaplarında kullandığı kelimeler.
+SAHTE_KELIMELER = np.array("""
+passengers mentioned the seats food crew service flight delay comfortable friendly staff legroom meal
+overall experience boarding lounge baggage entertainment clean cabin average positive negative
+""".split())
+
+
+class SahteLLM(BaseChatModel):
+    # ChatGoogleGenerativeAI yerine kullanılabilen sahte sohbet modeli. invoke() ve stream() destekler.
+    # Çeviri istemlerinde tırnak içindeki metni aynen döndürür; diğer istemlerde istemin özetinden
+    # tohumlanan, token_sayisi kelimelik sabit bir cevap üretir.
+    # ilk_token_gecikmesi: ilk parçadan önce beklenecek süre (sn), token_gecikmesi: her parça arasında.
+
+    ilk_token_gecikmesi: float = 0.0
+    token_gecikmesi: float = 0.0
+    token_sayisi: int = 40
+    cagri_sayisi: int = 0
+
+    @property
+    def _llm_type(self):
+        return "sahte"
+
+    def _cevap(self, messages):
+        istem = "\n".join(str(mesaj.content) for mesaj in messages)
+        self.cagri_sayisi += 1
+        ceviri = re.search(r"^Translate the following .*?: '(.*)'$", istem, re.DOTALL)
+        if ceviri:
+            return ceviri.group(1)
+        tohum = int.from_bytes(hashlib.sha256(istem.encode("utf-8")).digest()[:8], "little")
+        kelimeler = np.random.default_rng(tohum).choice(SAHTE_KELIMELER, size=self.token_sayisi)
+        return " ".join(kelimeler) + "."
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.ilk_token_gecikmesi:
+            time.sleep(self.ilk_token_gecikmesi)
+        cevap = self._cevap(messages)
+        if self.token_gecikmesi:
+            time.sleep(self.token_gecikmesi * len(cevap.split()))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=cevap))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.ilk_token_gecikmesi:
+            time.sleep(self.ilk_token_gecikmesi)
+        for i, kelime in enumerate(self._cevap(messages).split(" ")):
+            if i and self.token_gecikmesi:
+                time.sleep(self.token_gecikmesi)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=kelime if i == 0 else " " + kelime))
+
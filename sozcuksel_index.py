@@ -0,0 +1,149 @@
+# --- Gerekli Kütüphaneler ---
+# Bu modül, yorumlar için BM25 tabanlı sözcüksel (kelime eşleşmesine dayalı) bir ters index sağlar.
+# Vektör araması anlamca yakın yorumları iyi bulur ama "A380", "lounge" veya rota isimleri gibi
+# birebir geçen terimleri kaçırabilir; bu index o boşluğu doldurur.
+#
+# Diskteki format (hepsi numpy dizisi, mmap ile açılır):
+#   - terimler.json        : sıralı terim listesi (terim ID'si = listedeki sırası)
+#   - posting_ofset.npy    : t. terimin postingleri [posting_ofset[t], posting_ofset[t+1]) aralığında
+#   - posting_dokuman.npy  : postinglerdeki satır numaraları (her terim için artan sırada, int32)
+#   - posting_frekans.npy  : terimin o satırda kaç kez geçtiği (uint16)
+#   - dokuman_uzunluk.npy  : her satırın terim sayısı (int32)
+# Satırlar yorum deposuyla aynı sırada olduğu için havayolu filtresi, postinglerde
+# havayolunun satır aralığına ikili arama (searchsorted) ile uygulanır.
+import os
+import re
+import json
+from array import array
+from collections import Counter
+
+import numpy as np
+
+# --- Genel Ayarlar ---
+BM25_K1 = 1.2
+BM25_B = 0.75
+SOZCUKSEL_KLASOR_ADI = "bm25"
+
+# Yorumlar İngilizce olduğu için sadece en sık İngilizce dolgu kelimelerini atıyorum.
+DURAK_KELIMELERI = frozenset("""
+a an and are as at be been but by for from had has have i in is it its my of on or our so that the
+their there they this to was we were what which with you your me how about any
+""".split())
+TERIM_DESENI = re.compile(r"[a-z0-9]+")
+
+
+def terimlere_ayir(metin):
+    return [terim for terim in TERIM_DESENI.findall(metin.lower()) if terim not in DURAK_KELIMELERI]
+
+
+class SozcukselIndex:
+    def __init__(self, terimler, posting_ofset, posting_dokuman, posting_frekans, dokuman_uzunluk):
+        self.terim_idleri = {terim: i for i, terim in enumerate(terimler)}
+        self.posting_ofset = posting_ofset
+        self.posting_dokuman = posting_dokuman
+        self.posting_frekans = posting_frekans
+        self.dokuman_uzunluk = dokuman_uzunluk
+
+    @classmethod
+    def olustur(cls, metinler):
+        # Satırları sırayla dolaştığım için her terimin posting listesi kendiliğinden artan sıralı oluyor.
+        postingler = {}
+        uzunluklar = array("i")
+        for satir, metin in enumerate(metinler):
+            sayac = Counter(terimlere_ayir(metin))
+            uzunluklar.append(sum(sayac.values()))
+            for terim, frekans in sayac.items():
+                if terim not in postingler:
+                    postingler[terim] = (array("i"), array("H"))
+                dokumanlar, frekanslar = postingler[terim]
+                dokumanlar.append(satir)
+                frekanslar.append(min(frekans, 65535))
+
+        terimler = sorted(postingler)
+        posting_ofset = np.zeros(len(terimler) + 1, dtype=np.int64)
+        np.cumsum([len(postingler[t][0]) for t in terimler], out=posting_ofset[1:])
+        posting_dokuman = np.concatenate([np.frombuffer(postingler[t][0], dtype=np.int32) for t in terimler]) \
+            if terimler else np.zeros(0, dtype=np.int32)
+        posting_frekans = np.concatenate([np.frombuffer(postingler[t][1], dtype=np.uint16) for t in terimler]) \
+            if terimler else np.zeros(0, dtype=np.uint16)
+        return cls(terimler, posting_ofset, posting_dokuman, posting_frekans, np.frombuffer(uzunluklar, dtype=np.int32))
+
+    def kaydet(self, klasor):
+        klasor = os.path.join(klasor, SOZCUKSEL_KLASOR_ADI)
+        os.makedirs(klasor, exist_ok=True)
+        with open(os.path.join(klasor, "terimler.json"), "w", encoding="utf-8") as f:
+            json.dump(sorted(self.terim_idleri, key=self.terim_idleri.get), f, ensure_ascii=False)
+        np.save(os.path.join(klasor, "posting_ofset.npy"), self.posting_ofset)
+        np.save(os.path.join(klasor, "posting_dokuman.npy"), self.posting_dokuman)
+        np.save(os.path.join(klasor, "posting_frekans.npy"), self.posting_frekans)
+        np.save(os.path.join(klasor, "dokuman_uzunluk.npy"), self.dokuman_uzunluk)
+
+    @classmethod
+    def yukle(cls, klasor):
+        # Index klasöründe sözcüksel index yoksa None döner (eski indexler için).
+        klasor = os.path.join(klasor, SOZCUKSEL_KLASOR_ADI)
+        try:
+            with open(os.path.join(klasor, "terimler.json"), encoding="utf-8") as f:
+                terimler = json.load(f)
+        except FileNotFoundError:
+            return None
+        yukle = lambda ad: np.load(os.path.join(klasor, ad), mmap_mode="r")
+        return cls(terimler, yukle("posting_ofset.npy"), yukle("posting_dokuman.npy"),
+                   yukle("posting_frekans.npy"), yukle("dokuman_uzunluk.npy"))
+
+    def isindir(self):
+        # mmap ile açılan dizileri bir kere baştan sona okuyup sayfa önbelleğine getirir.
+        for dizi in (self.posting_ofset, self.posting_dokuman, self.posting_frekans, self.dokuman_uzunluk):
+            int(np.asarray(dizi).sum())
+
+    def ara(self, sorgu_metni, k, araliklar):
+        # araliklar: aranacak satır aralıkları [(baslangic, bitis), ...]; None ise tüm satırlar.
+        # IDF ve ortalama yorum uzunluğu sadece bu aralıklardaki yorumlardan hesaplanır;
+        # böylece her havayolu kendi yorumları içinde puanlanır.
+        if araliklar is None:
+            araliklar = [(0, len(self.dokuman_uzunluk))]
+        toplam_dokuman = sum(bitis - baslangic for baslangic, bitis in araliklar)
+        if toplam_dokuman == 0:
+            return []
+        ortalama_uzunluk = sum(int(self.dokuman_uzunluk[b:s].sum()) for b, s in araliklar) / toplam_dokuman or 1.0
+
+        satir_parcalari, puan_parcalari = [], []
+        for terim in set(terimlere_ayir(sorgu_metni)):
+            terim_id = self.terim_idleri.get(terim)
+            if terim_id is None:
+                continue
+            dokumanlar = self.posting_dokuman[self.posting_ofset[terim_id]:self.posting_ofset[terim_id + 1]]
+            frekanslar = self.posting_frekans[self.posting_ofset[terim_id]:self.posting_ofset[terim_id + 1]]
+            # Postingler sıralı olduğu için her aralığın başı ve sonu ikili aramayla bulunuyor.
+            secilen_dokumanlar, secilen_frekanslar = [], []
+            for baslangic, bitis in araliklar:
+                i, j = np.searchsorted(dokumanlar, [baslangic, bitis])
+                secilen_dokumanlar.append(dokumanlar[i:j])
+                secilen_frekanslar.append(frekanslar[i:j])
+            dokumanlar = np.concatenate(secilen_dokumanlar)
+            if len(dokumanlar) == 0:
+                continue
+            tf = np.concatenate(secilen_frekanslar).astype(np.float32)
+            idf = np.log(1.0 + (toplam_dokuman - len(dokumanlar) + 0.5) / (len(dokumanlar) + 0.5))
+            uzunluk = self.dokuman_uzunluk[dokumanlar]
+            puan = idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * uzunluk / ortalama_uzunluk))
+            satir_parcalari.append(dokumanlar)
+            puan_parcalari.append(puan)
+
+        if not satir_parcalari:
+            return []
+        satirlar, ters = np.unique(np.concatenate(satir_parcalari), return_inverse=True)
+        puanlar = np.zeros(len(satirlar), dtype=np.float32)
+        np.add.at(puanlar, ters, np.concatenate(puan_parcalari))
+        en_iyiler = np.argsort(-puanlar, kind="stable")[:k]
+        return [(int(satirlar[i]), float(puanlar[i])) for i in en_iyiler]
+
+
+def rrf_birlestir(siralamalar, k=60):
+    # Reciprocal Rank Fusion: her listede r. sırada olan satır 1 / (k + r) puan alır,
+    # puanlar toplanır. Puan ölçekleri farklı (L2 mesafesi vs. BM25) listeleri birleştirmek için sadece sıra kullanılır.
+    puanlar = {}
+    for siralama in siralamalar:
+        for sira, satir in enumerate(siralama, start=1):
+            puanlar[satir] = puanlar.get(satir, 0.0) + 1.0 / (k + sira)
+    return sorted(puanlar, key=lambda satir: -puanlar[satir])
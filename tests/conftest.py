@@ -0,0 +1,7 @@
+# --- Gerekli Kütüphaneler ---
+# Testler depo kökündeki modülleri doğrudan içeri aktarır; pytest hangi klasörden çalıştırılırsa
+# çalıştırılsın kök klasör import yoluna ekleniyor. Testler Google servislerine gitmez, sahte modeller kullanır.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,185 @@
+# --- Gerekli Kütüphaneler ---
+# HTTP API testleri: sahte bir motorla /airlines, /ask (JSON ve akışlı), bilinmeyen havayolu (404),
+# eşzamanlılık sınırı dolunca 503 ve akış bitince / istemci yarıda kopunca istek yerinin bırakılması.
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.documents import Document
+
+import api_sunucusu
+from yorum_deposu import YorumDeposu
+
+
+class SahteMotor:
+    # chatbot_engine'in API'nin kullandığı kısmını taklit eder. 'bekle' verilirse sorgu hazırlığı
+    # bu olay gelene kadar bekler; 'akis_devam' verilirse akış ilk parçadan sonra onu bekler.
+
+    def __init__(self, bekle=None, akis_devam=None):
+        self.depo = YorumDeposu.bellekten(["Pegasus", "Turkish Airlines"], ["good seats", "tasty food"])
+        self.bekle = bekle
+        self.akis_devam = akis_devam
+        self.hazirlanan = threading.Event()
+        self.akis_kapandi = threading.Event()
+        self.sorular = []
+
+    def baslat(self, embeddings_modeli=None, dil_modeli=None):
+        pass
+
+    def guncel_yorum_deposu(self):
+        return self.depo
+
+    def sorguyu_hazirla(self, soru, havayollari):
+        self.sorular.append((soru, havayollari))
+        self.hazirlanan.set()
+        if self.bekle is not None:
+            self.bekle.wait(5)
+        kanit = Document(page_content="tasty food", metadata={"Airline Name": "Turkish Airlines"})
+        return SimpleNamespace(relevant_docs=[kanit], orjinal_dil="en", olcumler={"arama_sn": 0.0})
+
+    def cevap_akisi(self, hazirlik):
+        try:
+            yield "Food "
+            if self.akis_devam is not None:
+                self.akis_devam.wait(5)
+            yield "is tasty."
+        finally:
+            self.akis_kapandi.set()
+
+
+@pytest.fixture
+def istemci_olustur():
+    acilanlar = []
+
+    def olustur(motor):
+        istemci = TestClient(api_sunucusu.uygulama_olustur(motor=motor))
+        istemci.__enter__()
+        acilanlar.append(istemci)
+        return istemci
+
+    yield olustur
+    for istemci in acilanlar:
+        istemci.__exit__(None, None, None)
+
+
+def test_havayollari_listesi(istemci_olustur):
+    istemci = istemci_olustur(SahteMotor())
+    cevap = istemci.get("/airlines")
+    assert cevap.status_code == 200
+    assert cevap.json() == {"havayollari": [{"ad": "Pegasus", "yorum_sayisi": 1},
+                                            {"ad": "Turkish Airlines", "yorum_sayisi": 1}]}
+
+
+def test_soru_json_cevap(istemci_olustur):
+    motor = SahteMotor()
+    istemci = istemci_olustur(motor)
+    cevap = istemci.post("/ask", json={"soru": "How is the food?", "havayolu": "Turkish Airlines"})
+
+    assert cevap.status_code == 200
+    govde = cevap.json()
+    assert govde["cevap"] == "Food is tasty."
+    assert govde["dil"] == "en"
+    assert govde["kanitlar"] == [{"havayolu": "Turkish Airlines", "metin": "tasty food"}]
+    assert motor.sorular == [("How is the food?", ["Turkish Airlines"])]
+    assert istemci.app.state.sinir.icerideki == 0
+
+
+def test_soru_akisli_cevap_yeri_birakir(istemci_olustur):
+    motor = SahteMotor()
+    istemci = istemci_olustur(motor)
+    with istemci.stream("POST", "/ask", json={"soru": "How is the food?", "havayolu": None, "akis": True}) as cevap:
+        assert cevap.status_code == 200
+        assert cevap.headers["content-type"].startswith("text/plain")
+        metin = "".join(cevap.iter_text())
+
+    assert metin == "Food is tasty."
+    assert motor.sorular == [("How is the food?", None)]
+    assert motor.akis_kapandi.wait(2)
+    assert istemci.app.state.sinir.icerideki == 0
+
+
+@pytest.mark.parametrize("havayolu", ["Bilinmeyen Hava", ["Pegasus", "Bilinmeyen Hava"]])
+def test_bilinmeyen_havayolu_404(istemci_olustur, havayolu):
+    motor = SahteMotor()
+    istemci = istemci_olustur(motor)
+    cevap = istemci.post("/ask", json={"soru": "How is the food?", "havayolu": havayolu})
+
+    assert cevap.status_code == 404
+    assert "Bilinmeyen Hava" in cevap.json()["detail"]
+    assert motor.sorular == []
+
+
+def test_bos_soru_422(istemci_olustur):
+    cevap = istemci_olustur(SahteMotor()).post("/ask", json={"soru": "  "})
+    assert cevap.status_code == 422
+
+
+def test_eszamanlilik_siniri_dolunca_503(istemci_olustur, monkeypatch):
+    monkeypatch.setattr(api_sunucusu, "MAKS_ESZAMANLI_ISTEK", 1)
+    monkeypatch.setattr(api_sunucusu, "MAKS_BEKLEYEN_ISTEK", 0)
+    bekle = threading.Event()
+    motor = SahteMotor(bekle=bekle)
+    istemci = istemci_olustur(motor)
+
+    ilk_cevap = {}
+    ilk = threading.Thread(target=lambda: ilk_cevap.update(
+        cevap=istemci.post("/ask", json={"soru": "How is the food?"})))
+    ilk.start()
+    try:
+        assert motor.hazirlanan.wait(5)
+        ikinci = istemci.post("/ask", json={"soru": "How are the seats?"})
+        assert ikinci.status_code == 503
+        assert ikinci.headers["retry-after"] == str(api_sunucusu.YENIDEN_DENE_SN)
+    finally:
+        bekle.set()
+        ilk.join(5)
+
+    assert ilk_cevap["cevap"].status_code == 200
+    assert istemci.app.state.sinir.icerideki == 0
+    # Yer bırakıldıktan sonra yeni istekler tekrar kabul edilir.
+    assert istemci.post("/ask", json={"soru": "How are the seats?"}).status_code == 200
+
+
+def test_istemci_akisi_yarida_birakinca_yer_birakilir(istemci_olustur):
+    # İstemci ilk parçayı aldıktan sonra bağlantıyı keser; bu sırada motor bir sonraki parçayı üretiyordur.
+    akis_devam = threading.Event()
+    motor = SahteMotor(akis_devam=akis_devam)
+    istemci = istemci_olustur(motor)
+    app = istemci.app
+
+    async def yarida_kes():
+        gonderilenler = []
+        istek_okundu = []
+
+        async def receive():
+            # İstek gövdesi bir kez verilir; sonraki çağrılar ilk parça gönderilene kadar bekleyip kopar.
+            if not istek_okundu:
+                istek_okundu.append(True)
+                return {"type": "http.request", "body": b'{"soru": "How is the food?", "akis": true}',
+                        "more_body": False}
+            while not any(mesaj.get("body") for mesaj in gonderilenler):
+                await asyncio.sleep(0.01)
+            return {"type": "http.disconnect"}
+
+        async def send(mesaj):
+            gonderilenler.append(mesaj)
+
+        scope = {"type": "http", "asgi": {"version": "3.0", "spec_version": "2.3"}, "http_version": "1.1",
+                 "method": "POST", "scheme": "http", "path": "/ask", "raw_path": b"/ask", "query_string": b"",
+                 "root_path": "", "headers": [(b"content-type", b"application/json")],
+                 "client": ("test", 1), "server": ("test", 80)}
+        await app(scope, receive, send)
+        return [mesaj.get("body") for mesaj in gonderilenler if mesaj.get("body")]
+
+    try:
+        parcalar = istemci.portal.call(yarida_kes)
+        assert parcalar == [b"Food "]
+        # Yer, motorun çalışmakta olan next() çağrısı bitmeden bırakılır.
+        assert app.state.sinir.icerideki == 0
+        assert not motor.akis_kapandi.is_set()
+    finally:
+        akis_devam.set()
+    # Çalışan next() bitince generator kapatılır (izleme kaydı yazılır).
+    assert motor.akis_kapandi.wait(5)
@@ -0,0 +1,65 @@
+# --- Gerekli Kütüphaneler ---
+# Cevap önbelleği testleri: aynı dosyayı farklı veri sürümleriyle kullanan süreçlerin birbirinin
+# kayıtlarını silmemesi, kullanılmayan eski sürümlerin ise TTL dolunca silinmesi. Zaman, önbelleğe
+# verilen sahte bir saatle ilerletiliyor.
+import numpy as np
+
+from cevap_onbellegi import CevapOnbellegi
+
+VEKTOR = np.ones(4, dtype=np.float32)
+KANITLAR = [{"Airline Name": "Pegasus", "page_content": "tasty food"}]
+
+
+class SahteSaat:
+    def __init__(self, simdi=1_000_000.0):
+        self.simdi = simdi
+
+    def __call__(self):
+        return self.simdi
+
+
+def test_farkli_surumdeki_surecler_birbirinin_kayitlarini_silmez(tmp_path):
+    yol = str(tmp_path / "cevaplar.sqlite")
+    eski_surec, yeni_surec = CevapOnbellegi(yol), CevapOnbellegi(yol)
+    eski_surec.ekle("Pegasus", "en", "How is the food?", VEKTOR, "eski cevap", KANITLAR, "v1")
+    yeni_surec.ekle("Pegasus", "en", "How is the food?", VEKTOR, "yeni cevap", KANITLAR, "v2")
+
+    # Her süreç sadece kendi sürümünün cevabını görür.
+    assert eski_surec.tam_eslesme("Pegasus", "How is the food?", "v1") == ("eski cevap", KANITLAR, "en")
+    assert yeni_surec.tam_eslesme("Pegasus", "How is the food?", "v2") == ("yeni cevap", KANITLAR, "en")
+    assert yeni_surec.benzer_bul("Pegasus", "en", VEKTOR, "v2") == ("yeni cevap", KANITLAR, "en")
+    assert eski_surec.benzer_bul("Pegasus", "en", VEKTOR, "v1") == ("eski cevap", KANITLAR, "en")
+    assert yeni_surec.kayit_sayisi("v1") == 1
+
+
+def test_kullanilmayan_eski_surum_ttl_dolunca_silinir(tmp_path):
+    yol = str(tmp_path / "cevaplar.sqlite")
+    saat = SahteSaat()
+    onbellek = CevapOnbellegi(yol, ttl_sn=3600, saat=saat)
+    onbellek.ekle("Pegasus", "en", "How is the food?", VEKTOR, "eski cevap", KANITLAR, "v1")
+
+    # TTL dolmadan yeni sürümü kullanan bir süreç açılırsa eski kayıt kalır.
+    saat.simdi += 1800
+    assert CevapOnbellegi(yol, ttl_sn=3600, saat=saat).tam_eslesme("Pegasus", "How is the food?", "v2") is None
+    assert onbellek.kayit_sayisi("v1") == 1
+
+    # TTL boyunca kullanılmamış eski kayıt, yeni sürümü kullanan bir süreç açılınca silinir.
+    saat.simdi += 3600
+    yeni_surec = CevapOnbellegi(yol, ttl_sn=3600, saat=saat)
+    assert yeni_surec.tam_eslesme("Pegasus", "How is the food?", "v2") is None
+    assert yeni_surec.kayit_sayisi("v1") == 0
+
+
+def test_birebir_eslesme_sorunun_dilini_dondurur(tmp_path):
+    onbellek = CevapOnbellegi(str(tmp_path / "cevaplar.sqlite"))
+    onbellek.ekle("Pegasus", "tr", "Yemekler nasıl?", VEKTOR, "Lezzetli.", KANITLAR, "v1")
+    assert onbellek.tam_eslesme("Pegasus", "yemekler nasıl", "v1") == ("Lezzetli.", KANITLAR, "tr")
+
+
+def test_suresi_dolan_cevap_kullanilmaz(tmp_path):
+    saat = SahteSaat()
+    onbellek = CevapOnbellegi(str(tmp_path / "cevaplar.sqlite"), ttl_sn=60, saat=saat)
+    onbellek.ekle("Pegasus", "en", "How is the food?", VEKTOR, "cevap", KANITLAR, "v1")
+    saat.simdi += 61
+    assert onbellek.tam_eslesme("Pegasus", "How is the food?", "v1") is None
+    assert onbellek.benzer_bul("Pegasus", "en", VEKTOR, "v1") is None
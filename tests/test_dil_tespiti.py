@@ -0,0 +1,205 @@
+# --- Gerekli Kütüphaneler ---
+# Dil tespiti testleri: Türkçe harfli ve harfsiz yazılmış Türkçe sorular, İngilizce, karışık ve çok kısa
+# metinler. Ayrıca motorun tespit edilen dile göre çeviri yolunu (_sorguyu_hazirla) doğru seçtiği,
+# sahte embedding ve sahte çeviri katmanıyla kontrol edilir.
+from concurrent.futures import Future
+
+import pytest
+
+import chatbot_engine
+import dil_tespiti
+from dil_tespiti import dil_tespit_et
+from index_deposu import YorumIndexi
+from sahte_modeller import SahteEmbeddings
+
+
+@pytest.mark.parametrize("metin", [
+    "Türk Hava Yolları'nın yemekleri nasıl?",
+    "Koltuklar rahat mıydı?",
+    "Personel yolculara nasıl davrandı?",
+    "Bagajım kayboldu, ne yapmalıyım?",
+    "İYİ Mİ",
+])
+def test_turkce_harfli(metin):
+    assert dil_tespit_et(metin) == ("tr", "hizli")
+
+
+@pytest.mark.parametrize("metin", [
+    "Turk Hava Yollarinin yemekleri nasil?",
+    "koltuklar rahat miydi",
+    "personel yolculara nasil davrandi",
+    "ucuslarda rotar oluyor mu",
+])
+def test_turkce_harfsiz(metin):
+    assert dil_tespit_et(metin) == ("tr", "hizli")
+
+
+@pytest.mark.parametrize("metin", [
+    "How is the food on Turkish Airlines?",
+    "Were the seats comfortable?",
+    "What are the most common complaints?",
+    "Is the wifi worth it?",
+])
+def test_ingilizce(metin):
+    assert dil_tespit_et(metin) == ("en", "hizli")
+
+
+@pytest.mark.parametrize("metin, dil", [
+    ("Pegasus lounge nasıl?", "tr"),
+    ("Emirates'in business class koltukları rahat mı?", "tr"),
+    ("What do passengers say about the yemek?", "en"),
+    ("Is the ikram good on THY?", "en"),
+])
+def test_karisik_metinde_baskin_dil(metin, dil):
+    assert dil_tespit_et(metin)[0] == dil
+
+
+@pytest.mark.parametrize("metin, beklenen", [
+    ("", ("en", "varsayilan")),
+    ("?", ("en", "varsayilan")),
+    ("123", ("en", "varsayilan")),
+    ("nasıl", ("tr", "hizli")),
+    ("iyi mi", ("tr", "hizli")),
+    ("food", ("en", "hizli")),
+    # Büyük "I" zamiri Türkçe "ı" sayılmaz.
+    ("I", ("en", "hizli")),
+])
+def test_cok_kisa_metinler(metin, beklenen):
+    assert dil_tespit_et(metin) == beklenen
+
+
+@pytest.mark.parametrize("metin", ["ok", "wifi?", "THY"])
+def test_emin_olunamayan_kisa_metin_langdetecte_duser(metin, monkeypatch):
+    cagrilar = []
+    monkeypatch.setattr(dil_tespiti, "_langdetect_ile", lambda m: cagrilar.append(m) or ("en", "langdetect"))
+    assert dil_tespit_et(metin) == ("en", "langdetect")
+    assert cagrilar == [metin]
+
+
+def test_ayni_metin_her_zaman_ayni_sonucu_verir():
+    assert len({dil_tespit_et("wifi?") for _ in range(5)}) == 1
+
+
+# --- Sorgu Yönlendirme ---
+class SahteCeviriKatmani:
+    def __init__(self):
+        self.sorular = []
+
+    def cevir(self, soru):
+        self.sorular.append(soru)
+        return "How is the food?", "llm", 0.0
+
+
+class SahteCevapOnbellegi:
+    def tam_eslesme(self, *args):
+        return None
+
+    def benzer_bul(self, *args):
+        return None
+
+
+class SahteIndexOnbellegi:
+    def __init__(self, yorum_indexi):
+        self.yorum_indexi = yorum_indexi
+
+    def getir(self):
+        return self.yorum_indexi
+
+    def veri_surumu(self):
+        return "test"
+
+
+class KayitliEmbeddings(SahteEmbeddings):
+    # Arama için hangi sorunun embedding'e gittiğini kaydeder.
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.sorgular = []
+
+    def embed_query(self, text):
+        self.sorgular.append(text)
+        return super().embed_query(text)
+
+
+@pytest.fixture
+def motor(monkeypatch):
+    embeddings = KayitliEmbeddings(boyut=16)
+    metinler = ["The food was tasty.", "Seats were narrow.", "Crew was friendly.", "Meals were cold."]
+    yorum_indexi = YorumIndexi.olustur(metinler, ["Pegasus"] * len(metinler), SahteEmbeddings(boyut=16))
+    ceviri_katmani = SahteCeviriKatmani()
+    monkeypatch.setattr(chatbot_engine, "embeddings", embeddings)
+    monkeypatch.setattr(chatbot_engine, "index_onbellegi", SahteIndexOnbellegi(yorum_indexi))
+    monkeypatch.setattr(chatbot_engine, "ceviri_katmani", ceviri_katmani)
+    monkeypatch.setattr(chatbot_engine, "cevap_onbellegi", SahteCevapOnbellegi())
+    monkeypatch.setattr(chatbot_engine, "OZET_YONLENDIRME", False)
+    monkeypatch.setattr(chatbot_engine, "COK_DILLI_EMBEDDING", False)
+    return chatbot_engine, embeddings, ceviri_katmani
+
+
+@pytest.mark.parametrize("soru", ["Yemekler nasıl?", "yemekler nasil"])
+def test_turkce_soru_cevrilip_aranir(motor, soru):
+    motor, embeddings, ceviri_katmani = motor
+    hazirlik = motor._sorguyu_hazirla(soru, "Pegasus")
+
+    assert hazirlik.orjinal_dil == "tr"
+    assert hazirlik.olcumler["ceviri_yolu"] == "llm"
+    assert ceviri_katmani.sorular == [soru]
+    assert embeddings.sorgular == ["How is the food?"]
+    assert hazirlik.relevant_docs
+
+
+@pytest.mark.parametrize("soru", ["How is the food?", "wifi?", "?"])
+def test_ingilizce_veya_belirsiz_soru_cevrilmez(motor, soru):
+    motor, embeddings, ceviri_katmani = motor
+    hazirlik = motor._sorguyu_hazirla(soru, "Pegasus")
+
+    assert hazirlik.orjinal_dil == "en"
+    assert hazirlik.olcumler["ceviri_yolu"] == "gerek_yok"
+    assert ceviri_katmani.sorular == []
+    assert embeddings.sorgular == [soru]
+
+
+def test_cok_dilli_embeddingde_turkce_soru_cevrilmez(motor, monkeypatch):
+    motor, embeddings, ceviri_katmani = motor
+    monkeypatch.setattr(motor, "COK_DILLI_EMBEDDING", True)
+    hazirlik = motor._sorguyu_hazirla("Yemekler nasıl?", "Pegasus")
+
+    assert hazirlik.orjinal_dil == "tr"
+    assert hazirlik.olcumler["ceviri_yolu"] == "cok_dilli"
+    assert ceviri_katmani.sorular == []
+    assert embeddings.sorgular == ["Yemekler nasıl?"]
+
+
+class BaslamayanHavuz:
+    # Görevleri çalıştırmadan bekletir; sorgu erken biterse çevirinin iptal edildiği görülebilsin.
+    def __init__(self):
+        self.gorevler = []
+
+    def submit(self, fn, *args):
+        gorev = Future()
+        self.gorevler.append(gorev)
+        return gorev
+
+
+@pytest.mark.parametrize("havayolu, index_var", [(None, False), ("Bilinmeyen", True)])
+def test_erken_biten_sorguda_ceviri_iptal_edilir(motor, monkeypatch, havayolu, index_var):
+    motor, embeddings, ceviri_katmani = motor
+    havuz = BaslamayanHavuz()
+    monkeypatch.setattr(motor, "arka_plan_havuzu", havuz)
+    if not index_var:
+        monkeypatch.setattr(motor, "index_onbellegi", SahteIndexOnbellegi(None))
+    hazirlik = motor._sorguyu_hazirla("Yemekler nasıl?", havayolu)
+
+    assert hazirlik.mesaj
+    assert len(havuz.gorevler) == 1 and havuz.gorevler[0].cancelled()
+    assert embeddings.sorgular == []
+
+
+def test_birebir_onbellek_isabetinde_dil_kayittan_gelir(motor, monkeypatch):
+    motor, embeddings, ceviri_katmani = motor
+    monkeypatch.setattr(motor.cevap_onbellegi, "tam_eslesme",
+                        lambda *args: ("Yemekler lezzetli.", [{"Airline Name": "Pegasus", "page_content": "tasty"}], "tr"))
+    hazirlik = motor._sorguyu_hazirla("Yemekler nasıl?", "Pegasus")
+
+    assert hazirlik.hazir_cevap == "Yemekler lezzetli."
+    assert hazirlik.orjinal_dil == "tr"
+    assert ceviri_katmani.sorular == [] and embeddings.sorgular == []
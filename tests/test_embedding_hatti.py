@@ -0,0 +1,130 @@
+# --- Gerekli Kütüphaneler ---
+# EmbeddingHatti testleri: kota (429) hatalarında geri çekilme, token kovasıyla hız sınırlama ve
+# yarıda kesilen bir CSV çalışmasının checkpoint'ten devam etmesi.
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import embedding_hatti
+from embedding_hatti import EmbeddingHatti, TokenKovasi, kota_hatasi_mi
+from sahte_modeller import SahteEmbeddings, SahteKotaHatasi
+
+
+def _beklenen(metinler, boyut=8):
+    return np.asarray(SahteEmbeddings(boyut=boyut).embed_documents(metinler), dtype=np.float32)
+
+
+@pytest.fixture
+def beklemeler(monkeypatch):
+    # Geri çekilme beklemeleri gerçekten beklenmeden kaydedilir.
+    kayit = []
+    monkeypatch.setattr(embedding_hatti.time, "sleep", kayit.append)
+    return kayit
+
+
+def test_sahte_kota_hatasi_kota_hatasi_sayilir():
+    assert kota_hatasi_mi(SahteKotaHatasi())
+    assert not kota_hatasi_mi(RuntimeError("bağlantı koptu"))
+
+
+def test_kota_hatasinda_tekrar_deneyip_sirayi_korur(beklemeler):
+    metinler = [f"yorum {i}" for i in range(40)]
+    embeddings = SahteEmbeddings(boyut=8, kota_hatasi_her=3)
+    hat = EmbeddingHatti(embeddings, batch_boyutu=4, eszamanlilik=2, istek_hizi=1000, taban_bekleme=0.5)
+
+    vektorler = hat.metinleri_embed_et(metinler)
+
+    np.testing.assert_array_equal(vektorler, _beklenen(metinler))
+    # Her üçüncü çağrı 429 aldı ve tekrar denendi; hat bunları saydı ve her biri için bekledi.
+    assert hat.kota_hatasi_sayisi == embeddings.cagri_sayisi // 3 > 0
+    assert hat.istek_sayisi == embeddings.cagri_sayisi
+    assert len(beklemeler) == hat.kota_hatasi_sayisi
+
+
+def test_kota_hatasi_surerse_ustel_bekleyip_vazgecer(beklemeler):
+    hat = EmbeddingHatti(SahteEmbeddings(boyut=8, kota_hatasi_her=1), batch_boyutu=4, eszamanlilik=1,
+                         istek_hizi=1000, maks_deneme=5, taban_bekleme=1.0, maks_bekleme=5.0)
+
+    with pytest.raises(SahteKotaHatasi):
+        hat.metinleri_embed_et(["tek yorum"])
+
+    # Son denemeden sonra beklenmez; beklemeler 1, 2, 4 sn ve üst sınır (5 sn), her biri en fazla %10 sapmayla.
+    assert len(beklemeler) == 4
+    for bekleme, taban in zip(beklemeler, [1.0, 2.0, 4.0, 5.0]):
+        assert taban <= bekleme <= taban * 1.1
+
+
+def test_kota_hatasi_batch_ve_eszamanliligi_azaltir_basari_geri_artirir():
+    hat = EmbeddingHatti(SahteEmbeddings(boyut=8), batch_boyutu=64, eszamanlilik=8)
+
+    hat._kota_hatasi_bildir()
+    hat._kota_hatasi_bildir()
+    assert (hat.batch_boyutu, hat.eszamanlilik) == (16, 2)
+
+    for _ in range(5):
+        hat._basari_bildir()
+    assert (hat.batch_boyutu, hat.eszamanlilik) == (20, 3)
+    for _ in range(200):
+        hat._basari_bildir()
+    assert (hat.batch_boyutu, hat.eszamanlilik) == (64, 8)
+
+
+def test_token_kovasi_hizi_sinirlar():
+    kova = TokenKovasi(hiz=20, kapasite=1)
+    baslangic = time.monotonic()
+    for _ in range(6):
+        kova.al()
+    # İlk jeton kovada hazır; kalan 5 jeton saniyede 20 hızla dolar.
+    assert time.monotonic() - baslangic >= 5 / 20 * 0.9
+
+
+def test_hat_istekleri_token_kovasiyla_yayar():
+    metinler = [f"yorum {i}" for i in range(15)]
+    embeddings = SahteEmbeddings(boyut=8)
+    hat = EmbeddingHatti(embeddings, batch_boyutu=1, eszamanlilik=4, istek_hizi=10)
+
+    baslangic = time.monotonic()
+    vektorler = hat.metinleri_embed_et(metinler)
+    gecen = time.monotonic() - baslangic
+
+    np.testing.assert_array_equal(vektorler, _beklenen(metinler))
+    assert embeddings.cagri_sayisi == 15
+    # Kova 10 jetonla dolu başlar; kalan 5 istek saniyede 10 hızla gönderilebilir.
+    assert gecen >= 5 / 10 * 0.9
+
+
+@pytest.fixture
+def veri_dosyasi(tmp_path):
+    yol = tmp_path / "yorumlar.csv"
+    pd.DataFrame({"Airline Name": ["A"] * 50, "birlesik_yorum": [f"yorum {i}" for i in range(50)]}).to_csv(yol, index=False)
+    return str(yol)
+
+
+def test_csv_embed_et_kesilince_checkpointten_devam_eder(tmp_path, veri_dosyasi, beklemeler):
+    checkpoint = str(tmp_path / "checkpoint")
+    metinler = [f"yorum {i}" for i in range(50)]
+
+    # Dördüncü parçanın isteği 429 alır ve tekrar deneme hakkı olmadığı için çalışma kesilir.
+    kesilen = EmbeddingHatti(SahteEmbeddings(boyut=8, kota_hatasi_her=4), istek_hizi=1000, maks_deneme=1)
+    with pytest.raises(SahteKotaHatasi):
+        kesilen.csv_embed_et(veri_dosyasi, checkpoint, "ozet-1", parca_boyutu=10)
+
+    embeddings = SahteEmbeddings(boyut=8)
+    vektorler = EmbeddingHatti(embeddings, istek_hizi=1000).csv_embed_et(veri_dosyasi, checkpoint, "ozet-1",
+                                                                          parca_boyutu=10)
+
+    # Biten üç parça diskten okundu, sadece kalan iki parça embedding'e gönderildi.
+    assert embeddings.cagri_sayisi == 2
+    np.testing.assert_array_equal(vektorler, _beklenen(metinler))
+
+
+def test_csv_embed_et_veri_degisince_bastan_baslar(tmp_path, veri_dosyasi):
+    checkpoint = str(tmp_path / "checkpoint")
+    EmbeddingHatti(SahteEmbeddings(boyut=8), istek_hizi=1000).csv_embed_et(veri_dosyasi, checkpoint, "ozet-1",
+                                                                            parca_boyutu=10)
+
+    embeddings = SahteEmbeddings(boyut=8)
+    EmbeddingHatti(embeddings, istek_hizi=1000).csv_embed_et(veri_dosyasi, checkpoint, "ozet-2", parca_boyutu=10)
+    assert embeddings.cagri_sayisi == 5
@@ -0,0 +1,46 @@
+# --- Gerekli Kütüphaneler ---
+# Soruların hazır konu özetlerine yönlendirilmesi (soru_konusu) testleri: uygulamadaki örnek sorular,
+# Türkçe çekimli kelimeler ve normal akışa gitmesi gereken sorular.
+import pytest
+
+from konu_ozetleri import soru_konusu
+
+
+@pytest.mark.parametrize("soru, konu", [
+    # app.py'deki örnek sorular ve soru kutusundaki örnek.
+    ("Yemek servisindeki genel şikayetler nelerdir?", "yemek"),
+    ("Uçak içi eğlence sistemi nasıl?", "eglence"),
+    ("Kabin ekibinin profesyonelliği ve tutumu hakkında bilgi ver.", "personel"),
+    ("Koltuk konforu ve diz mesafesi nasıldı?", "koltuk"),
+])
+def test_uygulamadaki_ornek_sorular_yonlendirilir(soru, konu):
+    assert soru_konusu(soru) == konu
+
+
+@pytest.mark.parametrize("soru, konu", [
+    ("Yemekler hakkındaki yorumlar neler?", "yemek"),
+    ("Rötar konusundaki şikayetler nelerdir?", "gecikme"),
+    ("Koltukların rahatlığı nasıldı?", "koltuk"),
+    ("Uçuşlardaki filmler nasıl?", "eglence"),
+    ("Hosteslerin tutumu kötüydü mü?", "personel"),
+    # Türkçe harfsiz yazılmış çekimli biçimler.
+    ("yemek servisindeki genel sikayetler nelerdir", "yemek"),
+    ("rotar konusundaki sikayetler", "gecikme"),
+    ("How is the food?", "yemek"),
+])
+def test_cekimli_kelimeler_taninir(soru, konu):
+    assert soru_konusu(soru) == konu
+
+
+@pytest.mark.parametrize("soru", [
+    # Konu dışında ayrıntı içeren veya birden fazla konuyu soran sorular normal akışa gider.
+    "Business class koltukları nasıl?",
+    "Yemek ve koltuklar nasıl?",
+    # Türetilmiş kelimeler ("bilgilendirme") ve kısa kelimelerin çekimleri ("geç" -> "geçti") konu sayılmaz.
+    "Gecikmelerde bilgilendirme nasıl?",
+    "Uçuş nasıl geçti?",
+    "Is there wifi in seattle flights?",
+    "",
+])
+def test_konu_disi_sorular_yonlendirilmez(soru):
+    assert soru_konusu(soru) is None
@@ -0,0 +1,67 @@
+# --- Gerekli Kütüphaneler ---
+# Parçalı index testleri: işçi süreçlerde açık tutulan parça dosyalarının sınırlı kalması ve tüm havayollarında
+# aramada global indexte sadece parçalanmamış satırların aranması.
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import faiss
+import pytest
+
+import parcali_index
+from index_deposu import YorumIndexi
+
+
+def _index_yaz(yol, satir_sayisi=4, boyut=4):
+    index = faiss.IndexFlatL2(boyut)
+    index.add(np.random.default_rng(0).standard_normal((satir_sayisi, boyut)).astype(np.float32))
+    faiss.write_index(index, yol)
+    return yol
+
+
+@pytest.fixture(autouse=True)
+def bos_onbellek(monkeypatch):
+    monkeypatch.setattr(parcali_index, "_acik_indexler", parcali_index.OrderedDict())
+
+
+def test_ayni_yolun_yeni_surumu_eskisini_kapatir(tmp_path):
+    yol = _index_yaz(str(tmp_path / "p00000.faiss"))
+    eski = parcali_index._index_ac(yol, "s1")
+    assert parcali_index._index_ac(yol, "s1") is eski
+
+    yeni = parcali_index._index_ac(yol, "s2")
+    assert yeni is not eski
+    assert list(parcali_index._acik_indexler) == [(yol, "s2")]
+
+
+def test_acik_index_sayisi_sinirli(tmp_path, monkeypatch):
+    monkeypatch.setattr(parcali_index, "PARCA_ACIK_INDEX_SINIRI", 3)
+    yollar = [_index_yaz(str(tmp_path / f"p{i:05d}.faiss")) for i in range(5)]
+    for yol in yollar[:3]:
+        parcali_index._index_ac(yol, "s1")
+    # En son kullanılan en sona geçer; sınır aşılınca en uzun süredir kullanılmayanlar atılır.
+    parcali_index._index_ac(yollar[0], "s1")
+    for yol in yollar[3:]:
+        parcali_index._index_ac(yol, "s1")
+
+    assert [os.path.basename(yol) for yol, _ in parcali_index._acik_indexler] == \
+        ["p00000.faiss", "p00003.faiss", "p00004.faiss"]
+
+
+def test_tum_havayollarinda_parcasiz_satirlar_aranir():
+    adlar = ["A"] * 30 + ["B"] * 5 + ["C"] * 40 + ["D"] * 6
+    vektorler = np.random.default_rng(1).standard_normal((len(adlar), 8)).astype(np.float32)
+    yorum_indexi = YorumIndexi.vektorlerden_olustur(vektorler, [f"yorum {i}" for i in range(len(adlar))], adlar)
+    # Sadece hangi havayollarının parçalı olduğu gerekiyor; parçalarda arama bu testte yapılmıyor.
+    yorum_indexi.parcali = SimpleNamespace(havayolu_parcalari={"A": [0, 1], "C": [2, 3]})
+
+    secici = yorum_indexi._parcasiz_secici()
+    assert yorum_indexi._parcasiz_secici() is secici
+    parcasiz = {satir for ad in ("B", "D") for satir in range(*yorum_indexi.araliklar[ad])}
+    assert {satir for satir in range(len(adlar)) if secici.is_member(satir)} == parcasiz
+
+    x = vektorler[:1] + 0.01
+    sonuclar = yorum_indexi._global_ara(x, 4, secici=secici)
+    beklenen = yorum_indexi._global_ara(x, 4, ["B", "D"])
+    assert sonuclar == beklenen
+    assert {satir for _, satir in sonuclar} <= parcasiz
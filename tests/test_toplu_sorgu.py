@@ -0,0 +1,40 @@
+# --- Gerekli Kütüphaneler ---
+# Toplu sorgu (get_responses_batch) testleri: hatalı satırlar sadece kendi sonucuna yazılır ve
+# havayolu gruplarının geçici indexleri, grubun son satırı hata verse de grup bitince bırakılır.
+from types import SimpleNamespace
+
+import pytest
+
+import chatbot_engine
+
+
+@pytest.fixture
+def toplu(monkeypatch):
+    # Hazırlığı sahtesiyle değiştirir; her çağrıda bellekte tutulan geçici index sayısı kaydedilir.
+    gozlemler = {"gecici_index_sayilari": [], "gecici_indexler": None}
+
+    def sahte_hazirla(soru, havayolu_adi, sorgu_vektorleri=None, gecici_indexler=None):
+        grup = chatbot_engine.havayolu_anahtari(chatbot_engine.havayolu_listesi(havayolu_adi))
+        gecici_indexler.setdefault(grup, object())
+        gozlemler["gecici_indexler"] = gecici_indexler
+        gozlemler["gecici_index_sayilari"].append(len(gecici_indexler))
+        if soru.startswith("hata"):
+            raise RuntimeError("hazırlık başarısız")
+        return chatbot_engine.SorguHazirligi(soru, "en", mesaj=f"cevap: {soru}")
+
+    monkeypatch.setattr(chatbot_engine, "baslat", lambda *args: None)
+    monkeypatch.setattr(chatbot_engine, "_toplu_sorgu_vektorleri", lambda sorular: {})
+    monkeypatch.setattr(chatbot_engine, "sorguyu_hazirla", sahte_hazirla)
+    monkeypatch.setattr(chatbot_engine, "index_onbellegi", SimpleNamespace(yorum_deposu=lambda: None))
+    return gozlemler
+
+
+def test_grubun_son_satiri_hata_verse_de_gecici_index_birakilir(toplu):
+    satirlar = [("soru 1", "A"), ("hata 2", "A"), ("soru 3", "B"), ("hata 4", "B"), ("soru 5", "C")]
+    sonuclar = dict(chatbot_engine.get_responses_batch(satirlar, eszamanlilik=2))
+
+    assert max(toplu["gecici_index_sayilari"]) == 1
+    assert toplu["gecici_indexler"] == {}
+    assert [sonuclar[i]["durum"] for i in range(len(satirlar))] == ["mesaj", "hata", "mesaj", "hata", "mesaj"]
+    assert "hazırlık başarısız" in sonuclar[1]["hata"]
+    assert sonuclar[4]["cevap"] == "cevap: soru 5"
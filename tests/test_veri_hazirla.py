@@ -0,0 +1,76 @@
+# --- Gerekli Kütüphaneler ---
+# Veri hazırlamadaki tekrar ayıklama testleri: parça içindeki ve parçalar arasındaki tekrarlar atılır,
+# ilk geçen satır ve satır sırası korunur; kimlik sütunu varsa tekrar kimliğe göre belirlenir.
+import importlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+veri_hazirla = importlib.import_module("veri_hazırla")
+
+
+def _parca(havayollari, yorumlar, kimlikler=None):
+    df = pd.DataFrame({"Airline Name": havayollari, "birlesik_yorum": yorumlar})
+    if kimlikler is not None:
+        df[veri_hazirla.ID_SUTUNU] = kimlikler
+    return df
+
+
+def _bos_ozetler():
+    return np.zeros(0, dtype=np.uint64)
+
+
+def _satir_satir_ayikla(parcalar, sutunlar):
+    # Karşılaştırma için en basit hali: her satır sırayla görülenler kümesine bakılarak seçilir.
+    gorulen, secilenler = set(), []
+    for df in parcalar:
+        for satir in df[sutunlar].itertuples(index=False):
+            if tuple(satir) not in gorulen:
+                gorulen.add(tuple(satir))
+                secilenler.append(tuple(satir))
+    return secilenler
+
+
+def test_parca_icindeki_tekrarlardan_ilki_kalir():
+    df = _parca(["A", "B", "A", "A", "B"], ["x", "x", "y", "x", "x"])
+    df.index = [10, 11, 12, 13, 14]
+    sonuc, gorulen = veri_hazirla.tekrarlari_ayikla(df, _bos_ozetler())
+    assert sonuc.index.tolist() == [10, 11, 12]
+    assert len(gorulen) == 3
+
+
+def test_parcalar_arasi_tekrarlar_atilir():
+    ilk, gorulen = veri_hazirla.tekrarlari_ayikla(_parca(["A", "B"], ["x", "y"]), _bos_ozetler())
+    ikinci, gorulen = veri_hazirla.tekrarlari_ayikla(_parca(["B", "A", "A", "C"], ["y", "z", "x", "y"]), gorulen)
+    assert ilk["birlesik_yorum"].tolist() == ["x", "y"]
+    assert list(zip(ikinci["Airline Name"], ikinci["birlesik_yorum"])) == [("A", "z"), ("C", "y")]
+    # Görülen özetler sıralı ve tekrarsız bir np.uint64 dizisinde tutulur.
+    assert gorulen.dtype == np.uint64 and len(gorulen) == 4
+    assert np.all(np.diff(gorulen) > 0)
+
+
+def test_kimlik_sutunu_varsa_tekrar_kimlige_gore():
+    ilk, gorulen = veri_hazirla.tekrarlari_ayikla(_parca(["A", "A"], ["x", "x"], ["1", "2"]), _bos_ozetler())
+    ikinci, gorulen = veri_hazirla.tekrarlari_ayikla(_parca(["A", "A"], ["degisti", "y"], ["1", "3"]), gorulen)
+    assert ilk[veri_hazirla.ID_SUTUNU].tolist() == ["1", "2"]
+    assert ikinci[veri_hazirla.ID_SUTUNU].tolist() == ["3"]
+
+
+def test_bos_parca():
+    sonuc, gorulen = veri_hazirla.tekrarlari_ayikla(_parca([], []), _bos_ozetler())
+    assert sonuc.empty and len(gorulen) == 0
+
+
+@pytest.mark.parametrize("tohum", [0, 1, 2])
+def test_rastgele_parcalarda_satir_satir_ayiklamayla_ayni(tohum):
+    rng = np.random.default_rng(tohum)
+    parcalar = [_parca(rng.choice(["A", "B", "C"], 200).tolist(), rng.integers(0, 60, 200).astype(str).tolist())
+                for _ in range(5)]
+    gorulen, secilenler = _bos_ozetler(), []
+    for df in parcalar:
+        secilen, gorulen = veri_hazirla.tekrarlari_ayikla(df, gorulen)
+        secilenler.append(secilen)
+    sonuc = pd.concat(secilenler)
+    assert list(zip(sonuc["Airline Name"], sonuc["birlesik_yorum"])) == \
+        _satir_satir_ayikla(parcalar, ["Airline Name", "birlesik_yorum"])
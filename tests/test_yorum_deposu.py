@@ -0,0 +1,127 @@
+# --- Gerekli Kütüphaneler ---
+# Yorum deposunda kanıtların satırını bulma testleri (satir_bul), toplu sorgu çıktısındaki kanıt satırlarının
+# index satırı değil depo satırı olduğunun kontrolü ve deponun sürüm klasörleriyle atomik yayınlanması.
+import os
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import chatbot_engine
+import yorum_deposu
+from yorum_deposu import YorumDeposu, YorumDeposuYazici, meta_oku, yorum_deposu_yaz
+
+HAVAYOLLARI = ["Pegasus", "AJet", "Pegasus", "AJet", "Pegasus"]
+METINLER = ["Seats were narrow.", "Food was good.", "Food was good.", "Crew was friendly.", "good."]
+
+
+@pytest.fixture(params=["bellek", "disk"])
+def depo(request, tmp_path):
+    depo = YorumDeposu.bellekten(HAVAYOLLARI, METINLER)
+    if request.param == "disk":
+        depo.kaydet(str(tmp_path))
+        depo = YorumDeposu.yukle(str(tmp_path))
+    return depo
+
+
+def test_her_yorum_kendi_satirinda_bulunur(depo):
+    for satir in range(len(depo)):
+        assert depo.satir_bul(depo.havayolu(satir), depo.metin(satir)) == satir
+
+
+def test_ayni_metin_dogru_havayolunda_aranir(depo):
+    pegasus = depo.satir_bul("Pegasus", "Food was good.")
+    ajet = depo.satir_bul("AJet", "Food was good.")
+    assert pegasus != ajet
+    assert depo.havayolu(pegasus) == "Pegasus" and depo.havayolu(ajet) == "AJet"
+
+
+@pytest.mark.parametrize("havayolu, metin", [
+    # Başka bir yorumun parçası olan metin tek başına bir yorum değildir.
+    ("AJet", "Food"),
+    ("Pegasus", "Seats were narrow"),
+    ("Pegasus", "Crew was friendly."),
+    ("Bilinmeyen", "good."),
+])
+def test_olmayan_yorum_bulunmaz(depo, havayolu, metin):
+    assert depo.satir_bul(havayolu, metin) is None
+
+
+def test_alt_dize_eslesmesinden_sonra_tam_yorum_bulunur(depo):
+    # "good." önce "Food was good." yorumunun sonunda eşleşir; arama orada bitmeyip kendi satırına devam etmeli.
+    satir = depo.satir_bul("Pegasus", "good.")
+    assert depo.metin(satir) == "good."
+
+
+def test_toplu_sonuctaki_kanit_satirlari_depo_satirlaridir(depo, monkeypatch):
+    monkeypatch.setattr(chatbot_engine, "index_onbellegi", SimpleNamespace(yorum_deposu=lambda: depo))
+    # Index satırları (ör. ek bölümündeki satırlar) depo satırlarından farklıdır.
+    kanitlar = [SimpleNamespace(page_content="Crew was friendly.", metadata={"Airline Name": "AJet", "satir": 917}),
+                SimpleNamespace(page_content="Silinmiş yorum", metadata={"Airline Name": "AJet", "satir": 3})]
+
+    satirlar = chatbot_engine._kanit_satirlari(kanitlar)
+
+    assert satirlar[1] is None
+    assert depo.metin(satirlar[0]) == "Crew was friendly." and depo.havayolu(satirlar[0]) == "AJet"
+
+
+# --- Sürümlü Yazım ---
+def _surumler(klasor):
+    return sorted(os.listdir(os.path.join(klasor, yorum_deposu.SURUM_KLASOR_ADI)))
+
+
+def test_yeni_yazim_eski_metayla_acilan_depoyu_bozmaz(tmp_path):
+    klasor = str(tmp_path)
+    yorum_deposu_yaz(klasor, ["A", "B"], ["eski a", "eski b"])
+    eski_meta = meta_oku(klasor)
+    eski = YorumDeposu.yukle(klasor)
+
+    yorum_deposu_yaz(klasor, ["A", "A", "B"], ["yeni a1", "yeni a2", "yeni b"])
+
+    # Yayından önce meta'sını okumuş bir süreç aynı sürümün dosyalarını eksiksiz açar.
+    assert YorumDeposu.yukle(klasor, eski_meta).metinler() == ["eski a", "eski b"]
+    assert eski.metinler() == ["eski a", "eski b"]
+    yeni = YorumDeposu.yukle(klasor)
+    assert yeni.metinler() == ["yeni a1", "yeni a2", "yeni b"]
+    assert yeni.aralik("B") == (2, 3)
+
+
+def test_eski_surumler_temizlenir(tmp_path):
+    klasor = str(tmp_path)
+    for i in range(4):
+        yorum_deposu_yaz(klasor, ["A"], [f"yorum {i}"])
+    surumler = _surumler(klasor)
+    assert len(surumler) == 1 + yorum_deposu.SAKLANAN_ESKI_SURUM
+    assert meta_oku(klasor)["surum"] == surumler[-1]
+
+
+def test_eski_duzendeki_depo_okunur_ve_tasinir(tmp_path):
+    klasor = str(tmp_path)
+    yorum_deposu_yaz(klasor, ["A", "B"], ["a", "b"])
+    # Sürüm bilgisi olmayan eski düzen: dosyalar doğrudan klasörde.
+    surum_klasoru = os.path.join(klasor, yorum_deposu.SURUM_KLASOR_ADI, meta_oku(klasor)["surum"])
+    for ad in yorum_deposu.VERI_DOSYALARI:
+        os.replace(os.path.join(surum_klasoru, ad), os.path.join(klasor, ad))
+    meta = meta_oku(klasor)
+    del meta["surum"]
+    with open(os.path.join(klasor, yorum_deposu.META_DOSYASI), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    assert YorumDeposu.yukle(klasor).metinler() == ["a", "b"]
+
+    yorum_deposu_yaz(klasor, ["A"], ["yeni"])
+    # İlk yayında kökteki dosyalar eski meta'yı okumuş süreçler için bırakılır, bir sonrakinde silinir.
+    assert all(os.path.exists(os.path.join(klasor, ad)) for ad in yorum_deposu.VERI_DOSYALARI)
+    yorum_deposu_yaz(klasor, ["A"], ["daha yeni"])
+    assert not any(os.path.exists(os.path.join(klasor, ad)) for ad in yorum_deposu.VERI_DOSYALARI)
+    assert YorumDeposu.yukle(klasor).metinler() == ["daha yeni"]
+
+
+def test_parca_parca_yazici_da_surumlu_yazar(tmp_path):
+    klasor = str(tmp_path / "depo")
+    for metinler in (["ilk"], ["ikinci", "ucuncu"]):
+        yazici = YorumDeposuYazici(klasor)
+        yazici.ekle(["A"] * len(metinler), metinler)
+        yazici.bitir(ek_bilgi={"kaynak": {"ozet": metinler[0]}})
+    assert YorumDeposu.yukle(klasor).metinler() == ["ikinci", "ucuncu"]
+    assert meta_oku(klasor)["kaynak"] == {"ozet": "ikinci"}
+    assert len(_surumler(klasor)) == 2
@@ -0,0 +1,137 @@
+# --- Gerekli Kütüphaneler ---
+# Bu script, bir CSV veya JSONL dosyasındaki (soru, havayolu) çiftlerini 'get_responses_batch' ile toplu
+# cevaplar ve sonuçları bittikçe çıktı dosyasına satır satır yazar (karşılaştırma raporları için).
+#   - CSV girişinde 'soru' ve 'havayolu' sütunları olmalıdır. Karşılaştırma soruları için havayolları
+#     '|' ile ayrılır; boş havayolu tüm havayolları demektir.
+#   - JSONL girişinde her satır {"soru": "...", "havayolu": "..." | [...] | null} biçimindedir.
+#   - Çıktı biçimi dosya uzantısından seçilir (.csv veya .jsonl). Her sonuç yazılır yazılmaz diske
+#     aktarılır; script yarıda kesilse de biten satırlar kaybolmaz. Tekrar çalıştırıldığında çıktıda
+#     başarıyla cevaplanmış satırlar ('sira' ile) atlanır, hatalı satırlar tekrar denenir.
+#   - 'kanit_satirlari', kanıtların o anki yorum deposundaki (yorum_deposu/) satır numaralarıdır; veri
+#     güncellenince numaralar değişebilir, arada silinen bir kanıt için null yazılır.
+#
+# Örnek: python toplu_sorgu.py sorular.csv --cikti cevaplar.jsonl --eszamanlilik 8
+import os
+import csv
+import sys
+import json
+import time
+import argparse
+
+from dotenv import load_dotenv
+
+CIKTI_ALANLARI = ["sira", "soru", "havayolu", "durum", "dil", "cevap", "kanit_satirlari", "sure_sn", "hata"]
+
+
+def _havayolu_coz(deger):
+    # CSV'deki "A|B" -> ["A", "B"], "" -> None (tüm havayolları).
+    if deger is None or isinstance(deger, list):
+        return deger
+    adlar = [ad.strip() for ad in str(deger).split("|") if ad.strip()]
+    if not adlar:
+        return None
+    return adlar[0] if len(adlar) == 1 else adlar
+
+
+def sorulari_oku(dosya_yolu):
+    # [(soru, havayolu_adi), ...] döndürür.
+    satirlar = []
+    if dosya_yolu.endswith(".jsonl"):
+        with open(dosya_yolu, encoding="utf-8") as f:
+            for satir in f:
+                if satir.strip():
+                    kayit = json.loads(satir)
+                    satirlar.append((kayit["soru"], _havayolu_coz(kayit.get("havayolu"))))
+    else:
+        with open(dosya_yolu, encoding="utf-8-sig", newline="") as f:
+            for kayit in csv.DictReader(f):
+                satirlar.append((kayit["soru"], _havayolu_coz(kayit.get("havayolu"))))
+    return satirlar
+
+
+def tamamlananlari_oku(dosya_yolu):
+    # Çıktı dosyasında hatasız tamamlanmış satırların sıra numaraları.
+    if not os.path.exists(dosya_yolu):
+        return set()
+    tamamlananlar = set()
+    with open(dosya_yolu, encoding="utf-8", newline="") as f:
+        kayitlar = (json.loads(satir) for satir in f if satir.strip()) if dosya_yolu.endswith(".jsonl") \
+            else csv.DictReader(f)
+        for kayit in kayitlar:
+            if kayit.get("durum") != "hata":
+                tamamlananlar.add(int(kayit["sira"]))
+    return tamamlananlar
+
+
+class CiktiYazici:
+    # Sonuçları ekleme modunda yazar ve her satırdan sonra diske aktarır.
+
+    def __init__(self, dosya_yolu):
+        self.jsonl = dosya_yolu.endswith(".jsonl")
+        yeni_dosya = not os.path.exists(dosya_yolu) or os.path.getsize(dosya_yolu) == 0
+        self._dosya = open(dosya_yolu, "a", encoding="utf-8", newline="")
+        if not self.jsonl:
+            self._csv = csv.DictWriter(self._dosya, fieldnames=CIKTI_ALANLARI, extrasaction="ignore")
+            if yeni_dosya:
+                self._csv.writeheader()
+
+    def yaz(self, sira, sonuc):
+        kayit = {"sira": sira, **sonuc}
+        if self.jsonl:
+            self._dosya.write(json.dumps(kayit, ensure_ascii=False) + "\n")
+        else:
+            havayolu = kayit["havayolu"]
+            kayit["havayolu"] = "|".join(havayolu) if isinstance(havayolu, list) else (havayolu or "")
+            kayit["kanit_satirlari"] = json.dumps(kayit["kanit_satirlari"])
+            self._csv.writerow(kayit)
+        self._dosya.flush()
+        os.fsync(self._dosya.fileno())
+
+    def kapat(self):
+        self._dosya.close()
+
+
+def toplu_sorgula(giris_dosyasi, cikti_dosyasi, eszamanlilik=None):
+    from chatbot_engine import TOPLU_URETIM_ESZAMANLILIK, get_responses_batch
+
+    satirlar = sorulari_oku(giris_dosyasi)
+    tamamlananlar = tamamlananlari_oku(cikti_dosyasi)
+    bekleyen_siralar = [i for i in range(len(satirlar)) if i not in tamamlananlar]
+    if tamamlananlar:
+        print(f"-> {len(tamamlananlar)} satır daha önce cevaplanmış, atlanıyor.")
+    print(f"-> {len(bekleyen_siralar)} soru cevaplanacak.")
+
+    yazici = CiktiYazici(cikti_dosyasi)
+    baslangic = time.time()
+    durumlar = {}
+    try:
+        sonuclar = get_responses_batch([satirlar[i] for i in bekleyen_siralar],
+                                       eszamanlilik or TOPLU_URETIM_ESZAMANLILIK)
+        for n, (j, sonuc) in enumerate(sonuclar, 1):
+            yazici.yaz(bekleyen_siralar[j], sonuc)
+            durumlar[sonuc["durum"]] = durumlar.get(sonuc["durum"], 0) + 1
+            if n % 10 == 0 or n == len(bekleyen_siralar):
+                print(f"[{n}/{len(bekleyen_siralar)}] {time.time() - baslangic:.1f} sn, durumlar: {durumlar}")
+    finally:
+        yazici.kapat()
+    print(f"\nİşlem tamamlandı! Sonuçlar '{cikti_dosyasi}' dosyasında ({time.time() - baslangic:.1f} sn).")
+    return durumlar
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="(soru, havayolu) çiftlerini toplu olarak cevaplar.")
+    parser.add_argument("giris", help="Soruların olduğu CSV veya JSONL dosyası")
+    parser.add_argument("--cikti", required=True, help="Sonuçların yazılacağı .csv veya .jsonl dosyası")
+    parser.add_argument("--eszamanlilik", type=int, help="Aynı anda en fazla kaç cevap üretilecek")
+    args = parser.parse_args()
+
+    load_dotenv()
+    if not os.getenv("GOOGLE_API_KEY"):
+        print("HATA: GOOGLE_API_KEY bulunamadı. Lütfen .env dosyanızı kontrol edin.")
+        sys.exit(1)
+    try:
+        durumlar = toplu_sorgula(args.giris, args.cikti, args.eszamanlilik)
+    except FileNotFoundError as e:
+        print(f"HATA: Dosya bulunamadı: {e.filename}")
+        sys.exit(1)
+    sys.exit(1 if durumlar.get("hata") else 0)
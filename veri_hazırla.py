@@ -1,93 +1,161 @@
-# Gerekli kütüphaneyi içeri aktarıyorum: pandas
+# Gerekli kütüphaneleri içeri aktarıyorum: pandas
 # pandas'ı 'pd' kısaltmasıyla kullanacağım. Bu kütüphane, CSV gibi tablolu verileri
 # okumak, işlemek ve analiz etmek için çok kullanışlı.
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
 import pandas as pd
+# Temiz veriyi ayrıca mmap ile hızlı açılabilen sütun bazlı ikili formatta yazmak için kendi modülüm.
+from yorum_deposu import YORUM_DEPOSU_KLASORU, YorumDeposuYazici, kaynak_bilgisi
 
 # --- Dosya İsimleri Tanımlamaları ---
-# Ham veriyi içeren orijinal CSV dosyamın adı.
+# Ham veriyi içeren orijinal CSV dosyamın adı (komut satırından birden fazla dosya da verilebilir).
 # Bu dosyanın, bu script ile aynı klasörde olması gerekiyor.
-input_filename = "Airline_review.csv" 
+input_filename = "Airline_review.csv"
 # Temizlenmiş ve işlenmiş veriyi kaydedeceğim yeni CSV dosyasının adı.
 output_filename = "temiz_havayolu_yorumlari.csv"
+# Ham dosyayı tek seferde okumak yerine bu kadar satırlık parçalar halinde okuyorum.
+# Böylece dosya kaç GB olursa olsun hafıza kullanımı parça boyutuyla sınırlı kalıyor.
+VARSAYILAN_PARCA_BOYUTU = 50_000
+
+# Orijinal CSV'deki tüm sütunlara ihtiyacım yok.
+# Projem için sadece havayolu adı, yorum başlığı ve ana yorum metni önemli.
+# Sadece bu sütunları, metin (string) tipinde okuyorum; pandas'ın tip tahmini yapmasına gerek kalmıyor.
+gerekli_sutunlar = ['Airline Name', 'Review_Title', 'Review']
+# Ham veride her yorumun değişmeyen bir kimliği varsa (--id-sutunu), temiz CSV'ye 'yorum_id' sütunu olarak
+# taşınıyor. 'yorumlari_guncelle.py' sonradan gelen yorumları bu kimlikle eşleştirip günceller.
+ID_SUTUNU = 'yorum_id'
+
+
+# --- Parça İşleme Fonksiyonu ---
+# Her parçaya aynı temizlik adımlarını uyguluyorum. Tüm işlemler sütun bazlı (vektörel);
+# satır satır dönen apply() kullanmıyorum.
+def parcayi_temizle(df, id_sutunu=None):
+    # --- Adım 1: Eksik Verileri Temizleme ---
+    # Yorum başlığı ('Review_Title') veya yorum metni ('Review') boş olan satırlar analizim için işe yaramaz.
+    # Kimlik sütunu verildiyse kimliği olmayan satırları da atıyorum.
+    df = df.dropna(subset=['Airline Name', 'Review_Title', 'Review'] + ([id_sutunu] if id_sutunu else []))
 
-# Kullanıcıya hangi dosyanın okunduğunu bildiren bir mesaj yazdırıyorum.
-print(f"'{input_filename}' dosyası okunuyor...")
-
-# --- Veri Okuma ve İşleme Bloğu ---
-# Kodun bu kısmında hata oluşma ihtimaline karşı bir try-except bloğu kullanıyorum.
-# Bu, dosya bulunamazsa veya başka bir sorun çıkarsa programın çökmesini engeller.
-try:
-    # pandas'ın read_csv fonksiyonu ile ham CSV dosyasını okuyorum.
-    # Okunan veriyi 'df' adında bir DataFrame (veri çerçevesi) nesnesine atıyorum.
-    # DataFrame, Excel tablosu gibi satır ve sütunlardan oluşan bir yapıdır.
-    df = pd.read_csv(input_filename)
-
-    # Verinin başarıyla okunduğunu kullanıcıya bildiriyorum.
-    print("Veri başarıyla okundu. Veri temizleme ve birleştirme işlemi başlıyor...")
-
-    # --- Adım 1: Gerekli Sütunları Seçme ---
-    # Orijinal CSV'deki tüm sütunlara ihtiyacım yok.
-    # Projem için sadece havayolu adı, yorum başlığı ve ana yorum metni önemli.
-    # Bu sütunların isimlerini bir liste olarak tanımlıyorum.
-    gerekli_sutunlar = ['Airline Name', 'Review_Title', 'Review']
-    # DataFrame'den sadece bu sütunları içeren yeni bir DataFrame ('df_temiz') oluşturuyorum.
-    # .copy() metodu, orijinal veriyi etkilememek için önemlidir.
-    df_temiz = df[gerekli_sutunlar].copy()
-    # Kullanıcıya hangi sütunların tutulduğunu bildiriyorum.
-    print("- Sadece 'Airline Name', 'Review_Title', 'Review' sütunları tutuldu.")
-
-    # --- Adım 2: Eksik Verileri Temizleme ---
-    # Bazen yorum başlığı ('Review_Title') veya yorum metni ('Review') boş olabilir.
-    # Bu tür eksik veriler analizim için işe yaramaz.
-    # dropna() fonksiyonu ile bu iki sütundan herhangi biri boş (NaN) olan satırları siliyorum.
-    # subset parametresi hangi sütunlara bakılacağını belirtir.
-    # inplace=True, değişikliğin doğrudan 'df_temiz' üzerinde yapılmasını sağlar.
-    df_temiz.dropna(subset=['Review_Title', 'Review'], inplace=True)
-    # Kaç satırın temizlendiğini değil, işlemin yapıldığını bildiriyorum.
-    print("- Boş başlık veya boş yorum içeren satırlar temizlendi.")
+    # --- Adım 2: Boşlukları ve Havayolu İsimlerini Normalleştirme ---
+    # Birden fazla boşluk, sekme vb. tek boşluğa indiriliyor ve baştaki/sondaki boşluklar atılıyor.
+    # Böylece "Turkish Airlines " ile "Turkish  Airlines" aynı havayolu sayılıyor.
+    havayolu = df['Airline Name'].str.replace(r"\s+", " ", regex=True).str.strip()
+    baslik = df['Review_Title'].str.replace(r"\s+", " ", regex=True).str.strip()
+    yorum = df['Review'].str.replace(r"[ \t\r\f\v]+", " ", regex=True).str.strip()
 
     # --- Adım 3: Yorum Başlığı ve Metnini Birleştirme ---
     # RAG modelimin her yorum için tek bir metin kaynağına sahip olması daha iyi.
-    # Bu yüzden 'Review_Title' ve 'Review' sütunlarını birleştireceğim.
-    # apply() metodu, DataFrame'in her satırına ('axis=1') belirlediğim bir işlemi uygular.
-    # lambda row: ... ifadesi, her satır ('row') için çalışacak küçük bir fonksiyondur.
-    # Bu fonksiyon, başlığı ve yorumu alıp "BASLIK: ... YORUM: ..." formatında birleştirir.
-    # Sonucu 'birlesik_yorum' adında yeni bir sütuna yazıyorum.
-    df_temiz['birlesik_yorum'] = df_temiz.apply(
-        lambda row: f"BASLIK: {row['Review_Title']}\nYORUM: {row['Review']}",
-        axis=1
-    )
-    # İşlemin tamamlandığını bildiriyorum.
-    print("- 'Review_Title' ve 'Review' sütunları 'birlesik_yorum' adında tek bir sütunda birleştirildi.")
-
-    # --- Adım 4: Son Sütunları Seçme ---
-    # Artık orijinal başlık ve yorum sütunlarına ihtiyacım kalmadı.
-    # Sadece 'Airline Name' ve yeni oluşturduğum 'birlesik_yorum' sütunlarını içeren
-    # nihai DataFrame'i ('df_son') oluşturuyorum.
-    df_son = df_temiz[['Airline Name', 'birlesik_yorum']]
-    
-    # --- Adım 5: Temiz Veriyi Kaydetme ---
-    # Hazırladığım bu temiz ve son veriyi yeni bir CSV dosyasına kaydediyorum.
-    # to_csv() fonksiyonu DataFrame'i CSV dosyasına yazar.
-    # index=False, pandas'ın otomatik eklediği satır numaralarının dosyaya yazılmasını engeller.
-    df_son.to_csv(output_filename, index=False)
+    # Başlığı ve yorumu "BASLIK: ... YORUM: ..." formatında vektörel string birleştirme ile tek sütunda topluyorum.
+    df_son = pd.DataFrame({
+        'Airline Name': havayolu,
+        'birlesik_yorum': "BASLIK: " + baslik + "\nYORUM: " + yorum,
+    })
+    if id_sutunu:
+        df_son[ID_SUTUNU] = df[id_sutunu].astype("string").str.strip()
+    # Normalleştirme sonrası boş kalan satırları da atıyorum.
+    return df_son[(df_son['Airline Name'] != "") & (baslik != "") & (yorum != "")]
+
+
+def tekrarlari_ayikla(df_son, gorulen_ozetler):
+    # --- Adım 4: Tekrar Eden Yorumları Ayıklama ---
+    # Aynı havayoluna ait aynı yorum birden fazla dosyada veya parçada geçebilir.
+    # Her satırın 64 bitlik özetini çıkarıp daha önce görülenleri atıyorum.
+    # Hafızada metinlerin kendisi değil, sadece bu özetler tutuluyor: sıralı bir np.uint64 dizisinde,
+    # yorum başına 8 bayt. Kimlik sütunu varsa aynı kimlikli ikinci satır (metni farklı olsa bile) tekrar sayılıyor.
+    # Tüm adımlar numpy'da: parça içindeki tekrarlar np.unique ile (her özetin ilk geçtiği satır), önceki parçalarda
+    # görülenler sıralı dizide searchsorted ile bulunuyor ve yeni özetler diziye sırası bozulmadan ekleniyor.
+    # (Ayıklanmış parça ve güncel özet dizisi) döner.
+    sutunlar = [ID_SUTUNU] if ID_SUTUNU in df_son.columns else ['Airline Name', 'birlesik_yorum']
+    ozetler = pd.util.hash_pandas_object(df_son[sutunlar], index=False).to_numpy()
+    benzersiz, ilk_satirlar = np.unique(ozetler, return_index=True)
+    konumlar = np.searchsorted(gorulen_ozetler, benzersiz)
+    gorulmus = np.zeros(len(benzersiz), dtype=bool)
+    icerde = konumlar < len(gorulen_ozetler)
+    gorulmus[icerde] = gorulen_ozetler[konumlar[icerde]] == benzersiz[icerde]
+    gorulen_ozetler = np.insert(gorulen_ozetler, konumlar[~gorulmus], benzersiz[~gorulmus])
+    return df_son.iloc[np.sort(ilk_satirlar[~gorulmus])], gorulen_ozetler
+
+
+def veriyi_hazirla(girdi_dosyalari, cikti_dosyasi=output_filename, parca_boyutu=VARSAYILAN_PARCA_BOYUTU,
+                   id_sutunu=None):
+    # CSV'yi önce geçici bir dosyaya yazıyorum; iş bitince asıl dosyanın yerine koyuyorum.
+    # Böylece çalışan uygulama hiçbir zaman yarım yazılmış bir CSV görmüyor.
+    gecici_cikti = cikti_dosyasi + ".tmp"
+    depo_yazici = YorumDeposuYazici(YORUM_DEPOSU_KLASORU)
+    gorulen_ozetler = np.zeros(0, dtype=np.uint64)
+    okunan = yazilan = 0
+    baslangic = time.time()
+    ilk_parca = True
+
+    for girdi in girdi_dosyalari:
+        # Kullanıcıya hangi dosyanın okunduğunu bildiren bir mesaj yazdırıyorum.
+        print(f"'{girdi}' dosyası parça parça okunuyor...")
+        sutunlar = gerekli_sutunlar + ([id_sutunu] if id_sutunu else [])
+        for parca in pd.read_csv(girdi, usecols=sutunlar, dtype={sutun: "string" for sutun in sutunlar},
+                                 chunksize=parca_boyutu):
+            okunan += len(parca)
+            df_son, gorulen_ozetler = tekrarlari_ayikla(parcayi_temizle(parca, id_sutunu), gorulen_ozetler)
+
+            # --- Adım 5: Temiz Veriyi Parça Parça Kaydetme ---
+            # Her parça CSV'nin sonuna ekleniyor (başlık satırı sadece ilk parçada yazılıyor)
+            # ve aynı anda sütun bazlı depo yazıcısına veriliyor.
+            df_son.to_csv(gecici_cikti, index=False, mode="w" if ilk_parca else "a", header=ilk_parca)
+            ilk_parca = False
+            depo_yazici.ekle(df_son['Airline Name'].tolist(), df_son['birlesik_yorum'].tolist())
+            yazilan += len(df_son)
+
+            gecen = max(time.time() - baslangic, 1e-9)
+            print(f"- {okunan} satır okundu, {yazilan} temiz yorum yazıldı ({okunan / gecen:.0f} satır/sn).")
+
+    if ilk_parca:
+        # Hiç satır okunmadıysa bile başlık satırı olan boş bir CSV bırakıyorum.
+        pd.DataFrame(columns=['Airline Name', 'birlesik_yorum'] + ([ID_SUTUNU] if id_sutunu else [])).to_csv(
+            gecici_cikti, index=False)
+    os.replace(gecici_cikti, cikti_dosyasi)
+
+    # --- Adım 6: Sütun Bazlı Yorum Deposunu Yazma ---
+    # Chatbot'un her açılışta CSV'yi pandas ile okumaması için aynı veriyi sıkıştırılmış
+    # bir ikili formatta da yazıyorum: havayolu isimleri küçük sayılarla kodlanıyor,
+    # metinler tek bir UTF-8 tamponunda tutuluyor ve havayolu listesi önceden sıralanıyor.
+    # Deponun hangi CSV'den üretildiğini de kaydediyorum ki CSV değişirse eski depo kullanılmasın.
+    depo_yazici.bitir(ek_bilgi={"kaynak": kaynak_bilgisi(cikti_dosyasi)})
+    print(f"- '{YORUM_DEPOSU_KLASORU}' klasörüne sütun bazlı yorum deposu yazıldı.")
 
     # İşlemin başarıyla tamamlandığını ve sonuç dosyasının adını bildiriyorum.
-    print(f"\nİşlem tamamlandı!")
-    print(f"'{output_filename}' dosyası başarıyla oluşturuldu.")
+    gecen = max(time.time() - baslangic, 1e-9)
+    print(f"\nİşlem tamamlandı! ({gecen:.1f} sn, ortalama {okunan / gecen:.0f} satır/sn)")
+    print(f"'{cikti_dosyasi}' dosyası başarıyla oluşturuldu.")
     # Oluşturulan dosyada kaç adet yorum olduğunu yazdırıyorum.
-    print(f"Toplam {len(df_son)} adet birleştirilmiş ve temizlenmiş yorum mevcut.")
+    print(f"Toplam {yazilan} adet birleştirilmiş ve temizlenmiş yorum mevcut "
+          f"({okunan - yazilan} satır boş veya tekrar olduğu için atıldı).")
     # Yeni oluşturulan veriden bir önizleme (ilk 5 satır) gösteriyorum.
     print("\nİşte yeni oluşturulan veriden bir örnek:")
-    print(df_son.head())
-
-# --- Hata Yakalama Bloğu ---
-# Eğer try bloğunda 'FileNotFoundError' (Dosya bulunamadı hatası) oluşursa,
-# kullanıcıya dosyayı kontrol etmesi gerektiğini söyleyen bir mesaj yazdırıyorum.
-except FileNotFoundError:
-    print(f"HATA: '{input_filename}' adında bir dosya bulunamadı.")
-    print("Lütfen dosyayı doğru klasöre taşıdığınızdan emin olun.")
-# Eğer başka herhangi bir beklenmedik hata oluşursa,
-# hatanın ne olduğunu kullanıcıya bildiriyorum.
-except Exception as e:
-    print(f"Beklenmedik bir hata oluştu: {e}")
\ No newline at end of file
+    print(pd.read_csv(cikti_dosyasi, nrows=5))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ham havayolu yorumlarını temizleyip birleştirir.")
+    parser.add_argument("girdiler", nargs="*", default=[input_filename], help="Ham yorum CSV dosyaları")
+    parser.add_argument("--cikti", default=output_filename, help="Temiz CSV dosyasının adı")
+    parser.add_argument("--parca-boyutu", type=int, default=VARSAYILAN_PARCA_BOYUTU,
+                        help="Tek seferde okunacak satır sayısı")
+    parser.add_argument("--id-sutunu", help="Ham veride yorumun değişmeyen kimliğini tutan sütun (isteğe bağlı)")
+    args = parser.parse_args()
+
+    # --- Hata Yakalama Bloğu ---
+    # Eğer 'FileNotFoundError' (Dosya bulunamadı hatası) oluşursa,
+    # kullanıcıya dosyayı kontrol etmesi gerektiğini söyleyen bir mesaj yazdırıyorum.
+    try:
+        veriyi_hazirla(args.girdiler, args.cikti, args.parca_boyutu, args.id_sutunu)
+    except FileNotFoundError as e:
+        print(f"HATA: '{e.filename}' adında bir dosya bulunamadı.")
+        print("Lütfen dosyayı doğru klasöre taşıdığınızdan emin olun.")
+        sys.exit(1)
+    # Eğer başka herhangi bir beklenmedik hata oluşursa,
+    # hatanın ne olduğunu kullanıcıya bildiriyorum.
+    except Exception as e:
+        print(f"Beklenmedik bir hata oluştu: {e}")
+        sys.exit(1)
@@ -0,0 +1,300 @@
+# --- Gerekli Kütüphaneler ---
+# Bu modül, temizlenmiş yorumları pandas DataFrame yerine sıkıştırılmış, sütun bazlı
+# bir ikili (binary) formatta saklar ve mmap ile açar:
+#   - metinler.bin       : tüm yorum metinleri art arda, tek bir UTF-8 tamponunda
+#   - ofsetler.npy       : i. yorumun tampondaki başlangıcı ofsetler[i], bitişi ofsetler[i+1]
+#   - havayolu_idleri.npy: her satırın havayolu numarası (sözlük kodlaması, küçük tam sayı)
+#   - meta.json          : sıralı havayolu listesi, her havayolunun satır aralığı ve geçerli sürüm
+# İlk üç dosya her yazımda yeni bir 'surumler/<sürüm>/' klasörüne yazılır; meta.json sürümü gösteren tek
+# işaretçidir ve en son, tek bir atomik değişiklikle yerine taşınır. Çalışan bir uygulama depoyu yeniden
+# yüklerken yeni metinleri eski ofsetlerle karıştıramaz: hep aynı sürümün dosyalarını birlikte açar.
+# (Sürüm bilgisi olmayan eski düzendeki depolarda dosyalar doğrudan klasörün içindedir.)
+# Satırlar havayoluna göre sıralı yazıldığı için bir havayolunun yorumları tek bir dilimdir.
+# Dosyalar işletim sisteminin sayfa önbelleğinden okunduğu için tüm Streamlit süreçleri aynı belleği paylaşır.
+import os
+import json
+import mmap
+import time
+import uuid
+import shutil
+import hashlib
+from array import array
+from collections import defaultdict
+
+import numpy as np
+
+# --- Genel Ayarlar ---
+YORUM_DEPOSU_KLASORU = "yorum_deposu"
+META_DOSYASI = "meta.json"
+SURUM_KLASOR_ADI = "surumler"
+VERI_DOSYALARI = ("metinler.bin", "ofsetler.npy", "havayolu_idleri.npy")
+# Yeni sürüm yayınlanınca silinmeyen eski sürüm sayısı; eski meta.json'u okumuş bir süreç dosyaları açabilsin.
+SAKLANAN_ESKI_SURUM = 1
+
+
+def dosya_parmak_izi(dosya_yolu):
+    # Dosyanın içeriğinden SHA-256 özeti çıkarıyorum. Büyük dosyalarda hafızayı
+    # şişirmemek için dosyayı parça parça okuyorum.
+    ozet = hashlib.sha256()
+    with open(dosya_yolu, "rb") as f:
+        for parca in iter(lambda: f.read(1024 * 1024), b""):
+            ozet.update(parca)
+    return ozet.hexdigest()
+
+
+def kaynak_bilgisi(dosya_yolu):
+    # Deponun hangi CSV'den üretildiğini kaydetmek için boyut, değişiklik zamanı ve içerik özeti.
+    durum = os.stat(dosya_yolu)
+    return {"boyut": durum.st_size, "mtime_ns": durum.st_mtime_ns, "ozet": dosya_parmak_izi(dosya_yolu)}
+
+
+def depo_guncel_mi(meta, dosya_yolu):
+    # Önce ucuz kontrol (boyut + mtime); uyuşmazsa içerik özetine bakıyorum.
+    kaynak = (meta or {}).get("kaynak")
+    if kaynak is None:
+        return False
+    try:
+        durum = os.stat(dosya_yolu)
+    except FileNotFoundError:
+        return False
+    if durum.st_size == kaynak["boyut"] and durum.st_mtime_ns == kaynak["mtime_ns"]:
+        return True
+    return durum.st_size == kaynak["boyut"] and dosya_parmak_izi(dosya_yolu) == kaynak["ozet"]
+
+
+def _atomik_yaz(yol, yazici):
+    # Dosyayı önce geçici isimle yazıp sonra yerine taşıyorum. Böylece mmap ile dosyayı
+    # açık tutan süreçler eski sürümü okumaya devam eder, yarım yazılmış dosya görmez.
+    gecici_yol = yol + ".tmp"
+    with open(gecici_yol, "wb") as f:
+        yazici(f)
+    os.replace(gecici_yol, yol)
+
+
+def _id_tipi(havayolu_sayisi):
+    return np.uint16 if havayolu_sayisi <= np.iinfo(np.uint16).max else np.int32
+
+
+def _sirala_ve_kodla(havayolu_adlari, metinler):
+    # Satırları havayoluna göre kararlı sıralayıp havayolu isimlerini küçük tam sayılara çeviriyorum.
+    havayolu_adlari = list(havayolu_adlari)
+    metinler = list(metinler)
+    sira = sorted(range(len(metinler)), key=lambda i: havayolu_adlari[i])
+    havayollari = sorted(set(havayolu_adlari))
+    id_sozlugu = {ad: i for i, ad in enumerate(havayollari)}
+    havayolu_idleri = np.fromiter((id_sozlugu[havayolu_adlari[i]] for i in sira),
+                                  dtype=_id_tipi(len(havayollari)), count=len(sira))
+    return sira, [metinler[i] for i in sira], havayolu_idleri, havayollari
+
+
+def _metinleri_kodla(metinler):
+    kodlanmis = [metin.encode("utf-8") for metin in metinler]
+    ofsetler = np.zeros(len(kodlanmis) + 1, dtype=np.int64)
+    np.cumsum([len(parca) for parca in kodlanmis], out=ofsetler[1:])
+    return b"".join(kodlanmis), ofsetler
+
+
+def _araliklari_hesapla(havayolu_idleri, havayollari):
+    # Sıralı ID sütununda her havayolunun ilk ve son+1 satırını searchsorted ile buluyorum.
+    idler = np.arange(len(havayollari))
+    baslangiclar = np.searchsorted(havayolu_idleri, idler, side="left")
+    bitisler = np.searchsorted(havayolu_idleri, idler, side="right")
+    return {ad: (int(b), int(s)) for ad, b, s in zip(havayollari, baslangiclar, bitisler)}
+
+
+def _depo_dosyalarini_yaz(klasor, tampon_yazici, ofsetler, havayolu_idleri, havayollari, ek_bilgi):
+    # Veri dosyaları yeni bir sürüm klasörüne yazılıyor; klasör tamamlanınca meta.json onu gösterecek şekilde
+    # değiştiriliyor. O ana kadar okuyucular önceki sürümü eksiksiz görmeye devam eder.
+    onceki_meta = meta_oku(klasor)
+    # Sürüm adları yazım sırasına göre sıralanır (nanosaniyeye kadar); eski sürümler bu sırayla temizlenir.
+    simdi = time.time_ns()
+    surum = f"{time.strftime('%Y%m%d%H%M%S', time.localtime(simdi // 10**9))}{simdi % 10**9:09d}_{uuid.uuid4().hex[:8]}"
+    surum_klasoru = os.path.join(klasor, SURUM_KLASOR_ADI, surum)
+    gecici_klasor = surum_klasoru + ".yeni"
+    os.makedirs(gecici_klasor)
+    with open(os.path.join(gecici_klasor, "metinler.bin"), "wb") as f:
+        tampon_yazici(f)
+    np.save(os.path.join(gecici_klasor, "ofsetler.npy"), ofsetler)
+    np.save(os.path.join(gecici_klasor, "havayolu_idleri.npy"), havayolu_idleri)
+    os.replace(gecici_klasor, surum_klasoru)
+    meta = {
+        "surum": surum,
+        "yorum_sayisi": len(ofsetler) - 1,
+        "havayollari": havayollari,
+        "araliklar": {ad: list(aralik) for ad, aralik in _araliklari_hesapla(havayolu_idleri, havayollari).items()},
+    }
+    meta.update(ek_bilgi or {})
+    # Yayın anı: meta.json tek bir os.replace ile yeni sürümü gösterir.
+    _atomik_yaz(os.path.join(klasor, META_DOSYASI),
+                lambda f: f.write(json.dumps(meta, ensure_ascii=False).encode("utf-8")))
+    _eski_surumleri_sil(klasor, surum, onceki_meta)
+
+
+def _eski_surumleri_sil(klasor, gecerli, onceki_meta):
+    # Geçerli sürüm ve en yeni SAKLANAN_ESKI_SURUM eski sürüm dışındakiler (ve yarım kalan yazımlar) silinir.
+    # Dosyası mmap ile açık olan süreçler silinen sürümü okumaya devam eder; silinemeyen (ör. Windows'ta açık)
+    # klasör bir sonraki yayında tekrar denenir.
+    surumler_klasoru = os.path.join(klasor, SURUM_KLASOR_ADI)
+    adlar = os.listdir(surumler_klasoru)
+    surumler = sorted(ad for ad in adlar if not ad.endswith(".yeni") and ad != gecerli)
+    silinecekler = surumler[:max(0, len(surumler) - SAKLANAN_ESKI_SURUM)]
+    silinecekler += [ad for ad in adlar if ad.endswith(".yeni")]
+    for ad in silinecekler:
+        shutil.rmtree(os.path.join(surumler_klasoru, ad), ignore_errors=True)
+    # Eski düzenin kökteki dosyaları, yeni düzene geçen yayından bir sonrakinde silinir.
+    if onceki_meta and onceki_meta.get("surum"):
+        for ad in VERI_DOSYALARI:
+            try:
+                os.remove(os.path.join(klasor, ad))
+            except OSError:
+                pass
+
+
+def yorum_deposu_yaz(klasor, havayolu_adlari, metinler, ek_bilgi=None):
+    # Hafızadaki yorumları depo olarak diske yazar (küçük veriler ve index klasörü için).
+    _, metinler, havayolu_idleri, havayollari = _sirala_ve_kodla(havayolu_adlari, metinler)
+    tampon, ofsetler = _metinleri_kodla(metinler)
+    _depo_dosyalarini_yaz(klasor, lambda f: f.write(tampon), ofsetler, havayolu_idleri, havayollari, ek_bilgi)
+
+
+class YorumDeposuYazici:
+    # Büyük veri setleri için parça parça yazan depo yazıcısı. Gelen her parçadaki metinler
+    # havayoluna göre ayrı geçici dosyalara eklenir; bitir() çağrıldığında bu dosyalar sıralı
+    # havayolu düzeninde tek bir tampona birleştirilir. Hafızada sadece satır başına bir
+    # uzunluk değeri (8 bayt) tutulur, metinlerin kendisi tutulmaz.
+
+    def __init__(self, klasor):
+        self.klasor = klasor
+        self._gecici_klasor = klasor + ".parcalar"
+        shutil.rmtree(self._gecici_klasor, ignore_errors=True)
+        os.makedirs(self._gecici_klasor)
+        self._dosyalar = {}                        # havayolu -> geçici dosya yolu
+        self._uzunluklar = defaultdict(lambda: array("q"))  # havayolu -> metin uzunlukları (bayt)
+
+    def ekle(self, havayolu_adlari, metinler):
+        gruplar = defaultdict(list)
+        for ad, metin in zip(havayolu_adlari, metinler):
+            gruplar[ad].append(metin.encode("utf-8"))
+        for ad, parcalar in gruplar.items():
+            if ad not in self._dosyalar:
+                self._dosyalar[ad] = os.path.join(self._gecici_klasor, f"{len(self._dosyalar)}.bin")
+            with open(self._dosyalar[ad], "ab") as f:
+                f.write(b"".join(parcalar))
+            self._uzunluklar[ad].extend(len(parca) for parca in parcalar)
+
+    def bitir(self, ek_bilgi=None):
+        havayollari = sorted(self._dosyalar)
+        sayilar = [len(self._uzunluklar[ad]) for ad in havayollari]
+        havayolu_idleri = np.repeat(np.arange(len(havayollari), dtype=_id_tipi(len(havayollari))), sayilar)
+        ofsetler = np.zeros(sum(sayilar) + 1, dtype=np.int64)
+        if havayollari:
+            np.cumsum(np.concatenate([np.frombuffer(self._uzunluklar[ad], dtype=np.int64) for ad in havayollari]),
+                      out=ofsetler[1:])
+
+        def tampon_yaz(f):
+            for ad in havayollari:
+                with open(self._dosyalar[ad], "rb") as parca:
+                    shutil.copyfileobj(parca, f)
+
+        _depo_dosyalarini_yaz(self.klasor, tampon_yaz, ofsetler, havayolu_idleri, havayollari, ek_bilgi)
+        shutil.rmtree(self._gecici_klasor, ignore_errors=True)
+
+
+def meta_oku(klasor):
+    try:
+        with open(os.path.join(klasor, META_DOSYASI), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+class YorumDeposu:
+    # Sütun bazlı yorum deposu. Diskten mmap ile (yukle) veya doğrudan bellekte (bellekten) oluşturulabilir.
+    # Bir havayolunun yorumlarına erişim, sıralı satır aralığı sayesinde O(1) dilimlemedir.
+
+    def __init__(self, tampon, ofsetler, havayolu_idleri, havayollari, araliklar, meta=None):
+        self._tampon = tampon
+        self.ofsetler = ofsetler
+        self.havayolu_idleri = havayolu_idleri
+        self.havayollari = havayollari        # sıralı havayolu listesi (ID -> isim)
+        self.araliklar = araliklar            # isim -> (baslangic, bitis)
+        self.meta = meta or {}
+
+    @classmethod
+    def yukle(cls, klasor, meta=None):
+        # meta verilirse (ör. kaynak kontrolü için önceden okunduysa) dosyalar tam olarak o meta'nın sürümünden açılır.
+        meta = meta_oku(klasor) if meta is None else meta
+        if meta is None:
+            raise FileNotFoundError(f"'{klasor}' altında yorum deposu bulunamadı.")
+        if meta.get("surum"):
+            klasor = os.path.join(klasor, SURUM_KLASOR_ADI, meta["surum"])
+        yol = os.path.join(klasor, "metinler.bin")
+        if os.path.getsize(yol) > 0:
+            with open(yol, "rb") as f:
+                tampon = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            tampon = b""
+        ofsetler = np.load(os.path.join(klasor, "ofsetler.npy"), mmap_mode="r")
+        havayolu_idleri = np.load(os.path.join(klasor, "havayolu_idleri.npy"), mmap_mode="r")
+        araliklar = {ad: tuple(aralik) for ad, aralik in meta["araliklar"].items()}
+        return cls(tampon, ofsetler, havayolu_idleri, meta["havayollari"], araliklar, meta)
+
+    @classmethod
+    def bellekten(cls, havayolu_adlari, metinler):
+        # Diske yazmadan aynı düzende bir depo kurar (geçici indexler için).
+        _, metinler, havayolu_idleri, havayollari = _sirala_ve_kodla(havayolu_adlari, metinler)
+        tampon, ofsetler = _metinleri_kodla(metinler)
+        return cls(tampon, ofsetler, havayolu_idleri, havayollari, _araliklari_hesapla(havayolu_idleri, havayollari))
+
+    def kaydet(self, klasor, ek_bilgi=None):
+        yorum_deposu_yaz(klasor, self.havayolu_adlari(), self.metinler(), ek_bilgi)
+
+    def __len__(self):
+        return len(self.ofsetler) - 1
+
+    def metin(self, satir):
+        return self._tampon[int(self.ofsetler[satir]):int(self.ofsetler[satir + 1])].decode("utf-8")
+
+    def havayolu(self, satir):
+        return self.havayollari[int(self.havayolu_idleri[satir])]
+
+    def metinler(self, baslangic=0, bitis=None):
+        bitis = len(self) if bitis is None else bitis
+        return [self.metin(i) for i in range(baslangic, bitis)]
+
+    def havayolu_adlari(self):
+        return [self.havayollari[i] for i in self.havayolu_idleri]
+
+    def aralik(self, havayolu_adi):
+        return self.araliklar.get(havayolu_adi, (0, 0))
+
+    def yorum_sayisi(self, havayollari=None):
+        if havayollari is None:
+            return len(self)
+        return sum(bitis - baslangic for baslangic, bitis in (self.aralik(ad) for ad in havayollari))
+
+    def satir_bul(self, havayolu_adi, metin):
+        # Havayolunun aralığında metni birebir aynı olan ilk yorumun satırı; yoksa None.
+        # Metin, havayolunun bayt aralığında aranır ve sadece bir yorumun tamamına denk gelen eşleşme kabul edilir.
+        baslangic, bitis = self.aralik(havayolu_adi)
+        if baslangic == bitis:
+            return None
+        aranan = metin.encode("utf-8")
+        konum, son = int(self.ofsetler[baslangic]), int(self.ofsetler[bitis])
+        while True:
+            konum = self._tampon.find(aranan, konum, son)
+            if konum < 0:
+                return None
+            satir = int(np.searchsorted(self.ofsetler, konum, side="right")) - 1
+            if int(self.ofsetler[satir]) == konum and int(self.ofsetler[satir + 1]) - konum == len(aranan):
+                return satir
+            konum += 1
+
+    def secim(self, havayollari):
+        # Verilen havayollarının (metinler, havayolu_adlari) listelerini dilimleyerek döndürür.
+        metinler, adlar = [], []
+        for ad in havayollari:
+            baslangic, bitis = self.aralik(ad)
+            metinler.extend(self.metinler(baslangic, bitis))
+            adlar.extend([ad] * (bitis - baslangic))
+        return metinler, adlar
@@ -0,0 +1,217 @@
+# --- Gerekli Kütüphaneler ---
+# Bu script, yeni gelen yorumları (ham 'Airline_review.csv' formatında bir veya daha fazla dosya) indexi
+# baştan kurmadan sisteme ekler. Yorumlar 'veri_hazırla.py' ile aynı temizlik adımlarından geçer ve
+# anahtarlarıyla (yorum kimliği veya havayolu + metin özeti) mevcut yorumlarla eşleştirilir:
+#   - yeni yorumlar eklenir, metni değişen yorumlar (kimlikle çalışılıyorsa) güncellenir, aynıları atlanır;
+#   - --silinecekler dosyasındaki yorumlar silinir.
+# Sadece yeni ve değişen yorumlar embedding servisine gönderilir. Index 'artimli_index.py' ile güncellenir;
+# temiz CSV ve yorum deposu da aynı veriye getirilir, böylece sonradan 'index_olustur.py' ile baştan kurulan
+# index aynı yorumları içerir. Ek büyüyünce (ARTIMLI_SIKISTIRMA_ORANI) veya --sikistir ile index yeniden
+# embedding yapılmadan sıkıştırılır. Çalışan uygulamalar yeni sürüme bir sonraki sorguda kendiliğinden geçer.
+#
+# Örnek: python yorumlari_guncelle.py gunluk_yorumlar.csv
+#        python yorumlari_guncelle.py gunluk_yorumlar.csv --id-sutunu review_id --silinecekler silinenler.csv
+#        python yorumlari_guncelle.py --sikistir
+import os
+import sys
+import time
+import fcntl
+import argparse
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+from artimli_index import IndexGuncelleyici, yorum_anahtarlari
+from index_deposu import (
+    BEKLEYEN_MANIFEST_DOSYASI,
+    EMBEDDING_MODEL_ADI,
+    INDEX_KLASORU,
+    manifest_oku,
+    manifest_yaz,
+    surumu_yayinla,
+)
+from veri_hazırla import ID_SUTUNU, VARSAYILAN_PARCA_BOYUTU, gerekli_sutunlar, parcayi_temizle
+from yorum_deposu import YORUM_DEPOSU_KLASORU, YorumDeposuYazici, dosya_parmak_izi, kaynak_bilgisi
+
+# --- Dosya İsimleri Tanımlamaları ---
+INPUT_FILENAME = "temiz_havayolu_yorumlari.csv"
+
+
+class GuncellemeHatasi(Exception):
+    pass
+
+
+def _temiz_parcalar(dosya_yolu, id_sutunu, parca_boyutu):
+    # Ham dosyayı parça parça okuyup veri_hazırla'daki temizlikten geçirir.
+    sutunlar = gerekli_sutunlar + ([id_sutunu] if id_sutunu else [])
+    for parca in pd.read_csv(dosya_yolu, usecols=sutunlar, dtype={sutun: "string" for sutun in sutunlar},
+                             chunksize=parca_boyutu):
+        yield parcayi_temizle(parca, id_sutunu)
+
+
+def _silinecek_anahtarlar(dosya_yolu, id_sutunu, parca_boyutu):
+    # Kimlikle çalışılıyorsa dosyada sadece kimlik sütunu yeterli; değilse yorumun kendisi (ham formatta) gerekir.
+    if id_sutunu:
+        kimlikler = pd.read_csv(dosya_yolu, usecols=[id_sutunu], dtype={id_sutunu: "string"})[id_sutunu]
+        kimlikler = kimlikler.dropna().str.strip().tolist()
+        return yorum_anahtarlari(None, None, kimlikler)
+    parcalar = [yorum_anahtarlari(df["Airline Name"].tolist(), df["birlesik_yorum"].tolist())
+                for df in _temiz_parcalar(dosya_yolu, None, parca_boyutu)]
+    return np.concatenate(parcalar) if parcalar else np.zeros(0, dtype=np.uint64)
+
+
+def _csv_yaz(veri_dosyasi, hedef, guncelleyici, kimlik_modu, parca_boyutu):
+    # Eski CSV'den silinen ve değişen yorumlar çıkarılır, yeni halleri sona eklenir.
+    cikarilanlar = np.fromiter(guncelleyici.cikarilan_anahtarlar, dtype=np.uint64)
+    sutunlar = None
+    ilk_parca = True
+    for parca in pd.read_csv(veri_dosyasi, dtype=str, keep_default_na=False, chunksize=parca_boyutu):
+        sutunlar = list(parca.columns)
+        anahtarlar = yorum_anahtarlari(parca["Airline Name"].tolist(), parca["birlesik_yorum"].tolist(),
+                                       parca[ID_SUTUNU].tolist() if kimlik_modu else None)
+        parca[~np.isin(anahtarlar, cikarilanlar)].to_csv(hedef, index=False, mode="w" if ilk_parca else "a",
+                                                          header=ilk_parca)
+        ilk_parca = False
+    yeniler = pd.DataFrame([{"Airline Name": ad, "birlesik_yorum": metin, ID_SUTUNU: kimlik}
+                            for ad, metin, kimlik in guncelleyici.eklenecekler.values()])
+    sutunlar = sutunlar or ["Airline Name", "birlesik_yorum"] + ([ID_SUTUNU] if kimlik_modu else [])
+    yeniler.reindex(columns=sutunlar).to_csv(hedef, index=False, mode="w" if ilk_parca else "a", header=ilk_parca)
+
+
+def _yorum_deposunu_yaz(veri_dosyasi, parca_boyutu):
+    # CSV yerine konduktan sonra çağrılır. Bu sırada açılan süreçler depoyu CSV'ye uymadığı için
+    # kullanmaz ve CSV'yi okur; yeni sürüm meta.json ile yayınlanınca depo tekrar geçerli olur.
+    yazici = YorumDeposuYazici(YORUM_DEPOSU_KLASORU)
+    for parca in pd.read_csv(veri_dosyasi, usecols=["Airline Name", "birlesik_yorum"], dtype=str,
+                             keep_default_na=False, chunksize=parca_boyutu):
+        yazici.ekle(parca["Airline Name"].tolist(), parca["birlesik_yorum"].tolist())
+    yazici.bitir(ek_bilgi={"kaynak": kaynak_bilgisi(veri_dosyasi)})
+
+
+def yorumlari_guncelle(girdi_dosyalari=(), silinecek_dosyalari=(), id_sutunu=None, veri_dosyasi=INPUT_FILENAME,
+                       index_klasoru=INDEX_KLASORU, embeddings=None, sikistir=False,
+                       parca_boyutu=VARSAYILAN_PARCA_BOYUTU):
+    # Aynı anda iki güncelleme çalışmasın diye kilit dosyası tutuyorum.
+    with open(index_klasoru + ".kilit", "w") as kilit:
+        try:
+            fcntl.flock(kilit, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise GuncellemeHatasi("Başka bir güncelleme çalışıyor.")
+        return _guncelle(girdi_dosyalari, silinecek_dosyalari, id_sutunu, veri_dosyasi, index_klasoru, embeddings,
+                         sikistir, parca_boyutu)
+
+
+def _guncelle(girdi_dosyalari, silinecek_dosyalari, id_sutunu, veri_dosyasi, index_klasoru, embeddings, sikistir,
+              parca_boyutu):
+    baslangic = time.time()
+    manifest = manifest_oku(index_klasoru)
+    if manifest is None:
+        raise GuncellemeHatasi(f"'{index_klasoru}' altında index yok. Önce 'python index_olustur.py' çalıştırın.")
+
+    # Önceki çalışma yayın adımlarının ortasında kesildiyse (bekleyen manifest duruyor) kaldığı yerden
+    # tamamlıyorum. Bekleyen manifest'in gösterdiği CSV artık yoksa yayın geri alınır; yarım bir CSV atılır.
+    yeni_csv = veri_dosyasi + ".guncel"
+    bekleyen_yolu = os.path.join(index_klasoru, BEKLEYEN_MANIFEST_DOSYASI)
+    bekleyen = manifest_oku(index_klasoru, BEKLEYEN_MANIFEST_DOSYASI)
+    if bekleyen is not None:
+        if os.path.exists(yeni_csv) and dosya_parmak_izi(yeni_csv) == bekleyen.get("veri_ozeti"):
+            os.replace(yeni_csv, veri_dosyasi)
+        if dosya_parmak_izi(veri_dosyasi) == bekleyen.get("veri_ozeti"):
+            print("-> Yarıda kalan önceki güncelleme tamamlanıyor...")
+            surumu_yayinla(index_klasoru, bekleyen, manifest)
+            _yorum_deposunu_yaz(veri_dosyasi, parca_boyutu)
+            manifest = bekleyen
+        else:
+            manifest = {anahtar: deger for anahtar, deger in manifest.items() if anahtar != "bekleyen_veri_ozeti"}
+            manifest_yaz(index_klasoru, manifest)
+        os.remove(bekleyen_yolu)
+    if os.path.exists(yeni_csv):
+        os.remove(yeni_csv)
+
+    veri_ozeti = dosya_parmak_izi(veri_dosyasi)
+    if manifest.get("veri_ozeti") != veri_ozeti or manifest.get("embedding_modeli") != EMBEDDING_MODEL_ADI:
+        raise GuncellemeHatasi("Diskteki index güncel veriyle uyuşmuyor. Önce 'python index_olustur.py' çalıştırın.")
+    kimlik_modu = manifest.get("anahtar_turu", "icerik") == "kimlik"
+    if kimlik_modu != bool(id_sutunu):
+        raise GuncellemeHatasi("Index yorum kimlikleriyle kurulduysa --id-sutunu verilmeli, kurulmadıysa verilmemeli "
+                               f"(bu indexin anahtar türü: {manifest.get('anahtar_turu', 'icerik')}).")
+
+    guncelleyici = IndexGuncelleyici(index_klasoru)
+    for girdi in girdi_dosyalari:
+        print(f"'{girdi}' okunuyor...")
+        for df in _temiz_parcalar(girdi, id_sutunu, parca_boyutu):
+            guncelleyici.yorumlari_ekle(df["Airline Name"].tolist(), df["birlesik_yorum"].tolist(),
+                                        df[ID_SUTUNU].tolist() if id_sutunu else None)
+    for dosya in silinecek_dosyalari:
+        print(f"'{dosya}' okunuyor (silinecek yorumlar)...")
+        guncelleyici.yorumlari_sil(_silinecek_anahtarlar(dosya, id_sutunu, parca_boyutu))
+
+    ozet = guncelleyici.ozet()
+    print(f"-> {ozet['eklenen']} yeni, {ozet['guncellenen']} değişen, {ozet['silinen']} silinen yorum; "
+          f"{ozet['degismeyen']} yorum zaten güncel.")
+    if not guncelleyici.degisiklik_var_mi() and not sikistir:
+        print("Değişiklik yok, index olduğu gibi bırakıldı.")
+        return ozet
+
+    if embeddings is None and guncelleyici.eklenecekler:
+        from langchain_google_genai import GoogleGenerativeAIEmbeddings
+        from embedding_onbellegi import OnbellekliEmbeddings
+        embeddings = OnbellekliEmbeddings(GoogleGenerativeAIEmbeddings(model=EMBEDDING_MODEL_ADI), EMBEDDING_MODEL_ADI)
+
+    # Sıra önemli; hangi adımda kesilirse kesilsin okuyucular birbirine uyan bir CSV ve index görür:
+    #   1. yeni CSV '.guncel' dosyasına, yeni index sürümü kendi klasörüne yazılır (okuyucular eskisini görür);
+    #   2. yayınlanacak manifest bekleyen manifest olarak yazılır ve geçerli manifest'e yeni CSV'nin özeti
+    #      'bekleyen_veri_ozeti' olarak eklenir; CSV değiştiği anda yüklü index geçerli kalır, hiçbir süreç
+    #      yeniden embedding'e (geçici indexe) düşmez;
+    #   3. CSV yerine konur, ancak ondan sonra onu gösteren yeni manifest tek bir değişiklikle yayınlanır;
+    #   4. yorum deposu yeniden yazılır ve bekleyen manifest silinir.
+    csv_degisti = guncelleyici.degisiklik_var_mi()
+    if csv_degisti:
+        _csv_yaz(veri_dosyasi, yeni_csv, guncelleyici, kimlik_modu, parca_boyutu)
+        yeni_veri_ozeti = dosya_parmak_izi(yeni_csv)
+    else:
+        yeni_veri_ozeti = veri_ozeti
+    try:
+        yeni_manifest, ozet["sikistirildi"] = guncelleyici.hazirla(embeddings, yeni_veri_ozeti, sikistir)
+    except Exception:
+        if os.path.exists(yeni_csv):
+            os.remove(yeni_csv)
+        raise
+    manifest_yaz(index_klasoru, yeni_manifest, BEKLEYEN_MANIFEST_DOSYASI)
+    if csv_degisti:
+        manifest_yaz(index_klasoru, dict(manifest, bekleyen_veri_ozeti=yeni_veri_ozeti))
+        os.replace(yeni_csv, veri_dosyasi)
+    guncelleyici.yayinla(yeni_manifest)
+    if csv_degisti:
+        _yorum_deposunu_yaz(veri_dosyasi, parca_boyutu)
+    os.remove(bekleyen_yolu)
+
+    print(f"\nİşlem tamamlandı! ({time.time() - baslangic:.1f} sn) Hazır konu özetlerinin yeni yorumları "
+          f"içermesi için 'python ozet_olustur.py' tekrar çalıştırılabilir.")
+    return ozet
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Yeni gelen yorumları indexi baştan kurmadan ekler.")
+    parser.add_argument("girdiler", nargs="*", help="Yeni/değişen yorumların olduğu ham CSV dosyaları")
+    parser.add_argument("--silinecekler", nargs="*", default=[],
+                        help="Silinecek yorumların dosyaları (kimlik sütunu veya ham formatta yorumlar)")
+    parser.add_argument("--id-sutunu", help="Ham veride yorumun değişmeyen kimliğini tutan sütun")
+    parser.add_argument("--sikistir", action="store_true", help="Eki ve silinen satırları tabana katıp indexi sıkıştır")
+    args = parser.parse_args()
+
+    load_dotenv()
+    if not (args.girdiler or args.silinecekler or args.sikistir):
+        parser.error("En az bir girdi dosyası, --silinecekler veya --sikistir verilmelidir.")
+    if args.girdiler and not os.getenv("GOOGLE_API_KEY"):
+        print("HATA: GOOGLE_API_KEY bulunamadı. Lütfen .env dosyanızı kontrol edin.")
+        sys.exit(1)
+    try:
+        yorumlari_guncelle(args.girdiler, args.silinecekler, args.id_sutunu, sikistir=args.sikistir)
+    except FileNotFoundError as e:
+        print(f"HATA: '{e.filename}' adında bir dosya bulunamadı.")
+        sys.exit(1)
+    except GuncellemeHatasi as e:
+        print(f"HATA: {e}")
+        sys.exit(1)